@@ -240,6 +240,10 @@ r"""
 .. |compute.condensed()| replace:: :func:`~pyphi.compute.network.condensed`
 
 .. |Subsystem.clear_caches()| replace:: :func:`~pyphi.subsystem.Subsystem.clear_caches`
+.. |Subsystem.canonical_form()| replace:: :func:`~pyphi.subsystem.Subsystem.canonical_form`
+.. |Subsystem.repertoires()| replace:: :func:`~pyphi.subsystem.Subsystem.repertoires`
+.. |Subsystem.prefetch_repertoires()| replace:: :func:`~pyphi.subsystem.Subsystem.prefetch_repertoires`
+.. |RepertoireIrreducibilityAnalysis.permute()| replace:: :func:`~pyphi.models.mechanism.RepertoireIrreducibilityAnalysis.permute`
 
 .. |configure_logging()| replace:: :func:`~pyphi.config.configure_logging`
 
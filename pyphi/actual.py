@@ -567,7 +567,7 @@ def sia(transition, direction=Direction.BIDIRECTIONAL):
     cuts = _get_cuts(transition, direction)
     engine = ComputeACSystemIrreducibility(
         cuts, transition, direction, unpartitioned_account)
-    result = engine.run_sequential()
+    result = engine.run(config.PARALLEL_CUT_EVALUATION)
     log.info("Finished calculating big-ac-phi data for %s.", transition)
     log.debug("RESULT: \n%s", result)
     return result
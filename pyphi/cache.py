@@ -11,23 +11,117 @@ Memoization and caching utilities.
 # pylint: disable=dangerous-default-value,redefined-builtin
 # pylint: disable=abstract-method
 
+import atexit
+import hashlib
+import multiprocessing
 import os
 import pickle
+import struct
+import sys
+import weakref
+from collections import OrderedDict
 from functools import namedtuple, update_wrapper, wraps
 
+import numpy as np
 import psutil
 import redis
 
-from . import config, constants
+from . import config, constants, utils
+from .direction import Direction
+
+try:
+    from multiprocessing import resource_tracker, shared_memory
+except ImportError:  # Python < 3.8
+    shared_memory = None
 
 _CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "currsize"])
+_CacheMemoryInfo = namedtuple("CacheMemoryInfo",
+                              ["hits", "misses", "currsize", "nbytes"])
+
+
+def sizeof(obj, _depth=0):
+    """Estimate the number of bytes used by a cached value.
+
+    NumPy arrays, containers and PyPhi models are measured recursively; other
+    objects, which are usually shared between many cached values (e.g.
+    subsystems or node labels), are only counted shallowly.
+    """
+    size = sys.getsizeof(obj)
+
+    if _depth > 4 or isinstance(obj, (np.ndarray, str, bytes)):
+        return size
+
+    if isinstance(obj, (tuple, list, set, frozenset)):
+        return size + sum(sizeof(x, _depth + 1) for x in obj)
+
+    if isinstance(obj, dict):
+        return size + sum(sizeof(k, _depth + 1) + sizeof(v, _depth + 1)
+                          for k, v in obj.items())
+
+    if type(obj).__module__.startswith('pyphi.models'):
+        return size + sum(sizeof(v, _depth + 1)
+                          for v in getattr(obj, '__dict__', {}).values())
 
+    return size
+
+
+class CacheManager:
+    """Enforces a single memory budget across all in-memory caches.
+
+    Every ``DictCache`` registers itself with the manager and reports the
+    estimated size of the values it stores. When the total exceeds
+    :data:`config.MAXIMUM_CACHE_MEMORY_PERCENTAGE` of the physical memory,
+    entries are evicted: the least recently used caches are emptied first,
+    each in least-recently-used order, until the total is back below
+    ``LOW_WATER_MARK`` of the budget.
+    """
+
+    #: Fraction of the budget to evict down to once it is exceeded.
+    LOW_WATER_MARK = 0.9
+
+    def __init__(self):
+        self.caches = weakref.WeakSet()
+        self.nbytes = 0
+        self.clock = 0
+        self.total_memory = psutil.virtual_memory().total
+
+    def budget(self):
+        """The maximum number of bytes the caches may use."""
+        return (config.MAXIMUM_CACHE_MEMORY_PERCENTAGE / 100 *
+                self.total_memory)
+
+    def register(self, cache):
+        self.caches.add(cache)
+
+    def tick(self):
+        """Return the current time of the manager's logical clock."""
+        self.clock += 1
+        return self.clock
+
+    def allocate(self, nbytes):
+        """Account for ``nbytes`` newly cached bytes, evicting entries if
+        the budget is exceeded.
+        """
+        self.nbytes += nbytes
+        if self.nbytes > self.budget():
+            self.evict()
 
-def memory_full():
-    """Check if the memory is too full for further caching."""
-    current_process = psutil.Process(os.getpid())
-    return (current_process.memory_percent() >
-            config.MAXIMUM_CACHE_MEMORY_PERCENTAGE)
+    def release(self, nbytes):
+        """Account for ``nbytes`` removed from a cache."""
+        self.nbytes -= nbytes
+
+    def evict(self):
+        """Evict entries until the caches use less than the low water mark."""
+        target = self.LOW_WATER_MARK * self.budget()
+        for cache in sorted(self.caches, key=lambda c: c.last_used):
+            while self.nbytes > target and cache.evict():
+                pass
+            if self.nbytes <= target:
+                break
+
+
+#: The manager shared by all caches in this process.
+manager = CacheManager()
 
 
 class _HashedSeq(list):
@@ -75,12 +169,12 @@ def _make_key(args, kwds, typed,
     return _HashedSeq(key)
 
 
-def cache(cache={}, maxmem=config.MAXIMUM_CACHE_MEMORY_PERCENTAGE,
-          typed=False):
-    """Memory-limited cache decorator.
+def cache(typed=False):
+    """Memoizing decorator.
 
-    ``maxmem`` is a float between 0 and 100, inclusive, specifying the maximum
-    percentage of physical memory that the cache can use.
+    Results are stored in a ``DictCache``, so they are counted against the
+    global cache memory budget and evicted in least-recently-used order when
+    it is exceeded.
 
     If ``typed`` is ``True``, arguments of different types will be cached
     separately. For example, f(3.0) and f(3) will be treated as distinct calls
@@ -92,65 +186,23 @@ def cache(cache={}, maxmem=config.MAXIMUM_CACHE_MEMORY_PERCENTAGE,
     with f.cache_info(). Clear the cache and statistics with f.cache_clear().
     Access the underlying function with f.__wrapped__.
     """
-    # Constants shared by all lru cache instances:
-    # Unique object used to signal cache misses.
-    sentinel = object()
     # Build a key from the function arguments.
     make_key = _make_key
 
-    def decorating_function(user_function, hits=0, misses=0):
-        full = False
-        # Bound method to look up a key or return None.
-        cache_get = cache.get
-
-        if not maxmem:
-
-            def wrapper(*args, **kwds):
-                # Simple caching without memory limit.
-                nonlocal hits, misses
-                key = make_key(args, kwds, typed)
-                result = cache_get(key, sentinel)
-                if result is not sentinel:
-                    hits += 1
-                    return result
-                result = user_function(*args, **kwds)
-                cache[key] = result
-                misses += 1
-                return result
-
-        else:
+    def decorating_function(user_function):
+        cache = DictCache()
 
-            def wrapper(*args, **kwds):
-                # Memory-limited caching.
-                nonlocal hits, misses, full
-                key = make_key(args, kwds, typed)
-                result = cache_get(key)
-                if result is not None:
-                    hits += 1
-                    return result
+        def wrapper(*args, **kwds):
+            key = make_key(args, kwds, typed)
+            result = cache.get(key)
+            if result is None:
                 result = user_function(*args, **kwds)
-                if not full:
-                    cache[key] = result
-                    # Cache is full if the total recursive usage is greater
-                    # than the maximum allowed percentage.
-                    current_process = psutil.Process(os.getpid())
-                    full = current_process.memory_percent() > maxmem
-                misses += 1
-                return result
-
-        def cache_info():
-            """Report cache statistics."""
-            return _CacheInfo(hits, misses, len(cache))
-
-        def cache_clear():
-            """Clear the cache and cache statistics."""
-            nonlocal hits, misses, full
-            cache.clear()
-            hits = misses = 0
-            full = False
-
-        wrapper.cache_info = cache_info
-        wrapper.cache_clear = cache_clear
+                cache.set(key, result)
+            return result
+
+        wrapper.cache = cache
+        wrapper.cache_info = cache.info
+        wrapper.cache_clear = cache.clear
         return update_wrapper(wrapper, user_function)
 
     return decorating_function
@@ -160,18 +212,49 @@ class DictCache:
     """A generic dictionary-based cache.
 
     Intended to be used as an object-level cache of method results.
+
+    The estimated size of each value is accounted to the global
+    ``CacheManager``, which evicts least-recently-used entries when the
+    caches of the process exceed their memory budget. Values which are
+    larger than the whole budget are not cached.
     """
 
     def __init__(self):
-        self.cache = {}
+        self.cache = OrderedDict()
+        self.sizes = {}
+        self.nbytes = 0
         self.hits = 0
         self.misses = 0
+        self.last_used = 0
+        manager.register(self)
+
+    def __del__(self):
+        # The module globals may already be gone at interpreter shutdown
+        if manager is not None:
+            manager.release(self.nbytes)
+
+    def __setstate__(self, state):
+        # An unpickled cache is new to this process: its values must be
+        # registered with and accounted to the manager of this process
+        self.__dict__.update(state)
+        self.last_used = 0
+        manager.register(self)
+        manager.allocate(self.nbytes)
 
     def clear(self):
-        self.cache = {}
+        manager.release(self.nbytes)
+        self.cache = OrderedDict()
+        self.sizes = {}
+        self.nbytes = 0
         self.hits = 0
         self.misses = 0
 
+    def __contains__(self, key):
+        """Whether the key is in the cache. Does not update cache
+        statistics.
+        """
+        return key in self.cache
+
     def size(self):
         """Number of items in cache"""
         return len(self.cache)
@@ -180,6 +263,13 @@ class DictCache:
         """Return info about cache hits, misses, and size"""
         return _CacheInfo(self.hits, self.misses, self.size())
 
+    def memory_info(self):
+        """Return info about cache hits, misses, size, and the estimated
+        number of bytes used by the cached values.
+        """
+        return _CacheMemoryInfo(self.hits, self.misses, self.size(),
+                                self.nbytes)
+
     def get(self, key):
         """Get a value out of the cache.
 
@@ -188,13 +278,43 @@ class DictCache:
         """
         if key in self.cache:
             self.hits += 1
+            self.cache.move_to_end(key)
+            self.last_used = manager.tick()
             return self.cache[key]
         self.misses += 1
         return None
 
     def set(self, key, value):
         """Set a value in the cache"""
+        nbytes = sizeof(value)
+        if nbytes > manager.budget():
+            return
+
+        self.discard(key)
         self.cache[key] = value
+        self.sizes[key] = nbytes
+        self.nbytes += nbytes
+        self.last_used = manager.tick()
+        manager.allocate(nbytes)
+
+    def discard(self, key):
+        """Remove a key from the cache, if present."""
+        if key in self.cache:
+            del self.cache[key]
+            nbytes = self.sizes.pop(key, 0)
+            self.nbytes -= nbytes
+            manager.release(nbytes)
+
+    def evict(self):
+        """Evict the least recently used entry.
+
+        Returns:
+            bool: ``False`` if the cache was empty.
+        """
+        if not self.cache:
+            return False
+        self.discard(next(iter(self.cache)))
+        return True
 
     # TODO: handle **kwarg keys if needed
     # See joblib.func_inspect.filter_args
@@ -210,6 +330,282 @@ class DictCache:
         return (_prefix,) + tuple(args)
 
 
+class NodeSetCache(DictCache):
+    """A ``DictCache`` for the results of methods whose arguments are sets of
+    nodes.
+
+    Sets of nodes (tuples and frozensets of node indices) are stored in the
+    keys as integer bitmasks (see :func:`utils.bitmask`), which are smaller
+    and faster to hash. Other arguments, such as node indices, are stored as
+    they are.
+    """
+
+    def key(self, *args, _prefix=None, **kwargs):
+        """Get the cache key for the given function args.
+
+        Kwargs:
+           prefix: A constant to prefix to the key.
+        """
+        if kwargs:
+            raise NotImplementedError(
+                'kwarg cache keys not implemented')
+        return (_prefix,) + tuple(
+            utils.bitmask(arg) if isinstance(arg, (tuple, frozenset)) else arg
+            for arg in args)
+
+
+class TableCache:
+    """A repertoire cache which stores its values in a table instead of a
+    dictionary.
+
+    A key is a pair of arguments, each either a node index or a set of nodes,
+    prefixed by a |Direction|. Sets of nodes are converted to bitmasks (see
+    :func:`utils.bitmask`), and the direction and the first argument select a
+    row of the table, in which the second argument is the column, so values
+    are looked up by position without hashing. The table has
+    ``len(Direction) * 2**n`` rows of length ``2**n``, where ``n`` is the size
+    of the network, so it is only suitable for small networks; rows are
+    allocated when their first value is set.
+
+    Like ``DictCache``, the cached values are accounted to the global
+    ``CacheManager``. Whole rows are evicted, least recently used first.
+
+    Args:
+        n (int): The number of nodes in the network.
+    """
+
+    #: The largest network for which a table is used instead of a
+    #: ``NodeSetCache``. See :data:`config.TABLE_REPERTOIRE_CACHE`.
+    MAX_NODES = 10
+
+    def __init__(self, n):
+        self.n = n
+        self.rows = [None] * (len(Direction) << n)
+        # Maps the indices of allocated rows to their number of bytes, from
+        # the least to the most recently used
+        self.row_sizes = OrderedDict()
+        self.currsize = 0
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.last_used = 0
+        manager.register(self)
+
+    def __del__(self):
+        # The module globals may already be gone at interpreter shutdown
+        if manager is not None:
+            manager.release(self.nbytes)
+
+    def __setstate__(self, state):
+        # See ``DictCache.__setstate__``
+        self.__dict__.update(state)
+        self.last_used = 0
+        manager.register(self)
+        manager.allocate(self.nbytes)
+
+    def clear(self):
+        manager.release(self.nbytes)
+        self.rows = [None] * (len(Direction) << self.n)
+        self.row_sizes = OrderedDict()
+        self.currsize = 0
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __contains__(self, key):
+        """Whether the key is in the cache. Does not update cache
+        statistics.
+        """
+        row = self.rows[key[0]]
+        return row is not None and row[key[1]] is not None
+
+    def size(self):
+        """Number of items in cache"""
+        return self.currsize
+
+    def info(self):
+        """Return info about cache hits, misses, and size"""
+        return _CacheInfo(self.hits, self.misses, self.size())
+
+    def memory_info(self):
+        """Return info about cache hits, misses, size, and the estimated
+        number of bytes used by the cached values.
+        """
+        return _CacheMemoryInfo(self.hits, self.misses, self.size(),
+                                self.nbytes)
+
+    def get(self, key):
+        """Get a value out of the cache.
+
+        Returns None if the key is not in the cache. Updates cache
+        statistics.
+        """
+        row = self.rows[key[0]]
+        if row is not None:
+            value = row[key[1]]
+            if value is not None:
+                self.hits += 1
+                self.row_sizes.move_to_end(key[0])
+                self.last_used = manager.tick()
+                return value
+        self.misses += 1
+        return None
+
+    def set(self, key, value):
+        """Set a value in the cache"""
+        nbytes = sizeof(value)
+        if nbytes > manager.budget():
+            return
+
+        self.discard(key)
+        i, j = key
+        row = self.rows[i]
+        if row is None:
+            row = self.rows[i] = [None] * (1 << self.n)
+            self.row_sizes[i] = 0
+            nbytes += sys.getsizeof(row)
+        else:
+            self.row_sizes.move_to_end(i)
+
+        row[j] = value
+        self.currsize += 1
+        self.row_sizes[i] += nbytes
+        self.nbytes += nbytes
+        self.last_used = manager.tick()
+        manager.allocate(nbytes)
+
+    def discard(self, key):
+        """Remove a key from the cache, if present."""
+        i, j = key
+        row = self.rows[i]
+        if row is not None and row[j] is not None:
+            nbytes = sizeof(row[j])
+            row[j] = None
+            self.currsize -= 1
+            self.row_sizes[i] -= nbytes
+            self.nbytes -= nbytes
+            manager.release(nbytes)
+
+    def evict(self):
+        """Evict the least recently used row.
+
+        Returns:
+            bool: ``False`` if the cache was empty.
+        """
+        if not self.row_sizes:
+            return False
+        i, nbytes = self.row_sizes.popitem(last=False)
+        self.currsize -= sum(value is not None for value in self.rows[i])
+        self.rows[i] = None
+        self.nbytes -= nbytes
+        manager.release(nbytes)
+        return True
+
+    def key(self, a, b, _prefix=None):
+        """Get the cache key for the given function args.
+
+        Args:
+            a (int or tuple[int] or frozenset[int]): A node index or a set of
+                nodes.
+            b (int or tuple[int] or frozenset[int]): A node index or a set of
+                nodes.
+
+        Kwargs:
+            prefix (Direction): The direction of the repertoire.
+        """
+        if isinstance(a, (tuple, frozenset)):
+            a = utils.bitmask(a)
+        if isinstance(b, (tuple, frozenset)):
+            b = utils.bitmask(b)
+        return ((_prefix.value << self.n) | a, b)
+
+
+class CutRepertoireCache:
+    """The repertoire cache of a cut subsystem, which is a view of the
+    repertoire cache of the uncut subsystem.
+
+    Cause repertoires only depend on the TPMs of the nodes of the mechanism,
+    and effect repertoires on those of the nodes of the purview. A cut only
+    changes the TPMs of the nodes whose inputs it severs, so the repertoires
+    which don't depend on any of them are looked up in and added to the cache
+    of the uncut subsystem; the others are kept in a cache of the cut
+    subsystem.
+
+    Keys have the same arguments as those of the repertoire caches: a pair of
+    node indices or sets of nodes (the mechanism first), prefixed by a
+    |Direction|.
+
+    Args:
+        parent (DictCache): The repertoire cache of the uncut subsystem.
+        local (DictCache): The cache for the repertoires changed by the cut.
+        affected (int): The bitmask of the nodes whose inputs are severed by
+            the cut.
+    """
+
+    def __init__(self, parent, local, affected):
+        self.parent = parent
+        self.local = local
+        self.affected = affected
+        self.hits = 0
+        self.misses = 0
+
+    def clear(self):
+        """Clear the local cache. The parent cache is left intact."""
+        self.local.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def __contains__(self, key):
+        """Whether the key is in the parent or local cache. Does not update
+        cache statistics.
+        """
+        shared, key = key
+        return key in (self.parent if shared else self.local)
+
+    def size(self):
+        """Number of items in the local cache"""
+        return self.local.size()
+
+    def info(self):
+        """Return info about cache hits, misses, and size"""
+        return _CacheInfo(self.hits, self.misses, self.size())
+
+    def memory_info(self):
+        """Return info about cache hits, misses, size, and the estimated
+        number of bytes used by the values in the local cache.
+        """
+        return _CacheMemoryInfo(self.hits, self.misses, self.size(),
+                                self.local.memory_info().nbytes)
+
+    def get(self, key):
+        """Get a value out of the parent or local cache."""
+        shared, key = key
+        value = (self.parent if shared else self.local).get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def set(self, key, value):
+        """Set a value in the parent or local cache."""
+        shared, key = key
+        (self.parent if shared else self.local).set(key, value)
+
+    def key(self, mechanism, purview, _prefix=None):
+        """Get the cache key for the given function args.
+
+        The key records whether the value is shared with the parent cache,
+        and the key of the parent or local cache.
+        """
+        nodes = mechanism if _prefix is Direction.CAUSE else purview
+        mask = (utils.bitmask(nodes) if isinstance(nodes, (tuple, frozenset))
+                else 1 << nodes)
+        if mask & self.affected:
+            return (False, self.local.key(mechanism, purview, _prefix=_prefix))
+        return (True, self.parent.key(mechanism, purview, _prefix=_prefix))
+
+
 def redis_init(db):
     return redis.StrictRedis(host=config.REDIS_CONFIG['host'],
                              port=config.REDIS_CONFIG['port'], db=db)
@@ -258,6 +654,17 @@ class RedisCache:
                           info['keyspace_misses'],
                           self.size())
 
+    def memory_info(self):
+        """Return cache information, including the memory used by Redis.
+
+        .. note:: This is not the cache info for the entire Redis key space.
+        """
+        info = redis_conn.info()
+        return _CacheMemoryInfo(info['keyspace_hits'],
+                                info['keyspace_misses'],
+                                self.size(),
+                                info['used_memory'])
+
     def get(self, key):
         """Get a value from the cache.
 
@@ -345,30 +752,445 @@ class RedisMICECache(RedisCache):
             self.subsystem_hash, _prefix, direction, mechanism, purviews)
 
 
+class SharedMemoryStore:
+    """A key-value store in shared memory which is readable by every process
+    of a parallel computation.
+
+    Each process only writes to its own region, so no locking is needed: the
+    parent process writes to region ``0`` and worker ``i`` of the
+    ``WorkerPool`` to region ``i + 1``. A region starts with a header and a
+    directory, followed by a fixed-size open-addressing table of slots and the
+    pickled values. Only the directory of region ``0`` is used: it has one
+    byte per region, which the owner of the region sets once it has created
+    it, so readers only attach to regions which exist.
+    Each slot holds the SHA-1 digest of a key and the location of its value;
+    the digest is written last, so readers never see an incomplete entry.
+    Entries are never removed. When a region is full, further values written
+    by the process are dropped.
+
+    Stores are pickled by name, so a store passed to a worker process is
+    reattached there.
+
+    Args:
+        name (str): The prefix of the names of the regions.
+        size (int): The size, in bytes, of each region.
+    """
+
+    HEADER = struct.Struct('8sQQQ')  # magic, slots, bytes used, entries
+    SLOT = struct.Struct('20sIQ')  # key digest, value length, value offset
+    MAGIC = b'PYPHISHM'
+    EMPTY = bytes(20)
+
+    def __init__(self, name, size):
+        if shared_memory is None:
+            raise RuntimeError(
+                'The shared memory cache requires Python 3.8 or later.')
+        self.name = name
+        self.size = size
+        self.num_slots = size // 1024
+        self.num_regions = self.max_regions()
+        self.slots_start = self.HEADER.size + self.num_regions
+        self.data_start = self.slots_start + self.num_slots * self.SLOT.size
+        self.regions = {}
+        self.pid = None
+        self.writer = None
+        self.full = False
+
+    def _check_writer(self):
+        """Find the region this process writes to.
+
+        This is done again after a fork, since the store may have been
+        inherited from the parent process.
+        """
+        if self.pid != os.getpid():
+            from .compute import parallel
+            index = parallel.get_worker_index()
+            self.pid = os.getpid()
+            self.writer = 0 if index is None else index + 1
+            self.full = False
+
+    @staticmethod
+    def max_regions():
+        """The maximum number of regions: one per worker, plus the parent."""
+        return multiprocessing.cpu_count() + 1
+
+    def __reduce__(self):
+        return (attach_shared_memory_store, (self.name, self.size))
+
+    def _region_name(self, region_id):
+        return '{}_{}'.format(self.name, region_id)
+
+    def _attach(self, region_id):
+        """Return region ``region_id``, or ``None`` if it does not exist yet.
+
+        The region this process writes to is created if necessary.
+        """
+        region = self.regions.get(region_id)
+        if region is not None:
+            return region
+
+        name = self._region_name(region_id)
+        try:
+            region = shared_memory.SharedMemory(name)
+        except FileNotFoundError:
+            self._check_writer()
+            if region_id != self.writer:
+                return None
+            region = shared_memory.SharedMemory(name, create=True,
+                                                size=self.size)
+            region.buf[:self.data_start] = bytes(self.data_start)
+            self.HEADER.pack_into(region.buf, 0, self.MAGIC, self.num_slots,
+                                  self.data_start, 0)
+            self._register(region_id)
+
+        # The resource tracker of a worker process would destroy the regions
+        # when the worker exits; their lifetime is managed by ``unlink``.
+        resource_tracker.unregister(region._name, 'shared_memory')
+
+        self.regions[region_id] = region
+        return region
+
+    def _register(self, region_id):
+        """Record in the directory that region ``region_id`` exists."""
+        if region_id == 0 or region_id >= self.num_regions:
+            return
+        directory = self._attach(0)
+        if directory is not None:
+            directory.buf[self.HEADER.size + region_id] = 1
+
+    def _region_ids(self):
+        """Return the ids of the regions which exist, according to the
+        directory.
+        """
+        directory = self._attach(0)
+        if directory is None:
+            return []
+        flags = bytes(directory.buf[self.HEADER.size:self.slots_start])
+        return [0] + [region_id for region_id in range(1, self.num_regions)
+                      if flags[region_id]]
+
+    @staticmethod
+    def digest(key):
+        """The digest of a key, as stored in a slot."""
+        return hashlib.sha1(key.encode()).digest()
+
+    def _slots(self, digest):
+        """Yield slot offsets in probing order for a digest."""
+        start = int.from_bytes(digest[:8], 'little') % self.num_slots
+        for i in range(self.num_slots):
+            slot = (start + i) % self.num_slots
+            yield self.slots_start + slot * self.SLOT.size
+
+    def _find(self, region, digest):
+        """Return the offset and length of the value of ``digest`` in
+        ``region``, or ``None``.
+        """
+        for offset in self._slots(digest):
+            slot_digest, length, value_offset = self.SLOT.unpack_from(
+                region.buf, offset)
+            if slot_digest == digest:
+                return value_offset, length
+            if slot_digest == self.EMPTY:
+                return None
+        return None
+
+    def get(self, key):
+        """Return the value of ``key`` or ``None`` if it is not stored."""
+        digest = self.digest(key)
+        for region_id in self._region_ids():
+            region = self._attach(region_id)
+            if region is None:
+                continue
+            found = self._find(region, digest)
+            if found is not None:
+                offset, length = found
+                return pickle.loads(region.buf[offset:offset + length])
+        return None
+
+    def set(self, key, value):
+        """Write ``value`` to this process's region.
+
+        The value is dropped if the region is full.
+        """
+        self._check_writer()
+        if self.full:
+            return
+
+        region = self._attach(self.writer)
+        _, _, used, count = self.HEADER.unpack_from(region.buf, 0)
+
+        digest = self.digest(key)
+        data = pickle.dumps(value, protocol=constants.PICKLE_PROTOCOL)
+
+        # Keep the load factor of the table under 1/2
+        if used + len(data) > self.size or 2 * (count + 1) > self.num_slots:
+            self.full = True
+            return
+
+        for offset in self._slots(digest):
+            slot_digest, _, _ = self.SLOT.unpack_from(region.buf, offset)
+            if slot_digest == digest:
+                return
+            if slot_digest == self.EMPTY:
+                break
+
+        region.buf[used:used + len(data)] = data
+        self.HEADER.pack_into(region.buf, 0, self.MAGIC, self.num_slots,
+                              used + len(data), count + 1)
+        self.SLOT.pack_into(region.buf, offset, self.EMPTY, len(data), used)
+        # Commit the entry
+        region.buf[offset:offset + len(digest)] = digest
+
+    def close(self):
+        """Detach from all regions."""
+        for region in self.regions.values():
+            region.close()
+        self.regions = {}
+
+    def unlink(self):
+        """Destroy all regions of this store."""
+        self.close()
+        for region_id in range(self.num_regions):
+            try:
+                region = shared_memory.SharedMemory(
+                    self._region_name(region_id))
+            except FileNotFoundError:
+                continue
+            region.close()
+            region.unlink()  # Also unregisters the region from the tracker
+
+
+_shared_memory_stores = {}
+
+
+def attach_shared_memory_store(name, size):
+    """Return the ``SharedMemoryStore`` with the given name, attaching to it
+    if necessary.
+    """
+    if name not in _shared_memory_stores:
+        _shared_memory_stores[name] = SharedMemoryStore(name, size)
+    return _shared_memory_stores[name]
+
+
+#: The store used by the shared memory caches, keyed by the PID of the
+#: process it was looked up in.
+_process_shared_memory_store = {}
+
+
+def shared_memory_store():
+    """Return the ``SharedMemoryStore`` used by the shared memory caches.
+
+    The store belongs to the main process, i.e. the parent of the worker
+    processes, and its regions are destroyed when that process exits. The
+    store is only looked up once per process.
+    """
+    pid = os.getpid()
+    store = _process_shared_memory_store.get(pid)
+    if store is not None:
+        return store
+
+    from .compute import parallel
+    is_worker = parallel.get_worker_index() is not None
+    main_process = psutil.Process(os.getppid() if is_worker else pid)
+    # Include the creation time so that stale regions left behind by a
+    # process with the same PID are never reused
+    name = 'pyphi_{}_{}'.format(
+        main_process.pid, int(main_process.create_time() * 1000))
+
+    if name not in _shared_memory_stores:
+        store = attach_shared_memory_store(
+            name, config.SHARED_MEMORY_CACHE_SIZE * 2**20)
+        if not is_worker:
+            atexit.register(store.unlink)
+            # Create the region holding the directory before any worker
+            # looks for it
+            store._attach(0)  # pylint: disable=protected-access
+
+    _process_shared_memory_store.clear()
+    _process_shared_memory_store[pid] = _shared_memory_stores[name]
+    return _shared_memory_stores[name]
+
+
+#: The digest of the configuration, keyed by the generation of the
+#: configuration it was computed for.
+_config_digests = {}
+
+
+def _config_digest():
+    """A digest of the current configuration.
+
+    Included in shared memory cache keys, since cached values computed with
+    different configurations may differ. The digest is only recomputed when
+    the configuration changes, e.g. once per job in worker processes.
+    """
+    digest = _config_digests.get(config.generation)
+    if digest is None:
+        digest = hashlib.sha1(
+            repr(sorted(config.snapshot().items())).encode()).hexdigest()[:16]
+        _config_digests.clear()
+        _config_digests[config.generation] = digest
+    return digest
+
+
+def _key_part(value):
+    """Format part of a shared memory cache key deterministically."""
+    if isinstance(value, frozenset):
+        value = tuple(sorted(value))
+    return str(value)
+
+
+class SharedMemoryCache(DictCache):
+    """A cache of subsystem method results which are shared between processes
+    with a ``SharedMemoryStore``.
+
+    Values are also kept in a local dictionary, so each value is unpickled at
+    most once per process. Only values computed on uncut subsystems are
+    published to the store.
+
+    Args:
+        subsystem (Subsystem): The subsystem that this is a cache for.
+    """
+
+    def __init__(self, subsystem):
+        super().__init__()
+        self.subsystem = subsystem
+        self.subsystem_hash = hash(subsystem)
+        self.config_digest = _config_digest()
+        self.store = shared_memory_store()
+
+    def get(self, key):
+        """Get a value from the local cache or the shared store.
+
+        Returns None if the key is not in the cache. Updates cache
+        statistics.
+        """
+        value = super().get(key)
+        if value is None:
+            value = self.get_shared(key)
+            if value is None:
+                return None
+            # Count this as a hit, not a miss
+            self.misses -= 1
+            self.hits += 1
+            super().set(key, value)
+        return value
+
+    def get_shared(self, key):
+        """Get a value from the shared store."""
+        return self.store.get(key)
+
+    def set(self, key, value):
+        """Set a value in the local cache, and publish it to the other
+        processes if the subsystem is uncut.
+        """
+        super().set(key, value)
+        if not self.subsystem.is_cut:
+            self.store.set(key, value)
+
+    def key(self, *args, _prefix=None, **kwargs):
+        """Cache key. This is deterministic, so that the same key is computed
+        in every process.
+        """
+        if kwargs:
+            raise NotImplementedError(
+                'kwarg cache keys not implemented')
+        return ':'.join(
+            ['subsys', str(self.subsystem_hash), self.config_digest,
+             str(_prefix)] + [_key_part(arg) for arg in args])
+
+
+class SharedMemoryMICECache(SharedMemoryCache):
+    """A shared memory cache for |Subsystem.find_mice()|.
+
+    See |MICECache| for more info.
+    """
+
+    def __init__(self, subsystem, parent_cache=None):
+        super().__init__(subsystem)
+
+        if parent_cache is not None:
+            validate_parent_cache(parent_cache)
+            # Only store the hash of the parent subsystem, so that it does not
+            # need to be passed between processes.
+            self.parent_subsystem_hash = parent_cache.subsystem_hash
+        else:
+            self.parent_subsystem_hash = None
+
+    def get_shared(self, key):
+        """Get a |MICE| from the store.
+
+        Only uncut subsystems publish |MICE|, so cut subsystems look for the
+        |MICE| of the parent subsystem and check that it is unaffected by the
+        cut.
+        """
+        if self.parent_subsystem_hash is None:
+            return super().get_shared(key)
+
+        parent_key = key.replace(str(self.subsystem_hash),
+                                 str(self.parent_subsystem_hash), 1)
+        mice = super().get_shared(parent_key)
+
+        if mice is not None and mice.damaged_by_cut(self.subsystem):
+            return None
+
+        return mice
+
+    def set(self, key, mice):
+        """Only need to set if the subsystem is uncut.
+
+        Caches are only inherited from uncut subsystems.
+        """
+        if not self.subsystem.is_cut:
+            super().set(key, mice)
+
+    def key(self, direction, mechanism, purviews=False, _prefix=None):
+        """Cache key. This is the call signature of |Subsystem.find_mice()|."""
+        return super().key(direction, mechanism, purviews, _prefix=_prefix)
+
+
 class DictMICECache(DictCache):
     """A subsystem-local cache for |MICE| objects.
 
+    Uncut subsystems index the cached |MICE| by the connections they depend
+    on (see ``MICE.connection_mask()``). The caches of cut subsystems are views
+    of the parent cache: a |MICE| of the parent is reused if the cut does not
+    sever any of its connections, which is checked with a single bitwise AND
+    when it is looked up.
+
     See |MICECache| for more info.
     """
 
     def __init__(self, subsystem, parent_cache=None):
         super().__init__()
         self.subsystem = subsystem
+        # Maps keys to the connection masks of the cached MICE
+        self.masks = {}
+        self.parent_cache = None
 
         if parent_cache is not None:
             validate_parent_cache(parent_cache)
-            self._build(parent_cache)
+            self.parent_cache = parent_cache
+
+    def clear(self):
+        super().clear()
+        self.masks = {}
 
-    def _build(self, parent_cache):
-        """Build the initial cache from the parent.
+    def get(self, key):
+        """Get a value out of the cache.
 
-        Only include the |MICE| which are unaffected by the subsystem cut.
-        A |MICE| is affected if either the cut splits the mechanism
-        or splits the connections between the purview and mechanism
+        If this is the cache of a cut subsystem, look the |MICE| up in the
+        parent cache and check that it is unaffected by the cut.
         """
-        for key, mice in parent_cache.cache.items():
-            if not mice.damaged_by_cut(self.subsystem):
-                self.cache[key] = mice
+        if self.parent_cache is None:
+            return super().get(key)
+
+        mice = self.parent_cache.cache.get(key)
+        if (mice is not None and
+                not self.parent_cache.masks[key] & self.subsystem.cut_mask):
+            self.hits += 1
+            return mice
+        self.misses += 1
+        return None
 
     def set(self, key, mice):
         """Set a value in the cache.
@@ -382,21 +1204,33 @@ class DictMICECache(DictCache):
             incredibly inefficient because the caches have to be passed
             between process. This will be changed once global caches are
             implemented.
-          - Memory is not too full.
+
+        Entries may be evicted when the memory budget is exceeded.
         """
-        if (not self.subsystem.is_cut and mice.phi > 0 and
-                not memory_full()):
-            self.cache[key] = mice
+        if not self.subsystem.is_cut and mice.phi > 0:
+            super().set(key, mice)
+            if key in self.cache:
+                self.masks[key] = mice.connection_mask(
+                    self.subsystem.network.size)
+
+    def discard(self, key):
+        super().discard(key)
+        self.masks.pop(key, None)
 
     def key(self, direction, mechanism, purviews=False, _prefix=None):
-        """Cache key. This is the call signature of |Subsystem.find_mice()|."""
-        return (_prefix, direction, mechanism, purviews)
+        """Cache key. This is the call signature of |Subsystem.find_mice()|,
+        with the mechanism and purviews as bitmasks.
+        """
+        if purviews is not False:
+            purviews = tuple(utils.bitmask(purview) for purview in purviews)
+        return (_prefix, direction, utils.bitmask(mechanism), purviews)
 
 
 def MICECache(subsystem, parent_cache=None):
     """Construct a |MICE| cache.
 
-    Uses either a Redis-backed cache or a local dict cache on the object.
+    Uses either a Redis-backed cache, a cache shared between processes in
+    shared memory, or a local dict cache on the object.
 
     Args:
         subsystem (Subsystem): The subsystem that this is a cache for.
@@ -409,18 +1243,52 @@ def MICECache(subsystem, parent_cache=None):
     """
     if config.REDIS_CACHE:
         cls = RedisMICECache
+    elif config.SHARED_MEMORY_CACHE:
+        cls = SharedMemoryMICECache
     else:
         cls = DictMICECache
     return cls(subsystem, parent_cache=parent_cache)
 
 
+def RepertoireCache(subsystem):
+    """Construct a cache for the repertoires of a subsystem.
+
+    Uses a cache shared between processes if
+    :data:`config.SHARED_MEMORY_CACHE` is enabled, a ``TableCache`` if
+    :data:`config.TABLE_REPERTOIRE_CACHE` is enabled and the network has at
+    most ``TableCache.MAX_NODES`` nodes, and a local ``NodeSetCache``
+    otherwise.
+
+    Args:
+        subsystem (Subsystem): The subsystem that this is a cache for.
+    """
+    if config.SHARED_MEMORY_CACHE:
+        return SharedMemoryCache(subsystem)
+    if (config.TABLE_REPERTOIRE_CACHE and
+            subsystem.network.size <= TableCache.MAX_NODES):
+        return TableCache(subsystem.network.size)
+    return NodeSetCache()
+
+
+class NodeCache(DictCache):
+    """A network-level cache for the TPMs and single-node repertoires of the
+    nodes of subsystems, which are shared by all subsystems of the network.
+
+    The cache is not copied when the network is pickled, *e.g.* to send it to
+    the processes of a parallel computation.
+    """
+
+    def __reduce__(self):
+        return (type(self), ())
+
+
 class PurviewCache(DictCache):
     """A network-level cache for possible purviews."""
 
     def set(self, key, value):
         """Only set if purview caching is enabled"""
         if config.CACHE_POTENTIAL_PURVIEWS:
-            self.cache[key] = value
+            super().set(key, value)
 
 
 def method(cache_name, key_prefix=None):
@@ -436,7 +1304,8 @@ def method(cache_name, key_prefix=None):
             to the method arguments.
     """
     def decorator(func):
-        if (func.__name__ in ['cause_repertoire', 'effect_repertoire'] and
+        if (func.__name__ in ['cause_repertoire', 'effect_repertoire',
+                              'effect_marginals'] and
                 not config.CACHE_REPERTOIRES):
             return func
 
@@ -6,11 +6,14 @@
 Functions for computing distances between various PyPhi objects.
 """
 
+from collections import defaultdict
+
 import numpy as np
 
-from .. import config, utils
+from .. import Direction, config, utils
 from ..distance import emd
 from ..distance import system_repertoire_distance as repertoire_distance
+from ..models import CauseEffectStructure
 
 
 def concept_distance(c1, c2):
@@ -35,30 +38,175 @@ def concept_distance(c1, c2):
                                 c2.expand_effect_repertoire(effect_purview)))
 
 
-def _ces_distance_simple(C1, C2):
+def _fingerprints(ces):
+    """Return the concepts of a cause-effect structure, or of a plain
+    sequence of concepts, keyed by fingerprint.
+    """
+    if isinstance(ces, CauseEffectStructure):
+        return ces.fingerprints
+    return {concept.fingerprint: concept for concept in ces}
+
+
+def _belongs_to(concept, ces):
+    """Return whether ``concept`` is one of the concepts of ``ces``, so that
+    the data stored on ``ces`` can be used for it.
+
+    This is never the case if ``ces`` is a plain sequence of concepts, or if
+    the concept was computed in another subsystem.
+    """
+    return (isinstance(ces, CauseEffectStructure) and
+            concept.subsystem is ces.subsystem and
+            ces.fingerprints.get(concept.fingerprint) is concept)
+
+
+def _unique_concepts(C1, C2):
+    """Return the concepts of ``C1`` which are not in ``C2`` in the context
+    of an EMD calculation.
+
+    The concepts of ``C2`` are looked up by fingerprint, so only concepts
+    with the same fingerprint have their repertoires compared.
+    """
+    fingerprints = _fingerprints(C2)
+    return [c for c in C1 if not (c.fingerprint in fingerprints and
+                                  c.emd_eq(fingerprints[c.fingerprint]))]
+
+
+def _purview(concept, direction):
+    """Return the cause or effect purview of a concept."""
+    if direction == Direction.CAUSE:
+        return concept.cause.purview
+    return concept.effect.purview
+
+
+def _expand(concept, direction, new_purview, ces=None):
+    """Return the cause or effect repertoire of a concept expanded to a new
+    purview.
+
+    If the concept is in ``ces``, the expanded repertoire is cached on it.
+    """
+    if direction == Direction.CAUSE:
+        expand = concept.expand_cause_repertoire
+    else:
+        expand = concept.expand_effect_repertoire
+
+    if not _belongs_to(concept, ces):
+        return expand(new_purview)
+
+    key = (concept.mechanism, direction, new_purview)
+    repertoire = ces.expanded_repertoires.get(key)
+    if repertoire is None:
+        repertoire = expand(new_purview)
+        ces.expanded_repertoires.set(key, repertoire)
+    return repertoire
+
+
+def _repertoire_distances(c1, concepts, direction, ces=None):
+    """Return the distances between the repertoires of ``c1`` and of each
+    concept, expanded to the union of their purviews.
+
+    Concepts whose union purview with ``c1`` is the same are compared in one
+    batch. If ``c1`` is in ``ces``, its expanded repertoires are stored on it.
+    """
+    batches = defaultdict(list)
+    for i, c2 in enumerate(concepts):
+        new_purview = tuple(set(_purview(c1, direction) +
+                                _purview(c2, direction)))
+        batches[new_purview].append(i)
+
+    distances = np.empty(len(concepts))
+    for new_purview, indices in batches.items():
+        repertoires = np.stack([_expand(concepts[i], direction, new_purview)
+                                for i in indices])
+        distances[indices] = repertoire_distance(
+            _expand(c1, direction, new_purview, ces), repertoires)
+    return distances
+
+
+def concept_distances(c1, concepts, ces=None):
+    """Return the distances in concept space between a concept and each of
+    a list of concepts.
+
+    Args:
+        c1 (Concept): The first concept.
+        concepts (list[Concept]): The other concepts.
+
+    Keyword Args:
+        ces (CauseEffectStructure): The cause-effect structure of ``c1``, if
+            any. The repertoires of ``c1`` expanded to the purviews of the
+            other concepts are stored on it, to be reused when ``c1`` is
+            compared again.
+
+    Returns:
+        np.ndarray: The distance between ``c1`` and each of ``concepts``.
+    """
+    return (_repertoire_distances(c1, concepts, Direction.CAUSE, ces) +
+            _repertoire_distances(c1, concepts, Direction.EFFECT, ces))
+
+
+def _null_distance(concept, ces=None):
+    """Return the distance between a concept and the null concept of its
+    subsystem.
+
+    If the concept is in ``ces``, the distance is looked up in, or added
+    to, the table of null distances of ``ces``.
+    """
+    if not _belongs_to(concept, ces):
+        return concept_distance(concept, concept.subsystem.null_concept)
+
+    if concept.mechanism not in ces.null_distances:
+        ces.null_distances[concept.mechanism] = concept_distance(
+            concept, ces.null_concept)
+    return ces.null_distances[concept.mechanism]
+
+
+def null_distances(ces):
+    """Compute the distance between each concept of a cause-effect structure
+    and the null concept.
+
+    The distances are stored on the |CauseEffectStructure|, by mechanism,
+    along with the null concept. They are therefore computed once for all the
+    cuts of a system, and sent to worker processes with the unpartitioned
+    |CauseEffectStructure|.
+
+    Args:
+        ces (CauseEffectStructure): The cause-effect structure.
+
+    Returns:
+        dict[tuple[int], float]: The distance of each concept to the null
+        concept, keyed by mechanism.
+    """
+    for concept in ces:
+        _null_distance(concept, ces)
+    return ces.null_distances
+
+
+def _ces_distance_simple(C1, C2, destroyed_in_C1, destroyed_in_C2):
     """Return the distance between two cause-effect structures.
 
     Assumes the only difference between them is that some concepts have
     disappeared.
+
+    Args:
+        C1 (CauseEffectStructure): The first |CauseEffectStructure|.
+        C2 (CauseEffectStructure): The second |CauseEffectStructure|.
+        destroyed_in_C1 (list[Concept]): The concepts which are only in
+            ``C1``.
+        destroyed_in_C2 (list[Concept]): The concepts which are only in
+            ``C2``.
     """
-    # Make C1 refer to the bigger CES.
-    if len(C2) > len(C1):
-        C1, C2 = C2, C1
-    destroyed = [c1 for c1 in C1 if not any(c1.emd_eq(c2) for c2 in C2)]
-    return sum(c.phi * concept_distance(c, c.subsystem.null_concept)
-               for c in destroyed)
+    return (sum(c.phi * _null_distance(c, C1) for c in destroyed_in_C1) +
+            sum(c.phi * _null_distance(c, C2) for c in destroyed_in_C2))
 
 
-def _ces_distance_emd(unique_C1, unique_C2):
+def _ces_distance_emd(C1, C2, unique_C1, unique_C2):
     """Return the distance between two cause-effect structures.
 
     Uses the generalized EMD.
     """
     # Get the pairwise distances between the concepts in the unpartitioned and
     # partitioned CESs.
-    distances = np.array([
-        [concept_distance(i, j) for j in unique_C2] for i in unique_C1
-    ])
+    distances = np.array([concept_distances(i, unique_C2, ces=C1)
+                          for i in unique_C1])
     # We need distances from all concepts---in both the unpartitioned and
     # partitioned CESs---to the null concept, because:
     # - often a concept in the unpartitioned CES is destroyed by a
@@ -66,10 +214,9 @@ def _ces_distance_emd(unique_C1, unique_C2):
     # - in certain cases, the partitioned system will have *greater* sum of
     #   small-phi, even though it has less big-phi, which means that some
     #   partitioned-CES concepts will be moved to the null concept.
-    distances_to_null = np.array([
-        concept_distance(c, c.subsystem.null_concept)
-        for ces in (unique_C1, unique_C2) for c in ces
-    ])
+    distances_to_null = np.array(
+        [_null_distance(c, C1) for c in unique_C1] +
+        [_null_distance(c, C2) for c in unique_C2])
     # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
     # Now we make the distance matrix, which will look like this:
     #
@@ -118,13 +265,19 @@ def _ces_distance_emd(unique_C1, unique_C2):
     return emd(np.array(d1), np.array(d2), distance_matrix)
 
 
-def ces_distance(C1, C2):
+def ces_distance(C1, C2, changed=None):
     """Return the distance between two cause-effect structures.
 
     Args:
         C1 (CauseEffectStructure): The first |CauseEffectStructure|.
         C2 (CauseEffectStructure): The second |CauseEffectStructure|.
 
+    Keyword Args:
+        changed (tuple[list[Concept]]): The concepts which are only in ``C1``
+            and those which are only in ``C2``, if they are already known.
+            Otherwise, they are found by matching the fingerprints of the
+            concepts (see ``Concept.fingerprint``).
+
     Returns:
         float: The distance between the two cause-effect structures in concept
         space.
@@ -132,20 +285,79 @@ def ces_distance(C1, C2):
     if config.USE_SMALL_PHI_DIFFERENCE_FOR_CES_DISTANCE:
         return round(small_phi_ces_distance(C1, C2), config.PRECISION)
 
-    concepts_only_in_C1 = [
-        c1 for c1 in C1 if not any(c1.emd_eq(c2) for c2 in C2)]
-    concepts_only_in_C2 = [
-        c2 for c2 in C2 if not any(c2.emd_eq(c1) for c1 in C1)]
+    if changed is None:
+        changed = (_unique_concepts(C1, C2), _unique_concepts(C2, C1))
+    concepts_only_in_C1, concepts_only_in_C2 = changed
+
     # If the only difference in the CESs is that some concepts
     # disappeared, then we don't need to use the EMD.
     if not concepts_only_in_C1 or not concepts_only_in_C2:
-        dist = _ces_distance_simple(C1, C2)
+        dist = _ces_distance_simple(C1, C2, concepts_only_in_C1,
+                                    concepts_only_in_C2)
     else:
-        dist = _ces_distance_emd(concepts_only_in_C1, concepts_only_in_C2)
+        dist = _ces_distance_emd(C1, C2, concepts_only_in_C1,
+                                 concepts_only_in_C2)
 
     return round(dist, config.PRECISION)
 
 
+#: Measures for which ``concept_distance`` satisfies the triangle inequality.
+_METRIC_MEASURES = ('EMD', 'L1', 'ENTROPY_DIFFERENCE')
+
+
+def ces_distance_lower_bound(concepts_only_in_C1, concepts_only_in_C2,
+                             C1=None, C2=None):
+    """Return a lower bound on the distance between two cause-effect
+    structures which differ by the given concepts.
+
+    Each concept is placed on a line at its distance to the null concept.
+    By the triangle inequality, moving |small_phi| between two concepts costs
+    at least the difference of their positions, so the EMD between the
+    concepts on the line is a lower bound on the generalized EMD used by
+    ``ces_distance``. Only the distances to the null concept are computed.
+
+    Args:
+        concepts_only_in_C1 (list[Concept]): The concepts which are only in
+            the first |CauseEffectStructure|.
+        concepts_only_in_C2 (list[Concept]): The concepts which are only in
+            the second |CauseEffectStructure|.
+
+    Keyword Args:
+        C1 (CauseEffectStructure): The first |CauseEffectStructure|, whose
+            table of null distances is used if given.
+        C2 (CauseEffectStructure): The second |CauseEffectStructure|, whose
+            table of null distances is used if given.
+
+    Returns:
+        float: The lower bound, or 0 if no bound can be computed for the
+        current |MEASURE|.
+    """
+    if config.USE_SMALL_PHI_DIFFERENCE_FOR_CES_DISTANCE:
+        return small_phi_ces_distance(concepts_only_in_C1,
+                                      concepts_only_in_C2)
+
+    # Phi which disappeared is moved to the null concept, at position 0.
+    destroyed_phi = (sum(c.phi for c in concepts_only_in_C1) -
+                     sum(c.phi for c in concepts_only_in_C2))
+
+    if config.MEASURE not in _METRIC_MEASURES or destroyed_phi < 0:
+        return 0
+
+    masses = sorted(
+        [(_null_distance(c, C1), c.phi) for c in concepts_only_in_C1] +
+        [(_null_distance(c, C2), -c.phi) for c in concepts_only_in_C2] +
+        [(0, -destroyed_phi)])
+
+    # The EMD on a line is the integral of the absolute difference of the
+    # cumulative distributions.
+    bound, cumulative = 0, 0
+    for (x, mass), (next_x, _) in zip(masses, masses[1:]):
+        cumulative += mass
+        bound += abs(cumulative) * (next_x - x)
+
+    return bound
+
+
 def small_phi_ces_distance(C1, C2):
     """Return the difference in |small_phi| between |CauseEffectStructure|."""
     return sum(c.phi for c in C1) - sum(c.phi for c in C2)
@@ -8,27 +8,52 @@ Functions for computing network-level properties.
 
 import logging
 
-from .. import config, exceptions, utils, validate
+import numpy as np
+
+from .. import config, connectivity, utils, validate
 from ..models import _null_sia
 from ..subsystem import Subsystem
+from ..tpm import reachable_subsets
 from .parallel import MapReduce
-from .subsystem import sia
+from .subsystem import _ces, has_upper_bound, phi_upper_bound, sia
 
 # Create a logger for this module.
 log = logging.getLogger(__name__)
 
 
-def _reachable_subsystems(network, indices, state):
-    """A generator over all subsystems in a valid state."""
+def _reachable_subsets(network, indices, state, strong=False):
+    """A generator over the subsets of nodes of all subsystems in a valid
+    state.
+
+    Subsets of nodes are checked in bulk, so no |Subsystem| is built.
+
+    Keyword Args:
+        strong (bool): If ``True``, only return the subsets of strongly
+            connected subsystems.
+    """
     validate.is_network(network)
+    validate.state_length(state, network.size)
+
+    candidates = np.ones(2 ** network.size, dtype=bool)
+    if config.VALIDATE_SUBSYSTEM_STATES:
+        candidates &= reachable_subsets(network.tpm, state)
+    if strong:
+        candidates &= connectivity.strong_subsets(network.cm)
 
     # Return subsystems largest to smallest to optimize parallel
     # resource usage.
     for subset in utils.powerset(indices, nonempty=True, reverse=True):
-        try:
-            yield Subsystem(network, state, subset)
-        except exceptions.StateUnreachableError:
-            pass
+        if candidates[sum(1 << i for i in subset)]:
+            yield subset
+
+
+def _reachable_subsystems(network, indices, state, strong=False):
+    """A generator over all subsystems in a valid state.
+
+    See :func:`_reachable_subsets`.
+    """
+    for subset in _reachable_subsets(network, indices, state, strong=strong):
+        yield Subsystem(network, state, subset)
 
 
 def subsystems(network, state):
@@ -129,13 +154,73 @@ def complexes(network, state):
         SystemIrreducibilityAnalysis: A |SIA| for each |Subsystem| of the
         |Network|, excluding those with |big_phi = 0|.
     """
-    engine = FindIrreducibleComplexes(possible_complexes(network, state))
+    # Subsystems which are not strongly connected have zero phi, so they are
+    # skipped without building them.
+    engine = FindIrreducibleComplexes(_reachable_subsystems(
+        network, network.causally_significant_nodes, state, strong=True))
     return engine.run(config.PARALLEL_COMPLEX_EVALUATION)
 
 
+class FindMajorComplex(MapReduce):
+    """Computation engine for finding the major complex of a network.
+
+    The objects are the node indices of the candidate subsystems, which are
+    only built when they are evaluated. Once a complex has been found, the
+    upper bound on the |big_phi| of each candidate is computed from its
+    unpartitioned |CauseEffectStructure| (see
+    :func:`~pyphi.compute.subsystem.phi_upper_bound`), and the candidate is
+    skipped if its bound is less than the |big_phi| of the best |SIA| found
+    so far. Otherwise the cause-effect structure is reused to compute its
+    |SIA|.
+    """
+    # pylint: disable=unused-argument,arguments-differ
+
+    description = 'Finding major complex'
+
+    def empty_result(self, network, state):
+        return None
+
+    @staticmethod
+    def bound(best_sia):
+        """Subsystems must be able to beat the best SIA."""
+        if best_sia is None:
+            return None
+        return best_sia.phi
+
+    @staticmethod
+    def compute(node_indices, network, state, bound=None):
+        subsystem = Subsystem(network, state, node_indices)
+        if bound is None or not has_upper_bound(subsystem):
+            return sia(subsystem)
+
+        unpartitioned_ces = _ces(subsystem)
+        upper_bound = phi_upper_bound(subsystem, unpartitioned_ces)
+        if upper_bound < bound and not utils.eq(upper_bound, bound):
+            return None
+        return sia(subsystem, unpartitioned_ces)
+
+    @staticmethod
+    def compact_result(new_sia, best_sia, network, state):
+        """Only send SIAs which improve on the best SIA of this worker."""
+        if best_sia is None or new_sia > best_sia:
+            return new_sia, new_sia
+        return None, best_sia
+
+    def process_result(self, new_sia, best_sia):
+        if new_sia.phi > 0 and (best_sia is None or new_sia > best_sia):
+            return new_sia
+        return best_sia
+
+
 def major_complex(network, state):
     """Return the major complex of the network.
 
+    Candidates are evaluated from largest to smallest, and those whose upper
+    bound on |big_phi| (see
+    :func:`~pyphi.compute.subsystem.phi_upper_bound`) is less than the
+    |big_phi| of the best complex found so far are skipped without evaluating
+    their cuts.
+
     Args:
         network (Network): The |Network| of interest.
         state (tuple[int]): The state of the network (a binary tuple).
@@ -146,10 +231,13 @@ def major_complex(network, state):
     """
     log.info('Calculating major complex...')
 
-    result = complexes(network, state)
-    if result:
-        result = max(result)
-    else:
+    # Subsystems which are not strongly connected have zero phi.
+    candidates = _reachable_subsets(
+        network, network.causally_significant_nodes, state, strong=True)
+
+    result = FindMajorComplex(candidates, network, state).run(
+        config.PARALLEL_COMPLEX_EVALUATION)
+    if result is None:
         empty_subsystem = Subsystem(network, state, ())
         result = _null_sia(empty_subsystem)
 
@@ -7,11 +7,14 @@
 Utilities for parallel computation.
 """
 
+import atexit
 import logging
 import multiprocessing
+import pickle
 import sys
 import threading
-from itertools import chain, islice
+import time
+from itertools import islice
 
 from tblib import Traceback
 from tqdm import tqdm
@@ -64,8 +67,305 @@ class ExceptionWrapper:
         raise self.exception.with_traceback(self.tb.as_traceback())
 
 
+class JobCancelled(Exception):
+    """Raised by ``checkpoint`` when the computation running in a worker
+    process has been cancelled."""
+
+
 POISON_PILL = None
-Q_MAX_SIZE = multiprocessing.synchronize.SEM_VALUE_MAX
+
+#: The number of chunks each worker process may have in flight at once.
+CHUNKS_PER_PROCESS = 2
+#: The wall-clock time, in seconds, a worker should spend on each chunk.
+TARGET_CHUNK_DURATION = 0.05
+#: The largest allowed number of objects in a chunk.
+MAX_CHUNK_SIZE = 4096
+
+
+# The index of this worker process in the pool, the id of the job it is
+# computing, and the id of the most recent cancelled job. Only set in worker
+# processes.
+_worker_index = None
+_job_id = None
+_cancelled = None
+
+
+def get_worker_index():
+    """Return the index of this process in the ``WorkerPool``, or ``None`` if
+    this is not a worker process.
+    """
+    return _worker_index
+
+
+def checkpoint():
+    """Stop the current computation if it has been cancelled.
+
+    Long-running computations call this regularly so that work which is no
+    longer needed, e.g. because another worker found a cut with |big_phi = 0|,
+    stops promptly instead of running to completion. This is a no-op outside
+    of worker processes.
+
+    Raises:
+        JobCancelled: If this is a worker process and its current job has
+            been cancelled.
+    """
+    if _cancelled is not None and _job_id <= _cancelled.value:
+        raise JobCancelled()
+
+
+def worker(index, task_queue, result_queue, log_queue, job_queue,
+           cancelled):  # coverage: disable
+    """A worker process of a ``WorkerPool``, run by
+    ``multiprocessing.Process``.
+
+    Tasks are ``(job_id, chunk)`` pairs, where ``chunk`` is a list of objects
+    to compute. When the worker receives the first task of a new job it reads
+    the job's compute function, context and configuration from its private
+    ``job_queue``. Every task is answered with exactly one message: either an
+    ``ExceptionWrapper`` or a ``(results, num_computed, elapsed)`` triple
+    holding the results sent back by the job's ``compact_result`` function,
+    the number of objects computed and the time spent computing them. If the
+    job is cancelled the worker stops early, so ``num_computed`` may be less
+    than the size of the chunk.
+    """
+    # pylint: disable=global-statement
+    global _pool, _worker_index, _job_id, _cancelled
+    _pool = None
+    _worker_index = index
+    _cancelled = cancelled
+    MapReduce._forked = True
+
+    configure_worker_logging(log_queue)
+    log.debug('Worker process starting...')
+
+    job_id, job, local_result = None, None, None
+
+    for task_job_id, chunk in iter(task_queue.get, POISON_PILL):
+        try:
+            if task_job_id != job_id:
+                job_id, job, local_result = task_job_id, None, None
+                _job_id = job_id
+                job = load_job(job_queue, job_id, log_queue)
+
+            start = time.perf_counter()
+            results = []
+            num_computed = 0
+
+            for obj in chunk:
+                try:
+                    checkpoint()
+                    compute, bound, compact_result, context = job
+                    log.debug('Worker got %s', obj)
+                    result = compute_bounded(compute, bound, obj, context,
+                                             local_result)
+                    if result is not None:
+                        result, local_result = compact_result(
+                            result, local_result, *context)
+                except JobCancelled:
+                    log.debug('Worker skipping remainder of chunk')
+                    break
+
+                num_computed += 1
+                if result is not None:
+                    results.append(result)
+                log.debug('Worker finished %s', obj)
+
+            result_queue.put(
+                (results, num_computed, time.perf_counter() - start))
+
+        except Exception as e:  # pylint: disable=broad-except
+            result_queue.put(ExceptionWrapper(e))
+
+    log.debug('Worker process exiting')
+
+
+def load_job(job_queue, job_id, log_queue):  # coverage: disable
+    """Read the description of job ``job_id`` from ``job_queue``.
+
+    Descriptions of jobs for which this worker received no tasks are
+    discarded. The parent's configuration is loaded before returning the
+    compute function, ``bound`` and ``compact_result`` functions and context
+    of the job.
+    """
+    while True:
+        header_job_id, payload = job_queue.get()
+        if header_job_id == job_id:
+            break
+
+    compute, bound, compact_result, context, snapshot = pickle.loads(payload)
+
+    current = config.snapshot()
+    changed = {k: v for k, v in snapshot.items() if current.get(k) != v}
+    if changed:
+        config.load_dict(changed)
+        # Changing a logging option resets the logging handlers
+        if any(k.startswith('LOG_') for k in changed):
+            configure_worker_logging(log_queue)
+
+    return compute, bound, compact_result, context
+
+
+def compute_bounded(compute, bound, obj, context, result):
+    """Call ``compute`` with the bound derived from ``result``, if any.
+
+    See ``MapReduce.bound``.
+    """
+    bound = bound(result)
+    if bound is None:
+        return compute(obj, *context)
+    return compute(obj, *context, bound=bound)
+
+
+class WorkerPool:
+    """A pool of long-lived worker processes shared by all ``MapReduce``
+    engines.
+
+    Creating processes, queues and a log thread for every parallel
+    computation is expensive when many small computations are run in a row,
+    e.g. when evaluating every subsystem of a network. The pool is started
+    lazily by ``get_pool`` and shut down when the interpreter exits.
+
+    Args:
+        num_processes (int): The number of worker processes to start.
+
+    Attributes:
+        task_queue (multiprocessing.Queue): Queue of ``(job_id, chunk)``
+            tasks.
+        result_queue (multiprocessing.Queue): Queue of results.
+        job_queues (list[multiprocessing.Queue]): Queues, one per worker, on
+            which job descriptions are sent.
+        cancelled (multiprocessing.Value): The id of the most recent
+            cancelled job. Workers skip any task belonging to a job with a
+            lower or equal id.
+    """
+
+    def __init__(self, num_processes):
+        self.num_processes = num_processes
+        self.last_job_id = 0
+
+        self.task_queue = multiprocessing.Queue()
+        self.result_queue = multiprocessing.Queue()
+        self.log_queue = multiprocessing.Queue()
+        self.job_queues = [multiprocessing.Queue()
+                           for i in range(num_processes)]
+        self.cancelled = multiprocessing.Value('l', 0, lock=False)
+
+        self.processes = [
+            multiprocessing.Process(
+                target=worker, daemon=True,
+                args=(index, self.task_queue, self.result_queue,
+                      self.log_queue, job_queue, self.cancelled))
+            for index, job_queue in enumerate(self.job_queues)]
+
+        for process in self.processes:
+            process.start()
+
+        self.log_thread = LogThread(self.log_queue)
+        self.log_thread.start()
+
+    def is_alive(self):
+        """Return ``True`` if all worker processes are running."""
+        return all(process.is_alive() for process in self.processes)
+
+    def start_job(self, compute, bound, compact_result, context):
+        """Send the description of a new job to every worker and return the
+        id of the job.
+        """
+        self.last_job_id += 1
+        payload = pickle.dumps(
+            (compute, bound, compact_result, context, config.snapshot()),
+            protocol=pickle.HIGHEST_PROTOCOL)
+        for job_queue in self.job_queues:
+            job_queue.put((self.last_job_id, payload))
+        return self.last_job_id
+
+    def put(self, job_id, chunk):
+        """Enqueue a chunk of objects to compute for job ``job_id``."""
+        log.debug('Putting chunk of %s on queue', len(chunk))
+        self.task_queue.put((job_id, chunk))
+
+    def get(self):
+        """Return the next result sent by a worker."""
+        return self.result_queue.get()
+
+    def cancel(self, job_id):
+        """Signal workers to skip any remaining tasks of job ``job_id``."""
+        self.cancelled.value = job_id
+
+    def shutdown(self, timeout=1):
+        """Stop the worker processes and the log thread."""
+        log.debug('Shutting down worker pool')
+        for _ in self.processes:
+            self.task_queue.put(POISON_PILL)
+
+        for process in self.processes:
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+
+        self.log_queue.put(POISON_PILL)
+        self.log_thread.join(timeout)
+
+        for q in [self.task_queue, self.result_queue, self.log_queue] + \
+                self.job_queues:
+            q.close()
+
+    def terminate(self):
+        """Kill the worker processes immediately.
+
+        Used when the state of the queues is unknown, e.g. if a computation
+        is interrupted while tasks are still in flight.
+        """
+        log.debug('Terminating worker pool')
+        for process in self.processes:
+            process.terminate()
+
+        self.log_queue.put(POISON_PILL)
+
+
+_pool = None
+
+
+def get_pool():
+    """Return the shared ``WorkerPool``, starting it if necessary.
+
+    The pool is restarted if ``config.NUMBER_OF_CORES`` has changed since it
+    was started.
+    """
+    global _pool  # pylint: disable=global-statement
+
+    num_processes = get_num_processes()
+
+    if _pool is not None and (_pool.num_processes != num_processes or
+                              not _pool.is_alive()):
+        shutdown_pool()
+
+    if _pool is None:
+        log.debug('Starting worker pool with %s processes', num_processes)
+        _pool = WorkerPool(num_processes)
+
+    return _pool
+
+
+def shutdown_pool():
+    """Shut down the shared ``WorkerPool``, if it is running."""
+    global _pool  # pylint: disable=global-statement
+
+    if _pool is not None:
+        pool, _pool = _pool, None
+        pool.shutdown()
+
+
+def terminate_pool():
+    """Kill the shared ``WorkerPool``, if it is running."""
+    global _pool  # pylint: disable=global-statement
+
+    if _pool is not None:
+        pool, _pool = _pool, None
+        pool.terminate()
+
+
+atexit.register(shutdown_pool)
 
 
 class MapReduce:
@@ -85,16 +385,34 @@ class MapReduce:
         - ``compute``, (map), and
         - ``process_result`` (reduce).
 
+    Subclasses may skip objects whose result cannot improve on the current
+    result by implementing::
+
+        - ``bound``, which derives a bound from the current result that is
+          passed to ``compute``.
+
+    Subclasses may also reduce results in the worker processes, so that only
+    small records have to be sent back to the parent, by implementing::
+
+        - ``compact_result`` (worker-side reduce), and
+        - ``expand_result``, which turns the final reduced record back into a
+          full result.
+
     The engine includes a builtin ``tqdm`` progress bar; this can be disabled
     by setting ``pyphi.config.PROGRESS_BARS`` to ``False``.
 
-    Parallel operations start a daemon thread which handles log messages sent
-    from worker processes.
-
-    Subprocesses spawned by ``MapReduce`` cannot spawn more subprocesses; be
-    aware of this when composing nested computations. This is not an issue in
-    practice because it is typically most efficient to only parallelize the top
-    level computation.
+    Parallel computations are run by the shared ``WorkerPool`` returned by
+    ``get_pool``. ``compute`` and the context are pickled and sent to the
+    workers once per computation, so they must be picklable. Objects are sent
+    to the workers in chunks, and at most ``CHUNKS_PER_PROCESS`` chunks per
+    worker are in flight at any time. The size of the chunks adapts to the
+    measured time per object so that each chunk takes about
+    ``TARGET_CHUNK_DURATION`` seconds to compute.
+
+    Subprocesses spawned by ``MapReduce`` cannot spawn more subprocesses;
+    computations started in a worker process are always run sequentially.
+    This is not an issue in practice because it is typically most efficient to
+    only parallelize the top level computation.
     """
 
     # Description for the tqdm progress bar
@@ -107,14 +425,13 @@ class MapReduce:
         self.progress = self.init_progress_bar()
 
         # Attributes used by parallel computations
-        self.task_queue = None
-        self.result_queue = None
-        self.log_queue = None
-        self.log_thread = None
-        self.processes = None
-        self.num_processes = None
+        self.pool = None
+        self.job_id = None
         self.tasks = None
-        self.complete = None
+        self.num_pending = None
+        self.max_pending = None
+        self.chunksize = None
+        self.latency = None
 
     def empty_result(self, *context):
         """Return the default result with which to begin the computation."""
@@ -137,6 +454,44 @@ class MapReduce:
         """
         raise NotImplementedError
 
+    @staticmethod
+    def bound(result):
+        """Return a bound on the results which improve on ``result``.
+
+        If this is not ``None``, it is passed to ``compute`` as the ``bound``
+        keyword argument. ``compute`` may then return ``None`` instead of a
+        result which does not improve on the bound; such results are
+        discarded. In parallel computations, ``result`` is the local result of
+        the worker (see ``compact_result``), or ``None`` before the first
+        result.
+
+        The default implementation returns ``None``.
+        """
+        return None
+
+    @staticmethod
+    def compact_result(new_result, local_result, *context):
+        """Worker-side reduce handler.
+
+        In parallel computations, this is called in the worker process with
+        every result of ``compute`` and the value returned for the previous
+        result computed by this worker for the same computation (``None`` for
+        the first one). It returns a ``(record, local_result)`` pair, where
+        ``record`` is sent to the parent and passed to ``process_result`` in
+        place of ``new_result``. Nothing is sent if ``record`` is ``None``.
+
+        The default implementation sends every result unchanged.
+        """
+        return new_result, local_result
+
+    def expand_result(self, result):
+        """Return the final result of a parallel computation, given the
+        result reduced from the records sent by ``compact_result``.
+
+        The default implementation returns ``result`` unchanged.
+        """
+        return result
+
     #: Is this process a subprocess in a parallel computation?
     _forked = False
 
@@ -157,80 +512,59 @@ class MapReduce:
         return tqdm(total=total, disable=disable, leave=False,
                     desc=self.description)
 
-    @staticmethod  # coverage: disable
-    def worker(compute, task_queue, result_queue, log_queue, complete,
-               *context):
-        """A worker process, run by ``multiprocessing.Process``."""
-        try:
-            MapReduce._forked = True
-            log.debug('Worker process starting...')
-
-            configure_worker_logging(log_queue)
-
-            for obj in iter(task_queue.get, POISON_PILL):
-                if complete.is_set():
-                    log.debug('Worker received signal - exiting early')
-                    break
-
-                log.debug('Worker got %s', obj)
-                result_queue.put(compute(obj, *context))
-                log.debug('Worker finished %s', obj)
-
-            result_queue.put(POISON_PILL)
-            log.debug('Worker process exiting')
-
-        except Exception as e:  # pylint: disable=broad-except
-            result_queue.put(ExceptionWrapper(e))
-
     def start_parallel(self):
-        """Initialize all queues and start the worker processes and the log
-        thread.
-        """
-        self.num_processes = get_num_processes()
+        """Start a new job on the worker pool and enqueue the first tasks."""
+        self.pool = get_pool()
+        self.job_id = self.pool.start_job(self.compute, self.bound,
+                                          self.compact_result, self.context)
+        self.num_pending = 0
+        self.max_pending = CHUNKS_PER_PROCESS * self.pool.num_processes
+        self.chunksize = 1
+        self.latency = None
+        self.initialize_tasks()
 
-        self.task_queue = multiprocessing.Queue(maxsize=Q_MAX_SIZE)
-        self.result_queue = multiprocessing.Queue()
-        self.log_queue = multiprocessing.Queue()
+    def initialize_tasks(self):
+        """Fill the in-flight window with chunks.
 
-        # Used to signal worker processes when a result is found that allows
-        # the computation to terminate early.
-        self.complete = multiprocessing.Event()
+        Further chunks are enqueued as results are returned.
+        """
+        self.tasks = iter(self.iterable)
+        self.maybe_put_tasks()
 
-        args = (self.compute, self.task_queue, self.result_queue,
-                self.log_queue, self.complete) + self.context
-        self.processes = [
-            multiprocessing.Process(target=self.worker, args=args, daemon=True)
-            for i in range(self.num_processes)]
+    def maybe_put_tasks(self):
+        """Enqueue chunks of waiting tasks until the in-flight window is full
+        or there are no tasks left.
+        """
+        while self.tasks is not None and self.num_pending < self.max_pending:
+            chunk = list(islice(self.tasks, self.chunksize))
+            if not chunk:
+                self.tasks = None
+                break
+            self.pool.put(self.job_id, chunk)
+            self.num_pending += 1
 
-        for process in self.processes:
-            process.start()
+    def update_chunksize(self, num_results, elapsed):
+        """Adapt the chunk size to the time taken to compute a chunk."""
+        if not num_results:
+            return
 
-        self.log_thread = LogThread(self.log_queue)
-        self.log_thread.start()
+        latency = elapsed / num_results
+        if self.latency is None:
+            self.latency = latency
+        else:
+            self.latency = 0.5 * (self.latency + latency)
 
-        self.initialize_tasks()
+        self.chunksize = int(min(
+            MAX_CHUNK_SIZE,
+            max(1, TARGET_CHUNK_DURATION / max(self.latency, 1e-9))))
 
-    def initialize_tasks(self):
-        """Load the input queue to capacity.
-
-        Overfilling causes a deadlock when `queue.put` blocks when
-        full, so further tasks are enqueued as results are returned.
+    def get_result(self):
+        """Return the next chunk of results of this job from the worker
+        pool.
         """
-        # Add a poison pill to shutdown each process.
-        self.tasks = chain(self.iterable, [POISON_PILL] * self.num_processes)
-        for task in islice(self.tasks, Q_MAX_SIZE):
-            log.debug('Putting %s on queue', task)
-            self.task_queue.put(task)
-
-    def maybe_put_task(self):
-        """Enqueue the next task, if there are any waiting."""
-        try:
-            task = next(self.tasks)
-        except StopIteration:
-            pass
-        else:
-            log.debug('Putting %s on queue', task)
-            self.task_queue.put(task)
+        r = self.pool.get()
+        self.num_pending -= 1
+        return r
 
     def run_parallel(self):
         """Perform the computation in parallel, reading results from the output
@@ -241,26 +575,38 @@ class MapReduce:
 
             result = self.empty_result(*self.context)
 
-            while self.num_processes > 0:
-                r = self.result_queue.get()
-                self.maybe_put_task()
-
-                if r is POISON_PILL:
-                    self.num_processes -= 1
+            while self.num_pending > 0 and not self.done:
+                r = self.get_result()
 
-                elif isinstance(r, ExceptionWrapper):
+                if isinstance(r, ExceptionWrapper):
+                    self.finish_parallel()
                     r.reraise()
 
-                else:
-                    result = self.process_result(r, result)
-                    self.progress.update(1)
+                results, num_computed, elapsed = r
+                self.update_chunksize(num_computed, elapsed)
+                self.progress.update(num_computed)
+
+                for new_result in results:
+                    result = self.process_result(new_result, result)
 
                     # Did `process_result` decide to terminate early?
                     if self.done:
-                        self.complete.set()
+                        break
+                else:
+                    self.maybe_put_tasks()
 
             self.finish_parallel()
+
+            result = self.expand_result(result)
+
         except Exception:
+            # The pool is still usable: let workers skip the rest of the job.
+            if self.num_pending:
+                self.finish_parallel()
+            raise
+        except BaseException:
+            # E.g. ``KeyboardInterrupt``; tasks may be left in the queues.
+            terminate_pool()
             raise
         finally:
             log.debug('Removing progress bar')
@@ -269,20 +615,17 @@ class MapReduce:
         return result
 
     def finish_parallel(self):
-        """Orderly shutdown of workers."""
-        for process in self.processes:
-            process.join()
+        """Cancel the remaining chunks of this job and wait for the workers to
+        acknowledge them.
 
-        # Shutdown the log thread
-        log.debug('Joining log thread')
-        self.log_queue.put(POISON_PILL)
-        self.log_thread.join()
-        self.log_queue.close()
+        Every chunk is answered exactly once, so no stale results are left in
+        the pool when this returns.
+        """
+        if self.num_pending:
+            self.pool.cancel(self.job_id)
 
-        # Close all queues
-        log.debug('Closing queues')
-        self.task_queue.close()
-        self.result_queue.close()
+        while self.num_pending > 0:
+            self.get_result()
 
     def run_sequential(self):
         """Perform the computation sequentially, only holding two computed
@@ -292,8 +635,11 @@ class MapReduce:
             result = self.empty_result(*self.context)
 
             for obj in self.iterable:
-                r = self.compute(obj, *self.context)
-                result = self.process_result(r, result)
+                checkpoint()
+                r = compute_bounded(self.compute, self.bound, obj,
+                                    self.context, result)
+                if r is not None:
+                    result = self.process_result(r, result)
                 self.progress.update(1)
 
                 # Short-circuited?
@@ -311,16 +657,16 @@ class MapReduce:
 
         Keyword Args:
             parallel (boolean): If True, run the computation in parallel.
-                Otherwise, operate sequentially.
+                Otherwise, operate sequentially. Computations started in a
+                worker process are always sequential.
         """
-        if parallel:
+        if parallel and not MapReduce._forked:
             return self.run_parallel()
         return self.run_sequential()
 
 
-# TODO: maintain a single log thread?
 class LogThread(threading.Thread):
-    """Thread which handles log records sent from ``MapReduce`` processes.
+    """Thread which handles log records sent from ``WorkerPool`` processes.
 
     It listens to an instance of ``multiprocessing.Queue``, rewriting log
     messages to the PyPhi log handler.
@@ -8,15 +8,17 @@ Functions for computing subsystem-level properties.
 
 import functools
 import logging
+from collections import namedtuple
+from itertools import islice
 
-from .. import Direction, config, connectivity, memory, utils
+from .. import Direction, cache, config, connectivity, memory, utils
 from ..models import (CauseEffectStructure, Concept, Cut, KCut,
                       SystemIrreducibilityAnalysis, _null_sia, cmp, fmt)
 from ..partition import (directed_bipartition, directed_bipartition_of_one,
                          mip_partitions)
 from ..utils import time_annotated
-from .distance import ces_distance
-from .parallel import MapReduce
+from .distance import ces_distance, ces_distance_lower_bound, null_distances
+from .parallel import MapReduce, checkpoint
 
 # Create a logger for this module.
 log = logging.getLogger(__name__)
@@ -62,6 +64,30 @@ class ComputeCauseEffectStructure(MapReduce):
         return concepts
 
 
+def _prefetch_repertoires(subsystem, mechanisms, cause_purviews,
+                          effect_purviews):
+    """Compute the repertoires of the mechanisms over their candidate
+    purviews in batches, one for each purview (see
+    |Subsystem.prefetch_repertoires()|).
+
+    Unless they are restricted, the candidate purviews are the potential
+    purviews of the network, which are cached; for a cut subsystem they may
+    include some purviews which ``find_mice`` will reject.
+    """
+    for direction, restriction in [(Direction.CAUSE, cause_purviews),
+                                   (Direction.EFFECT, effect_purviews)]:
+        def candidates(mechanism):
+            if restriction is not False:
+                return restriction
+            return (purview for purview in
+                    subsystem.network.potential_purviews(direction, mechanism)
+                    if set(purview).issubset(subsystem.node_indices))
+
+        subsystem.prefetch_repertoires(direction, (
+            (mechanism, purview) for mechanism in mechanisms
+            for purview in candidates(mechanism)))
+
+
 @time_annotated
 def ces(subsystem, mechanisms=False, purviews=False, cause_purviews=False,
         effect_purviews=False, parallel=False):
@@ -91,6 +117,12 @@ def ces(subsystem, mechanisms=False, purviews=False, cause_purviews=False,
     if mechanisms is False:
         mechanisms = utils.powerset(subsystem.node_indices, nonempty=True)
 
+    if not (parallel or config.PARALLEL_CONCEPT_EVALUATION):
+        mechanisms = list(mechanisms)
+        _prefetch_repertoires(subsystem, mechanisms,
+                              cause_purviews or purviews,
+                              effect_purviews or purviews)
+
     engine = ComputeCauseEffectStructure(mechanisms, subsystem, purviews,
                                          cause_purviews, effect_purviews)
 
@@ -110,7 +142,13 @@ def conceptual_info(subsystem):
     return round(ci, config.PRECISION)
 
 
-def evaluate_cut(uncut_subsystem, cut, unpartitioned_ces):
+#: Cuts are only abandoned if the lower bound on their |big_phi| exceeds the
+#: current minimum by more than this. The bound is exact, but ``emd`` scales
+#: the signatures to integers, so it only approximates the generalized EMD.
+BOUND_TOLERANCE = 1e-4
+
+
+def evaluate_cut(uncut_subsystem, cut, unpartitioned_ces, max_phi=None):
     """Compute the system irreducibility for a given cut.
 
     Args:
@@ -119,9 +157,14 @@ def evaluate_cut(uncut_subsystem, cut, unpartitioned_ces):
         unpartitioned_ces (CauseEffectStructure): The cause-effect structure of
             the uncut subsystem.
 
+    Keyword Args:
+        max_phi (float): If given, the evaluation is abandoned as soon as the
+            |big_phi| of the cut is known to exceed this value by more than
+            ``BOUND_TOLERANCE`` (see ``ces_distance_lower_bound``).
+
     Returns:
         SystemIrreducibilityAnalysis: The |SystemIrreducibilityAnalysis| for
-        that cut.
+        that cut, or ``None`` if the evaluation was abandoned.
     """
     log.debug('Evaluating %s...', cut)
 
@@ -136,11 +179,50 @@ def evaluate_cut(uncut_subsystem, cut, unpartitioned_ces):
             unpartitioned_ces.mechanisms +
             list(cut_subsystem.cut_mechanisms))
 
-    partitioned_ces = ces(cut_subsystem, mechanisms)
+    # Concepts which are unaffected by the cut are carried over as-is; only
+    # the remaining mechanisms are recomputed.
+    unaffected = {concept.mechanism: concept for concept in unpartitioned_ces
+                  if cut_subsystem.concept_unaffected_by_cut(concept)}
+    mechanisms = [m for m in mechanisms if m not in unaffected]
+
+    checkpoint()
+    recomputed = ces(cut_subsystem, mechanisms)
+    checkpoint()
+
+    partitioned_ces = CauseEffectStructure(
+        list(recomputed) + [
+            Concept(mechanism=concept.mechanism, cause=concept.cause,
+                    effect=concept.effect, subsystem=cut_subsystem,
+                    time=concept.time)
+            for concept in unaffected.values()],
+        subsystem=cut_subsystem, time=recomputed.time)
 
     log.debug('Finished evaluating %s.', cut)
 
-    phi_ = ces_distance(unpartitioned_ces, partitioned_ces)
+    # The carried over concepts are in both CESs, so only the recomputed ones
+    # need to be compared. Concepts can only be equal if their mechanisms are.
+    def changed(C1, C2):
+        C2 = {concept.mechanism: concept for concept in C2}
+        return [c for c in C1 if c.mechanism not in unaffected and not
+                (c.mechanism in C2 and c.emd_eq(C2[c.mechanism]))]
+
+    changed_concepts = (changed(unpartitioned_ces, recomputed),
+                        changed(recomputed, unpartitioned_ces))
+
+    # Only compute the full EMD if the cut can still have less phi than
+    # `max_phi`. If the CESs only differ by destroyed concepts, the bound is
+    # the distance itself, so this is skipped.
+    if max_phi is not None and all(changed_concepts):
+        bound = ces_distance_lower_bound(*changed_concepts,
+                                         C1=unpartitioned_ces,
+                                         C2=partitioned_ces)
+        if bound - max_phi > BOUND_TOLERANCE:
+            log.debug('Abandoning %s: lower bound %s exceeds %s.', cut,
+                      bound, max_phi)
+            return None
+
+    phi_ = ces_distance(unpartitioned_ces, partitioned_ces,
+                        changed=changed_concepts)
 
     return SystemIrreducibilityAnalysis(
         phi=phi_,
@@ -150,8 +232,19 @@ def evaluate_cut(uncut_subsystem, cut, unpartitioned_ces):
         cut_subsystem=cut_subsystem)
 
 
+#: A compact record of the |big_phi| value of a cut, sent back by worker
+#: processes in place of a full |SystemIrreducibilityAnalysis|.
+CutPhi = namedtuple('CutPhi', ['phi', 'cut'])
+
+
 class ComputeSystemIrreducibility(MapReduce):
-    """Computation engine for system-level irreducibility."""
+    """Computation engine for system-level irreducibility.
+
+    When run in parallel, each worker only sends back a ``CutPhi`` record when
+    a cut improves on the minimum over the cuts it has already evaluated. The
+    full |SystemIrreducibilityAnalysis| of the minimal cut is recomputed once
+    at the end.
+    """
     # pylint: disable=unused-argument,arguments-differ
 
     description = 'Evaluating {} cuts'.format(fmt.BIG_PHI)
@@ -163,23 +256,53 @@ class ComputeSystemIrreducibility(MapReduce):
         return _null_sia(subsystem, phi=float('inf'))
 
     @staticmethod
-    def compute(cut, subsystem, unpartitioned_ces):
+    def bound(min_result):
+        """Cuts are only fully evaluated if they can have less |big_phi| than
+        the current minimum.
+        """
+        if min_result is None:
+            return None
+        return min_result.phi
+
+    @staticmethod
+    def compute(cut, subsystem, unpartitioned_ces, bound=None):
         """Evaluate a cut."""
-        return evaluate_cut(subsystem, cut, unpartitioned_ces)
+        return evaluate_cut(subsystem, cut, unpartitioned_ces, max_phi=bound)
+
+    @staticmethod
+    def compact_result(new_sia, min_record, subsystem, unpartitioned_ces):
+        """Only send the cut and |big_phi| of the SIA, and only if it has
+        smaller |big_phi| than any cut previously evaluated by this worker.
+        """
+        if min_record is None or new_sia.phi < min_record.phi:
+            record = CutPhi(new_sia.phi, new_sia.cut)
+            return record, record
+
+        return None, min_record
 
     def process_result(self, new_sia, min_sia):
         """Check if the new SIA has smaller |big_phi| than the standing
         result.
+
+        In parallel computations, ``new_sia`` is a ``CutPhi`` record.
         """
         if new_sia.phi == 0:
             self.done = True  # Short-circuit
             return new_sia
 
-        elif new_sia < min_sia:
+        elif new_sia.phi < min_sia.phi:
             return new_sia
 
         return min_sia
 
+    def expand_result(self, min_record):
+        """Recompute the SIA of the minimal cut."""
+        if isinstance(min_record, SystemIrreducibilityAnalysis):
+            return min_record
+
+        subsystem, unpartitioned_ces = self.context
+        return evaluate_cut(subsystem, min_record.cut, unpartitioned_ces)
+
 
 def sia_bipartitions(nodes, node_labels=None):
     """Return all |big_phi| cuts for the given nodes.
@@ -201,21 +324,152 @@ def sia_bipartitions(nodes, node_labels=None):
             for bipartition in bipartitions]
 
 
+#: The largest number of automorphisms of a subsystem used to skip cuts.
+MAX_AUTOMORPHISMS = 1000
+
+
+def cut_representatives(cuts, subsystem):
+    """Skip cuts which are images of previous cuts under an automorphism of
+    the subsystem.
+
+    This is used if :data:`config.SKIP_SYMMETRIC_CUTS` is enabled.
+
+    These cuts have the same |big_phi| as the earlier cut, so only one cut of
+    each orbit needs to be evaluated. At most ``MAX_AUTOMORPHISMS``
+    automorphisms are used.
+
+    .. note::
+        This is exact unless some mechanism has several purviews with the same
+        |small_phi|. Which of them is the |MICE| depends on the order of the
+        purviews, so the skipped cuts may have a different |big_phi| than
+        their representative, and the |SIA| may differ from the one found by
+        evaluating every cut (see ``Subsystem.automorphisms``).
+
+    Args:
+        cuts (Iterable[Cut]): The cuts to filter.
+        subsystem (Subsystem): The uncut subsystem.
+
+    Yields:
+        Cut: The first cut of each orbit.
+    """
+    automorphisms = list(islice(subsystem.automorphisms(), MAX_AUTOMORPHISMS))
+    log.debug('Found %s automorphisms of %s.', len(automorphisms), subsystem)
+
+    if len(automorphisms) == 1:
+        yield from cuts
+        return
+
+    # The identity comes first; `permute` also normalizes the cut.
+    identity = automorphisms[0]
+    seen = set()
+    for cut in cuts:
+        if cut.permute(identity) in seen:
+            continue
+        seen.update(cut.permute(mapping) for mapping in automorphisms)
+        yield cut
+
+
+def order_cuts(cuts, subsystem, unpartitioned_ces):
+    """Sort cuts so that those which are likely to have small |big_phi| come
+    first.
+
+    Cuts are ordered by the total |small_phi| of the concepts they damage,
+    and then by the number of connections they sever. Finding a small
+    |big_phi| early lets ``evaluate_cut`` abandon more of the remaining cuts.
+
+    Args:
+        cuts (list[Cut]): The cuts to sort.
+        subsystem (Subsystem): The uncut subsystem.
+        unpartitioned_ces (CauseEffectStructure): The cause-effect structure of
+            the uncut subsystem.
+
+    Returns:
+        list[Cut]: The sorted cuts.
+    """
+    n = subsystem.network.size
+    cm_mask = connectivity.cm_to_mask(subsystem.cm)
+    concept_masks = [
+        (concept.phi,
+         concept.cause.connection_mask(n) | concept.effect.connection_mask(n))
+        for concept in unpartitioned_ces]
+
+    def key(cut):
+        cut_mask = cut.cut_mask(n)
+        damaged_phi = sum(phi for phi, mask in concept_masks
+                          if mask & cut_mask)
+        return (damaged_phi, bin(cut_mask & cm_mask).count('1'))
+
+    return sorted(cuts, key=key)
+
+
+def has_upper_bound(subsystem):
+    """Return whether ``phi_upper_bound`` can bound the |big_phi| of a
+    subsystem without a full |SIA|.
+
+    This is not the case for concept-style cuts, single-node subsystems and
+    macro subsystems.
+    """
+    return not (config.SYSTEM_CUTS == 'CONCEPT_STYLE' or
+                len(subsystem.cut_indices) < 2 or
+                subsystem.cut_indices != subsystem.node_indices)
+
+
+def phi_upper_bound(subsystem, unpartitioned_ces=None):
+    """Return an upper bound on the |big_phi| of a subsystem.
+
+    This is the |big_phi| of the subsystem with respect to the first cut of
+    ``order_cuts``. It requires the unpartitioned |CauseEffectStructure|, but
+    only a single cut is evaluated.
+
+    Args:
+        subsystem (Subsystem): The subsystem.
+        unpartitioned_ces (CauseEffectStructure): The unpartitioned
+            cause-effect structure of the subsystem, if it has already been
+            computed. It can then be passed on to ``sia``.
+
+    Returns:
+        float: The upper bound, or ``inf`` if no bound can be computed without
+        a full |SIA| (see ``has_upper_bound``).
+    """
+    if not has_upper_bound(subsystem):
+        return float('inf')
+
+    if not connectivity.is_strong(subsystem.cm, subsystem.node_indices):
+        return 0
+
+    if unpartitioned_ces is None:
+        unpartitioned_ces = _ces(subsystem)
+    if not unpartitioned_ces:
+        return 0
+
+    cuts = sia_bipartitions(subsystem.cut_indices, subsystem.cut_node_labels)
+    cut = order_cuts(cuts, subsystem, unpartitioned_ces)[0]
+    return evaluate_cut(subsystem, cut, unpartitioned_ces).phi
+
+
 def _ces(subsystem):
     """Parallelize the unpartitioned |CauseEffectStructure| if parallelizing
     cuts, since we have free processors because we're not computing any cuts
     yet.
+
+    The distances of its concepts to the null concept are computed before the
+    cuts are evaluated, so that every cut, and every worker, reuses them.
     """
-    return ces(subsystem, parallel=config.PARALLEL_CUT_EVALUATION)
+    unpartitioned_ces = ces(subsystem, parallel=config.PARALLEL_CUT_EVALUATION)
+    null_distances(unpartitioned_ces)
+    return unpartitioned_ces
 
 
-@memory.cache(ignore=["subsystem"])
+@memory.cache(ignore=["subsystem", "unpartitioned_ces"])
 @time_annotated
-def _sia(cache_key, subsystem):
+def _sia(cache_key, subsystem, unpartitioned_ces=None):
     """Return the minimal information partition of a subsystem.
 
     Args:
         subsystem (Subsystem): The candidate set of nodes.
+        unpartitioned_ces (CauseEffectStructure): The unpartitioned
+            cause-effect structure of the subsystem, if it has already been
+            computed.
 
     Returns:
         SystemIrreducibilityAnalysis: A nested structure containing all the
@@ -260,7 +514,8 @@ def _sia(cache_key, subsystem):
     # =========================================================================
 
     log.debug('Finding unpartitioned CauseEffectStructure...')
-    unpartitioned_ces = _ces(subsystem)
+    if unpartitioned_ces is None:
+        unpartitioned_ces = _ces(subsystem)
 
     if not unpartitioned_ces:
         log.info('Empty unpartitioned CauseEffectStructure; returning null '
@@ -279,10 +534,21 @@ def _sia(cache_key, subsystem):
         cuts = sia_bipartitions(subsystem.cut_indices,
                                 subsystem.cut_node_labels)
 
+    if config.SKIP_SYMMETRIC_CUTS:
+        cuts = list(cut_representatives(cuts, subsystem))
+
+    # Macro subsystems are cut at the micro level, which their concepts do
+    # not refer to.
+    if subsystem.cut_indices == subsystem.node_indices:
+        cuts = order_cuts(cuts, subsystem, unpartitioned_ces)
+
     engine = ComputeSystemIrreducibility(
         cuts, subsystem, unpartitioned_ces)
     result = engine.run(config.PARALLEL_CUT_EVALUATION)
 
+    # The expanded repertoires are only needed to evaluate the cuts
+    unpartitioned_ces.expanded_repertoires.clear()
+
     if config.CLEAR_SUBSYSTEM_CACHES_AFTER_COMPUTING_SIA:
         log.debug('Clearing subsystem caches.')
         subsystem.clear_caches()
@@ -304,6 +570,7 @@ def _sia_cache_key(subsystem):
         hash(subsystem),
         config.ASSUME_CUTS_CANNOT_CREATE_NEW_CONCEPTS,
         config.CUT_ONE_APPROXIMATION,
+        config.SKIP_SYMMETRIC_CUTS,
         config.MEASURE,
         config.PRECISION,
         config.VALIDATE_SUBSYSTEM_STATES,
@@ -312,16 +579,51 @@ def _sia_cache_key(subsystem):
     )
 
 
+#: Analyses keyed on the canonical form of their subsystem, together with the
+#: canonical order of the nodes of the subsystem.
+_isomorphic_sias = cache.DictCache()
+
+
+def _isomorphic_sia(subsystem, unpartitioned_ces=None):
+    """Return the |SystemIrreducibilityAnalysis| of a subsystem, relabeling
+    the analysis of an isomorphic subsystem if one has already been computed.
+
+    See |Subsystem.canonical_form()|.
+    """
+    cache_key = _sia_cache_key(subsystem)
+    form = subsystem.canonical_form()
+    if form is None:
+        return _sia(cache_key, subsystem, unpartitioned_ces)
+
+    canonical_key, order = form
+    key = (canonical_key,) + cache_key[1:]
+    cached = _isomorphic_sias.get(key)
+    if cached is None:
+        result = _sia(cache_key, subsystem, unpartitioned_ces)
+        _isomorphic_sias.set(key, (order, result))
+        return result
+
+    cached_order, result = cached
+    if result.subsystem == subsystem:
+        return result
+    log.debug('Relabeling the SIA of %s for %s.', result.subsystem, subsystem)
+    return result.permute(dict(zip(cached_order, order)), subsystem)
+
+
 # Wrapper to ensure that the cache key is the native hash of the subsystem, so
 # joblib doesn't mistakenly recompute things when the subsystem's MICE cache is
 # changed. The cache is also keyed on configuration values which affect the
 # value of the computation.
 @functools.wraps(_sia)
-def sia(subsystem):  # pylint: disable=missing-docstring
+def sia(subsystem, unpartitioned_ces=None):
+    # pylint: disable=missing-docstring
     if config.SYSTEM_CUTS == 'CONCEPT_STYLE':
         return sia_concept_style(subsystem)
 
-    return _sia(_sia_cache_key(subsystem), subsystem)
+    if config.CACHE_SIAS_BY_ISOMORPHISM:
+        return _isomorphic_sia(subsystem, unpartitioned_ces)
+
+    return _sia(_sia_cache_key(subsystem), subsystem, unpartitioned_ces)
 
 
 def phi(subsystem):
@@ -383,6 +685,13 @@ class ConceptStyleSystem:
         return Concept(mechanism=mechanism, cause=cause, effect=effect,
                        subsystem=self)
 
+    def concept_unaffected_by_cut(self, concept):
+        """Check the cause and effect of the concept against the system used
+        for each side of the cut.
+        """
+        return not (concept.cause.damaged_by_cut(self.cause_system) or
+                    concept.effect.damaged_by_cut(self.effect_system))
+
     def __str__(self):
         return 'ConceptStyleSystem{}'.format(self.node_indices)
 
@@ -402,6 +711,8 @@ def directional_sia(subsystem, direction, unpartitioned_ces=None):
 
     c_system = ConceptStyleSystem(subsystem, direction)
     cuts = concept_cuts(direction, c_system.cut_indices, subsystem.node_labels)
+    if config.SKIP_SYMMETRIC_CUTS:
+        cuts = cut_representatives(cuts, subsystem)
 
     # Run the default SIA engine
     # TODO: verify that short-cutting works correctly?
@@ -29,6 +29,7 @@ Print the ``config`` object to see the current settings:
     >>> print(pyphi.config)  # doctest: +SKIP
     { 'ASSUME_CUTS_CANNOT_CREATE_NEW_CONCEPTS': False,
       'CACHE_SIAS': False,
+      'CACHE_SIAS_BY_ISOMORPHISM': False,
       'CACHE_POTENTIAL_PURVIEWS': True,
       'CACHING_BACKEND': 'fs',
       ...
@@ -53,6 +54,7 @@ These settings control the algorithms PyPhi uses.
 
 - :attr:`~pyphi.conf.PyphiConfig.ASSUME_CUTS_CANNOT_CREATE_NEW_CONCEPTS`
 - :attr:`~pyphi.conf.PyphiConfig.CUT_ONE_APPROXIMATION`
+- :attr:`~pyphi.conf.PyphiConfig.SKIP_SYMMETRIC_CUTS`
 - :attr:`~pyphi.conf.PyphiConfig.MEASURE`
 - :attr:`~pyphi.conf.PyphiConfig.PARTITION_TYPE`
 - :attr:`~pyphi.conf.PyphiConfig.PICK_SMALLEST_PURVIEW`
@@ -77,6 +79,7 @@ long time!), resulting in data loss.
 - :attr:`~pyphi.conf.PyphiConfig.PARALLEL_COMPLEX_EVALUATION`
 - :attr:`~pyphi.conf.PyphiConfig.NUMBER_OF_CORES`
 - :attr:`~pyphi.conf.PyphiConfig.MAXIMUM_CACHE_MEMORY_PERCENTAGE`
+- :attr:`~pyphi.conf.PyphiConfig.PARTITION_BLOCK_SIZE`
 
   .. important::
     Only one of ``PARALLEL_CONCEPT_EVALUATION``, ``PARALLEL_CUT_EVALUATION``,
@@ -96,7 +99,9 @@ Memoization and caching
 PyPhi provides a number of ways to cache intermediate results.
 
 - :attr:`~pyphi.conf.PyphiConfig.CACHE_SIAS`
+- :attr:`~pyphi.conf.PyphiConfig.CACHE_SIAS_BY_ISOMORPHISM`
 - :attr:`~pyphi.conf.PyphiConfig.CACHE_REPERTOIRES`
+- :attr:`~pyphi.conf.PyphiConfig.TABLE_REPERTOIRE_CACHE`
 - :attr:`~pyphi.conf.PyphiConfig.CACHE_POTENTIAL_PURVIEWS`
 - :attr:`~pyphi.conf.PyphiConfig.CLEAR_SUBSYSTEM_CACHES_AFTER_COMPUTING_SIA`
 - :attr:`~pyphi.conf.PyphiConfig.CACHING_BACKEND`
@@ -105,6 +110,8 @@ PyPhi provides a number of ways to cache intermediate results.
 - :attr:`~pyphi.conf.PyphiConfig.MONGODB_CONFIG`
 - :attr:`~pyphi.conf.PyphiConfig.REDIS_CACHE`
 - :attr:`~pyphi.conf.PyphiConfig.REDIS_CONFIG`
+- :attr:`~pyphi.conf.PyphiConfig.SHARED_MEMORY_CACHE`
+- :attr:`~pyphi.conf.PyphiConfig.SHARED_MEMORY_CACHE_SIZE`
 
 
 Logging
@@ -196,6 +203,7 @@ class Option:
     def __set__(self, obj, value):
         self._validate(value)
         obj._values[self.name] = value
+        obj._generation += 1
         self._callback(obj)
 
     def _validate(self, value):
@@ -237,6 +245,7 @@ class Config(metaclass=ConfigMeta):
     def __init__(self):
         self._values = {}
         self._loaded_files = []
+        self._generation = 0
 
         # Set the default value of each ``Option``
         for name, opt in self.options().items():
@@ -252,6 +261,15 @@ class Config(metaclass=ConfigMeta):
     def __str__(self):
         return pprint.pformat(self._values, indent=2)
 
+    @property
+    def generation(self):
+        """The number of times an option has been set.
+
+        Values derived from the configuration can be recomputed only when the
+        generation changes.
+        """
+        return self._generation
+
     def __setattr__(self, name, value):
         if name.startswith('_') or name in self.options().keys():
             super().__setattr__(name, value)
@@ -375,6 +393,16 @@ class PyphiConfig(Config):
     accurate results with modular, sparsely-connected, or homogeneous
     networks.""")
 
+    SKIP_SYMMETRIC_CUTS = Option(False, doc="""
+    When determining the MIP for |big_phi|, only evaluate one cut of each set
+    of cuts which are images of each other under an automorphism of the
+    subsystem (see :meth:`~pyphi.subsystem.Subsystem.automorphisms`). This can
+    greatly reduce the number of cuts evaluated for symmetric systems. The
+    results are exact unless some mechanism has several purviews with the same
+    |small_phi|: the |MICE| is then chosen by the order of the purviews, which
+    relabeling does not preserve, so a skipped cut may have a different
+    |big_phi| than the cut evaluated in its place.""")
+
     MEASURE = Option('EMD', doc="""
     The measure to use when computing distances between repertoires and
     concepts. A full list of currently installed measures is available by
@@ -419,7 +447,17 @@ class PyphiConfig(Config):
     PyPhi employs several in-memory caches to speed up computation. However,
     these can quickly use a lot of memory for large networks or large numbers
     of them; to avoid thrashing, this setting limits the percentage of a
-    system's RAM that the caches can collectively use.""")
+    system's RAM that the caches can collectively use. When the limit is
+    reached, the least recently used cache entries are evicted.""")
+
+    PARTITION_BLOCK_SIZE = Option(16, doc="""
+    The largest number of partitions of a mechanism and purview which are
+    evaluated together when searching for the MIP. The partitioned repertoires
+    of a block are stacked and their distances to the unpartitioned repertoire
+    computed at once. Since the search stops at the first partition with
+    |small_phi = 0|, the rest of its block is wasted work, so blocks start
+    with one partition and double in size up to this limit. Set this to ``1``
+    to evaluate partitions one at a time.""")
 
     CACHE_SIAS = Option(False, doc="""
     PyPhi is equipped with a transparent caching system for
@@ -435,6 +473,24 @@ class PyphiConfig(Config):
     can consume a significant amount of memory. If you are experiencing memory
     issues, try disabling this.""")
 
+    TABLE_REPERTOIRE_CACHE = Option(False, doc="""
+    Controls whether the repertoires of subsystems of small networks (up to
+    ten nodes) are cached in tables indexed by the bitmasks of the mechanism
+    and purview instead of in dictionaries (see ``cache.TableCache``). This
+    avoids hashing the keys, but each subsystem allocates a table with a row
+    for every mechanism that is used. Has no effect if
+    ``SHARED_MEMORY_CACHE`` is enabled.""")
+
+    CACHE_SIAS_BY_ISOMORPHISM = Option(False, doc="""
+    Controls whether |SystemIrreducibilityAnalysis| objects are cached in
+    memory under the canonical form of their subsystem (see
+    |Subsystem.canonical_form()|). Subsystems which are the same up to a
+    relabeling of their nodes, *e.g.* candidate complexes of a symmetric
+    network, or the same subsystem in states that condition it alike, then
+    share one computation; the cached analysis is relabeled to the nodes of
+    each subsystem. When several purviews or cuts tie, the relabeled analysis
+    may report a different (equally valid) one than a fresh computation.""")
+
     CACHE_POTENTIAL_PURVIEWS = Option(True, doc="""
     Controls whether the potential purviews of mechanisms of a network are
     cached. Caching speeds up computations by not recomputing expensive
@@ -483,6 +539,18 @@ class PyphiConfig(Config):
     Configure the Redis database backend. These are the defaults in the
     provided ``redis.conf`` file.""")
 
+    SHARED_MEMORY_CACHE = Option(False, doc="""
+    Specifies whether to share cached |MICE| and repertoires of uncut
+    subsystems between the processes of parallel computations using shared
+    memory. Unlike the Redis cache this needs no external service, but it
+    requires Python 3.8 or later. Takes precedence over the dictionary cache,
+    but not over ``REDIS_CACHE``.""")
+
+    SHARED_MEMORY_CACHE_SIZE = Option(64, doc="""
+    The size, in megabytes, of the shared memory region each process writes
+    to when ``SHARED_MEMORY_CACHE`` is enabled. Once a region is full, further
+    results computed by that process are only cached locally.""")
+
     LOG_FILE = Option('pyphi.log', on_change=configure_logging, doc="""
     Controls the name of the log file.""")
 
@@ -9,6 +9,8 @@ Functions for determining network connectivity properties.
 import numpy as np
 from scipy.sparse.csgraph import connected_components
 
+from . import utils
+
 
 def apply_boundary_conditions_to_cm(external_indices, cm):
     """Remove connections to or from external nodes."""
@@ -60,6 +62,70 @@ def relevant_connections(n, _from, to):
     return cm
 
 
+def relevant_connections_mask(n, _from, to):
+    """Construct a connectivity bitmask.
+
+    This is the same as ``cm_to_mask(relevant_connections(n, _from, to))``,
+    but does not allocate a matrix.
+
+    Args:
+        n (int): The dimensions of the matrix
+        _from (tuple[int]): Nodes with outgoing connections to ``to``
+        to (tuple[int]): Nodes with incoming connections from ``_from``
+
+    Returns:
+        int: A bitmask in which bit |n * i + j| is set if |i| is in ``_from``
+        and |j| is in ``to``.
+
+    Example:
+        >>> bin(relevant_connections_mask(3, (1,), (0, 2)))
+        '0b101000'
+    """
+    row = utils.bitmask(to)
+
+    mask = 0
+    for i in _from:
+        mask |= row << (n * i)
+    return mask
+
+
+def cm_to_mask(cm):
+    """Convert a connectivity matrix to a bitmask.
+
+    Bit |n * i + j| of the mask is set if ``cm[i, j]`` is nonzero. Two sets of
+    connections intersect if the bitwise AND of their masks is nonzero.
+
+    Example:
+        >>> cm = np.array([[0, 1], [0, 0]])
+        >>> cm_to_mask(cm)
+        2
+    """
+    mask = 0
+    for k in np.flatnonzero(cm):
+        mask |= 1 << int(k)
+    return mask
+
+
+def cm_to_node_masks(cm):
+    """Return the outputs and inputs of every node of a connectivity matrix
+    as bitmasks over the nodes (see :func:`utils.bitmask`).
+
+    Returns:
+        tuple[tuple[int], tuple[int]]: The masks of the nodes that each node
+        outputs to, and of the nodes that input to each node.
+
+    Example:
+        >>> cm = np.array([[0, 1, 1], [0, 0, 1], [0, 0, 0]])
+        >>> cm_to_node_masks(cm)
+        ((6, 4, 0), (0, 1, 3))
+    """
+    cm = np.asarray(cm)
+    outputs = tuple(utils.bitmask(np.flatnonzero(row).tolist()) for row in cm)
+    inputs = tuple(utils.bitmask(np.flatnonzero(col).tolist())
+                   for col in cm.T)
+    return outputs, inputs
+
+
 def block_cm(cm):
     """Return whether ``cm`` can be arranged as a block connectivity matrix.
 
@@ -130,8 +196,6 @@ def block_cm(cm):
             return False
 
 
-# TODO: simplify the conditional validation here and in block_cm
-# TODO: combine with fully_connected
 def block_reducible(cm, nodes1, nodes2):
     """Return whether connections from ``nodes1`` to ``nodes2`` are reducible.
 
@@ -140,18 +204,63 @@ def block_reducible(cm, nodes1, nodes2):
         nodes1 (tuple[int]): Source nodes
         nodes2 (tuple[int]): Sink nodes
     """
+    outputs, inputs = cm_to_node_masks(cm)
+    return block_reducible_mask(outputs, inputs, utils.bitmask(nodes1),
+                                utils.bitmask(nodes2))
+
+
+def block_reducible_mask(outputs, inputs, nodes1, nodes2):
+    """Return whether connections from ``nodes1`` to ``nodes2`` are reducible.
+
+    This is :func:`block_reducible` over the bitmasks returned by
+    :func:`cm_to_node_masks`, so that a connectivity matrix can be converted
+    once and then used to check many sets of nodes.
+
+    Args:
+        outputs (tuple[int]): The outputs of each node, as bitmasks.
+        inputs (tuple[int]): The inputs to each node, as bitmasks.
+        nodes1 (int): The bitmask of the source nodes.
+        nodes2 (int): The bitmask of the sink nodes.
+    """
     # Trivial case
     if not nodes1 or not nodes2:
         return True
 
-    cm = cm[np.ix_(nodes1, nodes2)]
+    sources = utils.bitmask_nodes(nodes1)
+    sinks = utils.bitmask_nodes(nodes2)
+    # The connections between the two sets of nodes
+    source_outputs = {i: outputs[i] & nodes2 for i in sources}
+    sink_inputs = {j: inputs[j] & nodes1 for j in sinks}
+
+    # Every node must have a connection to the other set.
+    if not all(source_outputs.values()) or not all(sink_inputs.values()):
+        return True
+    if len(sources) == 1 or len(sinks) == 1:
+        return False
 
-    # Validate the connectivity matrix.
-    if not cm.sum(0).all() or not cm.sum(1).all():
+    # The connections are reducible if they can be arranged as a block
+    # connectivity matrix (see ``block_cm``), i.e. if the sources and sinks
+    # do not form a single connected component.
+    if all(mask & (mask - 1) == 0 for mask in source_outputs.values()):
         return True
-    if len(nodes1) > 1 and len(nodes2) > 1:
-        return block_cm(cm)
-    return False
+
+    def union(masks, nodes):
+        result = 0
+        for i in utils.bitmask_nodes(nodes):
+            result |= masks[i]
+        return result
+
+    # Start: source node with most outputs
+    component = 1 << max(sources,
+                         key=lambda i: bin(source_outputs[i]).count('1'))
+    while True:
+        reached = union(source_outputs, component)
+        if reached == nodes2:
+            return False
+        grown = union(sink_inputs, reached)
+        if grown == component:
+            return True
+        component = grown
 
 
 def _connected(cm, nodes, connection):
@@ -177,6 +286,48 @@ def is_strong(cm, nodes=None):
     return _connected(cm, nodes, 'strong')
 
 
+def strong_subsets(cm):
+    """Return whether each subset of nodes is strongly connected.
+
+    All subsets are tested at once, by following connections from the first
+    node of every subset in parallel over bitmasks.
+
+    Args:
+        cm (np.ndarray): A square connectivity matrix.
+
+    Returns:
+        np.ndarray: A boolean array of length |2^N| in which entry ``s`` is
+        ``True`` if the nodes of the subset with bitmask ``s`` (bit ``i`` is
+        set if node ``i`` is in the subset) are strongly connected, as in
+        :func:`is_strong`.
+
+    Example:
+        >>> cm = np.array([[0, 1, 0], [1, 0, 0], [0, 1, 0]])
+        >>> strong_subsets(cm).nonzero()[0]
+        array([0, 1, 2, 3, 4])
+    """
+    n = cm.shape[0]
+    bits = 1 << np.arange(n, dtype=np.int64)
+    subsets = np.arange(2 ** n, dtype=np.int64)
+    # The lowest node of each subset
+    start = subsets & -subsets
+
+    def reachable(neighbors):
+        reached = start
+        while True:
+            step = reached.copy()
+            for i in range(n):
+                step |= np.where(reached & bits[i], neighbors[i], 0)
+            step &= subsets
+            if np.array_equal(step, reached):
+                return reached
+            reached = step
+
+    outputs = (cm != 0).dot(bits)
+    inputs = (cm != 0).T.dot(bits)
+    return (reachable(outputs) == subsets) & (reachable(inputs) == subsets)
+
+
 def is_weak(cm, nodes=None):
     """Return whether the connectivity matrix is weakly connected.
 
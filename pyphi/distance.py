@@ -14,7 +14,7 @@ from scipy.spatial.distance import cdist
 from scipy.stats import entropy
 
 from . import Direction, config, constants, utils, validate
-from .distribution import flatten, marginal_zero
+from .distribution import flatten, marginal_zeros
 from .registry import Registry
 
 # Load precomputed hamming matrices.
@@ -34,6 +34,15 @@ class MeasureRegistry(Registry):
         ...    return 0
 
     And use them by setting ``config.MEASURE = 'ALWAYS_ZERO'``.
+
+    Measures can also declare a batched implementation, which compares one
+    distribution against a stack of distributions and returns a vector of
+    distances:
+
+    Examples:
+        >>> @measures.register_batched('ALWAYS_ZERO')  # doctest: +SKIP
+        ... def always_zeros(a, bs):
+        ...    return np.zeros(len(bs))
     """
     # pylint: disable=arguments-differ
 
@@ -42,6 +51,7 @@ class MeasureRegistry(Registry):
     def __init__(self):
         super().__init__()
         self._asymmetric = []
+        self._batched = {}
 
     def register(self, name, asymmetric=False):
         """Decorator for registering a measure with PyPhi.
@@ -59,10 +69,40 @@ class MeasureRegistry(Registry):
             return func
         return register_func
 
+    def register_batched(self, name):
+        """Decorator for registering a batched implementation of a measure.
+
+        The implementation takes a distribution and a stack of distributions
+        (stacked along the first axis) and returns a vector of distances.
+
+        Args:
+            name (string): The name of the measure.
+        """
+        def register_func(func):
+            self._batched[name] = func
+            return func
+        return register_func
+
     def asymmetric(self):
         """Return a list of asymmetric measures."""
         return self._asymmetric
 
+    def batched(self, name):
+        """Return the batched implementation of a measure.
+
+        Measures without a batched implementation are applied to each
+        distribution of the stack in turn.
+        """
+        if name in self._batched:
+            return self._batched[name]
+
+        measure = self[name]
+
+        def each(d1, d2s):
+            return np.array([measure(d1, d2) for d2 in d2s], dtype=float)
+
+        return each
+
 
 measures = MeasureRegistry()
 
@@ -130,6 +170,133 @@ def _compute_hamming_matrix(N):
     return cdist(possible_states, possible_states, 'hamming') * N
 
 
+def _hypercube_distances(excess, flow, N):
+    """Return the shortest distances from the nodes with positive excess to
+    every state in the residual graph of a flow on the |N|-cube.
+
+    Moving along a hypercube edge costs 1; undoing existing flow costs -1.
+    Since the flow is kept optimal there are no negative cycles, and the
+    relaxation converges after at most |2^N| rounds.
+    """
+    states = np.arange(1 << N)
+    dist = np.where(excess > 0, 0.0, np.inf)
+    while True:
+        relaxed = dist.copy()
+        for i in range(N):
+            neighbor_dist = dist[states ^ (1 << i)]
+            np.minimum(relaxed, neighbor_dist + 1, out=relaxed)
+            np.minimum(relaxed, np.where(flow[:, i] > 0, neighbor_dist - 1,
+                                         np.inf), out=relaxed)
+        if np.array_equal(relaxed, dist):
+            return dist
+        dist = relaxed
+
+
+def _hypercube_emd(d1, d2, N):
+    """Compute the Hamming EMD between two flat distributions over |N| binary
+    nodes as a min-cost flow on the edges of the |N|-cube.
+
+    The Hamming distance between two states is the length of the shortest
+    path between them on the hypercube, so moving mass along the
+    |N * 2^(N - 1)| hypercube edges at unit cost is equivalent to the
+    transportation problem over the dense |2^N x 2^N| Hamming matrix, which
+    is never built.
+
+    The flow is found with the primal-dual method: each phase computes
+    shortest distances in the residual graph and then saturates all
+    shortest augmenting paths with a blocking-flow search. Augmenting paths
+    have integral costs between 1 and |N| that increase from phase to phase,
+    so there are at most |N| phases.
+
+    Args:
+        d1 (np.ndarray): The first distribution, flattened.
+        d2 (np.ndarray): The second distribution, flattened.
+        N (int): The number of binary nodes.
+
+    Returns:
+        float: The EMD between ``d1`` and ``d2``.
+    """
+    V = 1 << N
+    excess = (d1 - d2).tolist()
+    # ``flow[u][i]`` is the mass moved from state ``u`` to ``u ^ (1 << i)``.
+    # At most one direction of each edge carries flow.
+    flow = [[0.0] * N for _ in range(V)]
+    bits = [1 << i for i in range(N)]
+    inf = float('inf')
+
+    while True:
+        dist = _hypercube_distances(np.array(excess),
+                                    np.array(flow).reshape(V, N), N)
+        sinks = [u for u in range(V) if excess[u] < 0]
+        sources = [u for u in range(V) if excess[u] > 0 and dist[u] == 0]
+        if not sinks or not sources:
+            break
+        target = min(dist[u] for u in sinks)
+        dist = dist.tolist()
+
+        def residual(u, i):
+            v = u ^ bits[i]
+            if dist[v] == dist[u] + 1:
+                return inf
+            if dist[v] == dist[u] - 1:
+                return flow[v][i]
+            return 0.0
+
+        # Dinic's algorithm on the arcs that lie on shortest paths.
+        while True:
+            level = [-1] * V
+            queue = [u for u in sources if excess[u] > 0]
+            for u in queue:
+                level[u] = 0
+            for u in queue:
+                for i in range(N):
+                    v = u ^ bits[i]
+                    if level[v] < 0 and residual(u, i) > 0:
+                        level[v] = level[u] + 1
+                        queue.append(v)
+            if not any(level[u] >= 0 and excess[u] < 0 and dist[u] == target
+                       for u in sinks):
+                break
+
+            arc = [0] * V
+            for source in sources:
+                path, dims = [source], []
+                while path and excess[source] > 0:
+                    u = path[-1]
+                    if excess[u] < 0 and dist[u] == target:
+                        amount = min(excess[source], -excess[u])
+                        for w, i in zip(path, dims):
+                            amount = min(amount, residual(w, i))
+                        for w, i in zip(path, dims):
+                            if dist[w ^ bits[i]] > dist[w]:
+                                flow[w][i] += amount
+                            elif flow[w ^ bits[i]][i] == amount:
+                                flow[w ^ bits[i]][i] = 0.0
+                            else:
+                                flow[w ^ bits[i]][i] -= amount
+                        excess[source] -= amount
+                        excess[u] += amount
+                        path, dims = [source], []
+                        continue
+                    while arc[u] < N:
+                        i = arc[u]
+                        v = u ^ bits[i]
+                        if level[v] == level[u] + 1 and residual(u, i) > 0:
+                            path.append(v)
+                            dims.append(i)
+                            break
+                        arc[u] += 1
+                    else:
+                        # Dead end: remove ``u`` from the level graph.
+                        level[u] = -1
+                        path.pop()
+                        if dims:
+                            arc[path[-1]] += 1
+                            dims.pop()
+
+    return float(np.sum(flow))
+
+
 # TODO extend to binary nodes
 @measures.register('EMD')
 def hamming_emd(d1, d2):
@@ -138,13 +305,60 @@ def hamming_emd(d1, d2):
     as the transportation cost function.
 
     Singleton dimensions are sqeezed out.
+
+    Distributions over fewer than ``_NUM_PRECOMPUTED_HAMMING_MATRICES``
+    nodes are compared with ``pyemd`` using a precomputed Hamming matrix.
+    Larger distributions are compared with a min-cost flow over the edges of
+    the hypercube, which avoids building the |2^N x 2^N| Hamming matrix.
     """
     N = d1.squeeze().ndim
     d1, d2 = flatten(d1), flatten(d2)
-    return emd(d1, d2, _hamming_matrix(N))
+    if N < _NUM_PRECOMPUTED_HAMMING_MATRICES:
+        return emd(d1, d2, _hamming_matrix(N))
+
+    if not d1.size == d2.size == 2**N:
+        raise ValueError('Distributions must be over binary nodes and have '
+                         'the same shape.')
+    return _hypercube_emd(d1, d2, N)
+
+
+def _flatten_stack(ds):
+    """Flatten each distribution of a stack, as |flatten| does, returning a
+    2D array with one row per distribution."""
+    axes = (0,) + tuple(reversed(range(1, ds.ndim)))
+    return np.ascontiguousarray(ds.transpose(axes)).reshape(len(ds), -1)
+
+
+@measures.register_batched('EMD')
+def hamming_emds(d1, d2s):
+    """Return the Hamming EMD between a distribution and each distribution in
+    a stack.
+
+    The first distribution is flattened, and the Hamming matrix loaded, once
+    for the whole stack.
+
+    Args:
+        d1 (np.ndarray): The first distribution.
+        d2s (np.ndarray): The other distributions, stacked along the first
+            axis.
+
+    Returns:
+        np.ndarray: The EMD between ``d1`` and each distribution in ``d2s``.
+    """
+    N = d1.squeeze().ndim
+    d1, d2s = flatten(d1), _flatten_stack(d2s)
+    if N < _NUM_PRECOMPUTED_HAMMING_MATRICES:
+        d1 = np.ascontiguousarray(d1)
+        matrix = _hamming_matrix(N)
+        return np.array([emd(d1, d2, matrix) for d2 in d2s])
 
+    if not d1.size == d2s.shape[1] == 2**N:
+        raise ValueError('Distributions must be over binary nodes and have '
+                         'the same shape.')
+    return np.array([_hypercube_emd(d1, d2, N) for d2 in d2s])
 
-def effect_emd(d1, d2):
+
+def effect_emd(d1, d2, marginals=None):
     """Compute the EMD between two effect repertoires.
 
     Because the nodes are independent, the EMD between effect repertoires is
@@ -156,11 +370,40 @@ def effect_emd(d1, d2):
         d1 (np.ndarray): The first repertoire.
         d2 (np.ndarray): The second repertoire.
 
+    Keyword Args:
+        marginals (np.ndarray): The marginals of ``d1``, as returned by
+            ``distribution.marginal_zeros``, if they are already known.
+
     Returns:
         float: The EMD between ``d1`` and ``d2``.
     """
-    return sum(abs(marginal_zero(d1, i) - marginal_zero(d2, i))
-               for i in range(d1.ndim))
+    if marginals is None:
+        marginals = marginal_zeros(d1)
+    return np.absolute(marginals - marginal_zeros(d2)).sum()
+
+
+def effect_emds(d1, d2s, marginals=None):
+    """Compute the EMD between an effect repertoire and each effect
+    repertoire in a stack.
+
+    The marginals of the whole stack are computed in one pass.
+
+    Args:
+        d1 (np.ndarray): The first repertoire.
+        d2s (np.ndarray): The other repertoires, stacked along the first
+            axis.
+
+    Keyword Args:
+        marginals (np.ndarray): The marginals of ``d1``, as returned by
+            ``distribution.marginal_zeros``, if they are already known.
+
+    Returns:
+        np.ndarray: The EMD between ``d1`` and each repertoire in ``d2s``.
+    """
+    if marginals is None:
+        marginals = marginal_zeros(d1)
+    return np.absolute(
+        marginal_zeros(d2s, stacked=True) - marginals).sum(axis=1)
 
 
 @measures.register('L1')
@@ -177,6 +420,23 @@ def l1(d1, d2):
     return np.absolute(d1 - d2).sum()
 
 
+@measures.register_batched('L1')
+def l1s(d1, d2s):
+    """Return the L1 distance between a distribution and each distribution
+    in a stack.
+
+    Args:
+        d1 (np.ndarray): The first distribution.
+        d2s (np.ndarray): The other distributions, stacked along the first
+            axis.
+
+    Returns:
+        np.ndarray: The L1 distance between ``d1`` and each distribution in
+        ``d2s``.
+    """
+    return np.absolute(d1 - d2s).reshape(len(d2s), -1).sum(axis=1)
+
+
 @measures.register('KLD', asymmetric=True)
 def kld(d1, d2):
     """Return the Kullback-Leibler Divergence (KLD) between two distributions.
@@ -238,7 +498,7 @@ def bld(p, q):
     return max(abs(p * np.nan_to_num(np.log(p / q))))
 
 
-def directional_emd(direction, d1, d2):
+def directional_emd(direction, d1, d2, marginals=None):
     """Compute the EMD between two repertoires for a given direction.
 
     The full EMD computation is used for cause repertoires. A fast analytic
@@ -249,6 +509,10 @@ def directional_emd(direction, d1, d2):
         d1 (np.ndarray): The first repertoire.
         d2 (np.ndarray): The second repertoire.
 
+    Keyword Args:
+        marginals (np.ndarray): The marginals of ``d1``, if they are already
+            known. Only used for effect repertoires.
+
     Returns:
         float: The EMD between ``d1`` and ``d2``, rounded to |PRECISION|.
 
@@ -256,48 +520,132 @@ def directional_emd(direction, d1, d2):
         ValueError: If ``direction`` is invalid.
     """
     if direction == Direction.CAUSE:
-        func = hamming_emd
+        dist = hamming_emd(d1, d2)
     elif direction == Direction.EFFECT:
-        func = effect_emd
+        dist = effect_emd(d1, d2, marginals=marginals)
     else:
         # TODO: test that ValueError is raised
         validate.direction(direction)
 
-    return round(func(d1, d2), config.PRECISION)
+    return round(dist, config.PRECISION)
+
+
+def directional_emds(direction, d1, d2s, marginals=None):
+    """Compute the EMD between a repertoire and each repertoire in a stack
+    for a given direction.
+
+    Args:
+        direction (Direction): |CAUSE| or |EFFECT|.
+        d1 (np.ndarray): The first repertoire.
+        d2s (np.ndarray): The other repertoires, stacked along the first
+            axis.
+
+    Keyword Args:
+        marginals (np.ndarray): The marginals of ``d1``, if they are already
+            known. Only used for effect repertoires.
+
+    Returns:
+        list[float]: The EMD between ``d1`` and each repertoire in ``d2s``,
+        rounded to |PRECISION|.
+
+    Raises:
+        ValueError: If ``direction`` is invalid.
+    """
+    if direction == Direction.CAUSE:
+        dists = hamming_emds(d1, d2s)
+    elif direction == Direction.EFFECT:
+        dists = effect_emds(d1, d2s, marginals=marginals)
+    else:
+        validate.direction(direction)
+
+    return [round(float(dist), config.PRECISION) for dist in dists]
+
+
+def _is_stack(r1, r2):
+    """Return whether ``r2`` is a stack of distributions shaped like ``r1``."""
+    return np.ndim(r2) == np.ndim(r1) + 1
 
 
-def repertoire_distance(direction, r1, r2):
+def repertoire_distance(direction, r1, r2, marginals=None):
     """Compute the distance between two repertoires for the given direction.
 
+    If ``r2`` is a stack of repertoires, the distance between ``r1`` and
+    each of them is returned (see ``repertoire_distances``).
+
     Args:
         direction (Direction): |CAUSE| or |EFFECT|.
         r1 (np.ndarray): The first repertoire.
-        r2 (np.ndarray): The second repertoire.
+        r2 (np.ndarray): The second repertoire, or a stack of repertoires.
+
+    Keyword Args:
+        marginals (np.ndarray): The marginals of ``r1``, as returned by
+            ``distribution.marginal_zeros``, if they are already known. They
+            are only used by the EMD between effect repertoires.
 
     Returns:
         float: The distance between ``d1`` and ``d2``, rounded to |PRECISION|.
     """
+    if _is_stack(r1, r2):
+        return repertoire_distances(direction, r1, r2, marginals=marginals)
+
     if config.MEASURE == 'EMD':
-        dist = directional_emd(direction, r1, r2)
+        dist = directional_emd(direction, r1, r2, marginals=marginals)
     else:
         dist = measures[config.MEASURE](r1, r2)
 
     return round(dist, config.PRECISION)
 
 
+def repertoire_distances(direction, r1, r2s, marginals=None):
+    """Compute the distances between a repertoire and a stack of repertoires
+    for the given direction.
+
+    The batched implementation of the measure (see
+    ``MeasureRegistry.register_batched``) is used, so that the setup shared
+    by the comparisons is done once for the whole stack.
+
+    Args:
+        direction (Direction): |CAUSE| or |EFFECT|.
+        r1 (np.ndarray): The first repertoire.
+        r2s (np.ndarray): The other repertoires, stacked along the first axis.
+
+    Keyword Args:
+        marginals (np.ndarray): The marginals of ``r1``, as returned by
+            ``distribution.marginal_zeros``, if they are already known. They
+            are only used by the EMD between effect repertoires.
+
+    Returns:
+        np.ndarray: The distance between ``r1`` and each repertoire in
+        ``r2s``, rounded to |PRECISION|.
+    """
+    if config.MEASURE == 'EMD':
+        dists = directional_emds(direction, r1, r2s, marginals=marginals)
+    else:
+        dists = measures.batched(config.MEASURE)(r1, r2s)
+
+    return np.array([round(float(dist), config.PRECISION) for dist in dists])
+
+
 def system_repertoire_distance(r1, r2):
     """Compute the distance between two repertoires of a system.
 
+    If ``r2`` is a stack of repertoires, the distance between ``r1`` and
+    each of them is computed with the batched implementation of the measure.
+
     Args:
         r1 (np.ndarray): The first repertoire.
-        r2 (np.ndarray): The second repertoire.
+        r2 (np.ndarray): The second repertoire, or a stack of repertoires.
 
     Returns:
-        float: The distance between ``r1`` and ``r2``.
+        float: The distance between ``r1`` and ``r2``. If ``r2`` is a stack,
+        an ``np.ndarray`` of distances.
     """
     if config.MEASURE in measures.asymmetric():
         raise ValueError(
             '{} is asymmetric and cannot be used as a system-level '
             'irreducibility measure.'.format(config.MEASURE))
 
+    if _is_stack(r1, r2):
+        return measures.batched(config.MEASURE)(r1, r2)
+
     return measures[config.MEASURE](r1, r2)
@@ -55,6 +55,42 @@ def marginal_zero(repertoire, node_index):
     return repertoire[index].sum()
 
 
+@cache()
+def _off_states(shape):
+    """Return a matrix whose ``(i, j)`` entry is 1 if node |j| is OFF in the
+    |ith| state (in C order) of a distribution with the given shape, and 0
+    otherwise.
+    """
+    states = np.indices(shape).reshape(len(shape), -1).T
+    off_states = (states == 0).astype(float)
+    off_states.flags.writeable = False
+    return off_states
+
+
+def marginal_zeros(repertoire, stacked=False):
+    """Return the marginal probability that each node is OFF.
+
+    This is the same as calling ``marginal_zero`` for every node, but all the
+    marginals are computed in a single pass over the repertoire.
+
+    Args:
+        repertoire (np.ndarray): A repertoire.
+
+    Keyword Args:
+        stacked (boolean): If ``True``, ``repertoire`` is a stack of
+            repertoires along the first axis and the marginals of each are
+            returned.
+
+    Returns:
+        np.ndarray: The marginal probability that each node is OFF, with one
+        row per repertoire if ``stacked`` is ``True``.
+    """
+    shape = repertoire.shape[1:] if stacked else repertoire.shape
+    off_states = _off_states(shape)
+    marginals = repertoire.reshape(-1, len(off_states)).dot(off_states)
+    return marginals if stacked else marginals[0]
+
+
 def marginal(repertoire, node_index):
     """Get the marginal distribution for a node."""
     index = tuple(i for i in range(repertoire.ndim) if i != node_index)
@@ -127,6 +163,33 @@ def repertoire_shape(purview, N):  # pylint: disable=redefined-outer-name
     return [2 if i in purview else 1 for i in range(N)]
 
 
+def permute(repertoire, mapping, N):
+    """Relabel the nodes of a repertoire.
+
+    Args:
+        repertoire (np.ndarray): A repertoire.
+        mapping (dict[int, int]): The image of each node of the purview.
+        N (int): The number of elements in the system of the image.
+
+    Returns:
+        np.ndarray: The repertoire over the image of the purview.
+
+    Example:
+        >>> repertoire = np.array([0.1, 0.2, 0.3, 0.4]).reshape(2, 2, 1)
+        >>> permute(repertoire, {0: 2, 1: 0}, 3).ravel()
+        array([0.1, 0.3, 0.2, 0.4])
+    """
+    if repertoire is None:
+        return None
+
+    old_purview = purview(repertoire)
+    new_purview = tuple(sorted(mapping[i] for i in old_purview))
+    inverse = {mapping[i]: i for i in old_purview}
+    axes = [old_purview.index(inverse[j]) for j in new_purview]
+    return repertoire.reshape([2] * len(old_purview)).transpose(axes).reshape(
+        repertoire_shape(new_purview, N))
+
+
 def flatten(repertoire, big_endian=False):
     """Flatten a repertoire, removing empty dimensions.
 
@@ -151,7 +214,7 @@ def flatten(repertoire, big_endian=False):
     return repertoire.squeeze().ravel(order=order)
 
 
-@cache(cache={}, maxmem=None)
+@cache()
 def max_entropy_distribution(node_indices, number_of_nodes):
     """Return the maximum entropy distribution over a set of nodes.
 
@@ -324,6 +324,24 @@ class MacroSubsystem(Subsystem):
             if self.cut.splits_mechanism(micro_mechanism):
                 yield mechanism
 
+    def concept_unaffected_by_cut(self, concept):
+        """Macro concepts are always recomputed, since the cut is applied to
+        the micro system.
+        """
+        return False
+
+    def automorphisms(self):
+        """Macro subsystems are cut at the micro level, so only the identity
+        is returned.
+        """
+        yield {i: i for i in self.node_indices}
+
+    def canonical_form(self, max_orderings=1000):
+        """Macro subsystems are not canonicalized, since their TPM depends on
+        the micro system and the coarse-graining.
+        """
+        return None
+
     @property
     def cut_node_labels(self):
         """Labels for the nodes that can be cut.
@@ -37,6 +37,17 @@ class _CutBase:
         """
         raise NotImplementedError
 
+    def cut_mask(self, n):
+        """Return the connections severed by this cut as a bitmask.
+
+        Bit |n * a + b| is set if the connection from node `a` to node `b` is
+        cut. See :func:`connectivity.cm_to_mask`.
+
+        Args:
+           n (int): The size of the network.
+        """
+        return connectivity.cm_to_mask(self.cut_matrix(n))
+
     @property
     def is_null(self):
         """Is this cut a null cut?
@@ -64,7 +75,8 @@ class _CutBase:
             b (tuple[int]): A set of nodes.
         """
         n = max(self.indices) + 1
-        return self.cut_matrix(n)[np.ix_(a, b)].any()
+        return bool(self.cut_mask(n) &
+                    connectivity.relevant_connections_mask(n, a, b))
 
     def splits_mechanism(self, mechanism):
         """Check if this cut splits a mechanism.
@@ -84,8 +96,11 @@ class _CutBase:
         Yields:
             tuple[int]: The next cut mechanism.
         """
+        n = max(self.indices) + 1
+        cut_mask = self.cut_mask(n)
         for mechanism in utils.powerset(self.indices, nonempty=True):
-            if self.splits_mechanism(mechanism):
+            if cut_mask & connectivity.relevant_connections_mask(
+                    n, mechanism, mechanism):
                 yield mechanism
 
 
@@ -110,6 +125,10 @@ class NullCut(_CutBase):
         """Return a matrix of zeros."""
         return np.zeros((n, n))
 
+    def cut_mask(self, n):
+        """Return an empty mask."""
+        return 0
+
     def to_json(self):
         return {'indices': self.indices}
 
@@ -169,6 +188,37 @@ class Cut(_CutBase):
         return connectivity.relevant_connections(n, self.from_nodes,
                                                  self.to_nodes)
 
+    def cut_mask(self, n):
+        """Compute the cut mask for this cut.
+
+        Example:
+            >>> cut = Cut((1,), (2,))
+            >>> bin(cut.cut_mask(3))
+            '0b100000'
+        """
+        return connectivity.relevant_connections_mask(n, self.from_nodes,
+                                                      self.to_nodes)
+
+    def cuts_connections(self, a, b):
+        """Check if this cut severs any connections from ``a`` to ``b``.
+
+        Args:
+            a (tuple[int]): A set of nodes.
+            b (tuple[int]): A set of nodes.
+        """
+        return bool(utils.bitmask(self.from_nodes) & utils.bitmask(a) and
+                    utils.bitmask(self.to_nodes) & utils.bitmask(b))
+
+    def permute(self, mapping):
+        """Return the image of this cut under a permutation of the nodes.
+
+        Args:
+            mapping (dict[int, int]): The image of each node.
+        """
+        return Cut(tuple(sorted(mapping[i] for i in self.from_nodes)),
+                   tuple(sorted(mapping[i] for i in self.to_nodes)),
+                   self.node_labels)
+
     @cmp.sametype
     def __eq__(self, other):
         return (self.from_nodes == other.from_nodes and
@@ -213,6 +263,30 @@ class KCut(_CutBase):
 
         return cm
 
+    def cut_mask(self, n):
+        """The connections that are severed by this cut, as a bitmask."""
+        indices = utils.bitmask(self.indices)
+        mask = 0
+        for part in self.partition:
+            from_, to = self.direction.order(part.mechanism, part.purview)
+            # All indices external to this part
+            external = utils.bitmask_nodes(indices & ~utils.bitmask(to))
+            mask |= connectivity.relevant_connections_mask(n, from_, external)
+        return mask
+
+    def permute(self, mapping):
+        """Return the image of this cut under a permutation of the nodes.
+
+        The parts of the partition of the image are sorted (see
+        ``KPartition.normalize``).
+
+        Args:
+            mapping (dict[int, int]): The image of each node.
+        """
+        return type(self)(self.direction,
+                          self.partition.permute(mapping).normalize(),
+                          self.node_labels)
+
     @cmp.sametype
     def __eq__(self, other):
         return (self.partition == other.partition and
@@ -311,6 +385,22 @@ class KPartition(collections.Sequence):
         """Normalize the order of parts in the partition."""
         return type(self)(*sorted(self), node_labels=self.node_labels)
 
+    def permute(self, mapping, node_labels=None):
+        """Return the image of this partition under a permutation of the
+        nodes.
+
+        Args:
+            mapping (dict[int, int]): The image of each node.
+            node_labels (NodeLabels): The labels of the image. Defaults to the
+                labels of this partition.
+        """
+        return type(self)(
+            *(Part(tuple(sorted(mapping[i] for i in part.mechanism)),
+                   tuple(sorted(mapping[i] for i in part.purview)))
+              for part in self),
+            node_labels=(self.node_labels if node_labels is None
+                         else node_labels))
+
     def to_json(self):
         return {'parts': list(self)}
 
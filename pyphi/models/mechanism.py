@@ -131,6 +131,30 @@ class RepertoireIrreducibilityAnalysis(cmp.Orderable):
     def to_json(self):
         return {attr: getattr(self, attr) for attr in _ria_attributes}
 
+    def permute(self, mapping, subsystem):
+        """Return the image of this analysis under a relabeling of the nodes.
+
+        Args:
+            mapping (dict[int, int]): The image of each node.
+            subsystem (Subsystem): The subsystem of the image.
+        """
+        def _permute(nodes):
+            return tuple(sorted(mapping[i] for i in nodes))
+
+        return RepertoireIrreducibilityAnalysis(
+            phi=self.phi,
+            direction=self.direction,
+            mechanism=_permute(self.mechanism),
+            purview=_permute(self.purview),
+            partition=(None if self.partition is None else
+                       self.partition.permute(mapping,
+                                              subsystem.node_labels)),
+            repertoire=distribution.permute(
+                self.repertoire, mapping, subsystem.tpm_size),
+            partitioned_repertoire=distribution.permute(
+                self.partitioned_repertoire, mapping, subsystem.tpm_size),
+            node_labels=subsystem.node_labels)
+
 
 def _null_ria(direction, mechanism, purview, repertoire=None, phi=0.0):
     """The irreducibility analysis for a reducible mechanism."""
@@ -234,6 +258,12 @@ class MaximallyIrreducibleCauseOrEffect(cmp.Orderable):
     def __hash__(self):
         return hash(self._ria)
 
+    def permute(self, mapping, subsystem):
+        """Return the image of this MICE under a relabeling of the nodes. See
+        |RepertoireIrreducibilityAnalysis.permute()|.
+        """
+        return type(self)(self._ria.permute(mapping, subsystem))
+
     def to_json(self):
         return {'ria': self.ria}
 
@@ -272,6 +302,22 @@ class MaximallyIrreducibleCauseOrEffect(cmp.Orderable):
         return connectivity.relevant_connections(subsystem.network.size,
                                                  _from, to)
 
+    def connection_mask(self, n):
+        """Return the connections that this MICE depends on as a bitmask.
+
+        These are the connections within the mechanism and the relevant
+        connections between the purview and mechanism (see
+        :func:`connectivity.relevant_connections_mask`).
+
+        Args:
+            n (int): The size of the network.
+        """
+        _from, to = self.direction.order(self.mechanism, self.purview)
+        return (
+            connectivity.relevant_connections_mask(n, self.mechanism,
+                                                   self.mechanism) |
+            connectivity.relevant_connections_mask(n, _from, to))
+
     # TODO: pass in `cut` instead? We can infer
     # subsystem indices from the cut itself, validate, and check.
     def damaged_by_cut(self, subsystem):
@@ -280,9 +326,8 @@ class MaximallyIrreducibleCauseOrEffect(cmp.Orderable):
         The cut affects the MICE if it either splits the MICE's mechanism
         or splits the connections between the purview and mechanism.
         """
-        return (subsystem.cut.splits_mechanism(self.mechanism) or
-                np.any(self._relevant_connections(subsystem) *
-                       subsystem.cut.cut_matrix(subsystem.network.size) == 1))
+        return bool(self.connection_mask(subsystem.network.size) &
+                    subsystem.cut_mask)
 
 
 class MaximallyIrreducibleCause(MaximallyIrreducibleCauseOrEffect):
@@ -359,6 +404,7 @@ class Concept(cmp.Orderable):
         self.time = time
         self.subsystem = subsystem
         self.node_labels = subsystem.node_labels
+        self._fingerprint = None
 
     def __repr__(self):
         return fmt.make_repr(self, _concept_attributes)
@@ -448,6 +494,37 @@ class Concept(cmp.Orderable):
                 self.mechanism == other.mechanism and
                 self.eq_repertoires(other))
 
+    @property
+    def fingerprint(self):
+        """tuple: A hashable summary of the mechanism, |small_phi| and
+        repertoires of the concept, computed once.
+
+        Concepts which are equal in the context of an EMD calculation (see
+        ``emd_eq``) have the same fingerprint, so they can be matched through
+        a dictionary. Concepts with the same fingerprint are not necessarily
+        equal, since the repertoires are hashed.
+        """
+        if self._fingerprint is None:
+            self._fingerprint = (self.mechanism,
+                                 self.phi,
+                                 utils.np_hash(self.cause_repertoire),
+                                 utils.np_hash(self.effect_repertoire))
+        return self._fingerprint
+
+    def permute(self, mapping, subsystem):
+        """Return the image of this concept under a relabeling of the nodes.
+
+        Args:
+            mapping (dict[int, int]): The image of each node.
+            subsystem (Subsystem): The subsystem of the image.
+        """
+        return Concept(
+            mechanism=tuple(sorted(mapping[i] for i in self.mechanism)),
+            cause=self.cause.permute(mapping, subsystem),
+            effect=self.effect.permute(mapping, subsystem),
+            subsystem=subsystem,
+            time=self.time)
+
     # These methods are used by phiserver
     # TODO Rename to expanded_cause_repertoire, etc
     def expand_cause_repertoire(self, new_purview=None):
@@ -7,7 +7,7 @@
 import collections
 
 from . import cmp, fmt
-from .. import utils
+from .. import cache, utils
 
 _sia_attributes = ['phi', 'ces', 'partitioned_ces', 'subsystem',
                    'cut_subsystem']
@@ -25,6 +25,16 @@ class CauseEffectStructure(cmp.Orderable, collections.Sequence):
         self.concepts = tuple(sorted(concepts, key=_concept_sort_key))
         self.subsystem = subsystem
         self.time = time
+        # Data shared by the distances to this CES computed for every cut of
+        # a system (see ``compute.distance``): the null concept of the
+        # subsystem, the distance of each concept to it, by mechanism, and
+        # the repertoires of the concepts expanded to other purviews. The
+        # expanded repertoires are kept within the memory budget of the
+        # caches, and cleared once the cuts have been evaluated.
+        self._null_concept = None
+        self.null_distances = {}
+        self.expanded_repertoires = cache.DictCache()
+        self._fingerprints = None
 
     def __len__(self):
         return len(self.concepts)
@@ -55,6 +65,34 @@ class CauseEffectStructure(cmp.Orderable, collections.Sequence):
         return {'concepts': self.concepts, 'subsystem': self.subsystem,
                 'time': self.time}
 
+    def permute(self, mapping, subsystem):
+        """Return the image of this cause-effect structure under a relabeling
+        of the nodes.
+
+        Args:
+            mapping (dict[int, int]): The image of each node.
+            subsystem (Subsystem): The subsystem of the image.
+        """
+        return CauseEffectStructure(
+            (concept.permute(mapping, subsystem) for concept in self),
+            subsystem=subsystem, time=self.time)
+
+    @property
+    def null_concept(self):
+        """Concept: The null concept of the subsystem, computed once."""
+        if self._null_concept is None:
+            self._null_concept = self.subsystem.null_concept
+        return self._null_concept
+
+    @property
+    def fingerprints(self):
+        """dict[tuple, Concept]: The concepts, keyed by fingerprint (see
+        ``Concept.fingerprint``), computed once."""
+        if self._fingerprints is None:
+            self._fingerprints = {concept.fingerprint: concept
+                                  for concept in self}
+        return self._fingerprints
+
     @property
     def mechanisms(self):
         """The mechanism of each concept."""
@@ -163,6 +201,30 @@ class SystemIrreducibilityAnalysis(cmp.Orderable):
             for attr in _sia_attributes + ['time', 'small_phi_time']
         }
 
+    def permute(self, mapping, subsystem):
+        """Return the image of this analysis under a relabeling of the nodes.
+
+        Args:
+            mapping (dict[int, int]): The image of each node of the subsystem
+                of this analysis.
+            subsystem (Subsystem): The subsystem of the image. It must be
+                isomorphic to the subsystem of this analysis under
+                ``mapping``.
+        """
+        if self.cut_subsystem.is_cut:
+            cut_subsystem = subsystem.apply_cut(self.cut.permute(mapping))
+        else:
+            cut_subsystem = subsystem
+
+        return SystemIrreducibilityAnalysis(
+            phi=self.phi,
+            ces=self.ces.permute(mapping, subsystem),
+            partitioned_ces=self.partitioned_ces.permute(mapping,
+                                                         cut_subsystem),
+            subsystem=subsystem,
+            cut_subsystem=cut_subsystem,
+            time=self.time)
+
     @classmethod
     def from_json(cls, dct):
         del dct['small_phi_time']
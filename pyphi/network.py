@@ -11,7 +11,7 @@ import numpy as np
 
 from . import cache, connectivity, convert, jsonify, utils, validate
 from .labels import NodeLabels
-from .tpm import is_state_by_state
+from .tpm import is_consistent_with_cm, is_state_by_state
 
 
 class Network:
@@ -63,6 +63,8 @@ class Network:
         self._node_indices = tuple(range(self.size))
         self._node_labels = NodeLabels(node_labels, self._node_indices)
         self.purview_cache = purview_cache or cache.PurviewCache()
+        self.node_cache = cache.NodeCache()
+        self._shares_nodes = None
 
         validate.network(self)
 
@@ -120,6 +122,21 @@ class Network:
         """np.ndarray: Alias for ``cm``."""
         return self._cm
 
+    @property
+    def shares_nodes(self):
+        """bool: Whether the TPMs and single-node repertoires of the nodes of
+        subsystems of this network are shared between subsystems.
+
+        They are shared through ``node_cache`` if every node of the TPM only
+        depends on its inputs in the connectivity matrix (see
+        :func:`tpm.is_consistent_with_cm`), since then the TPM of a node only
+        depends on which of its inputs are in a subsystem, which of those are
+        cut, and the state of the inputs outside the subsystem.
+        """
+        if self._shares_nodes is None:
+            self._shares_nodes = is_consistent_with_cm(self.tpm, self.cm)
+        return self._shares_nodes
+
     @property
     def causally_significant_nodes(self):
         """See :func:`pyphi.connectivity.causally_significant_nodes`."""
@@ -227,10 +244,14 @@ def irreducible_purviews(cm, direction, mechanism, purviews):
     Raises:
         ValueError: If ``direction`` is invalid.
     """
+    # Convert the connectivity matrix and mechanism to bitmasks once
+    outputs, inputs = connectivity.cm_to_node_masks(cm)
+    mechanism_mask = utils.bitmask(mechanism)
+
     def reducible(purview):
         """Return ``True`` if purview is trivially reducible."""
-        _from, to = direction.order(mechanism, purview)
-        return connectivity.block_reducible(cm, _from, to)
+        _from, to = direction.order(mechanism_mask, utils.bitmask(purview))
+        return connectivity.block_reducible_mask(outputs, inputs, _from, to)
 
     return [purview for purview in purviews if not reducible(purview)]
 
@@ -14,7 +14,7 @@ import numpy as np
 from . import utils
 from .connectivity import get_inputs_from_cm, get_outputs_from_cm
 from .labels import NodeLabels
-from .tpm import marginalize_out, tpm_indices
+from .tpm import condition_tpm, marginalize_out, tpm_indices
 
 
 # TODO extend to nonbinary nodes
@@ -29,15 +29,26 @@ class Node:
         state (int): The state of this node.
         node_labels (|NodeLabels|): Labels for these nodes.
 
+    Keyword Args:
+        network (Network): The network of the subsystem. If provided and
+            ``network.shares_nodes`` is ``True``, the node's TPM is taken from
+            the network's node cache, so that it is shared with the nodes of
+            other subsystems.
+        network_state (tuple[int]): The state of the network. Required if
+            ``network`` is provided.
+
     Attributes:
         tpm (np.ndarray): The node TPM is a 2^(n_inputs)-by-2 matrix, where
             node.tpm[i][j] gives the marginal probability that the node is in
             state j at t+1 if the state of its inputs is i at t. If the node is
             a single element with a cut selfloop, (i.e. it has no inputs), the
             tpm is simply its unconstrained effect repertoire.
+        key (tuple): The key of the node's TPM in the network's node cache, or
+            ``None`` if it is not shared.
     """
 
-    def __init__(self, tpm, cm, index, state, node_labels):
+    def __init__(self, tpm, cm, index, state, node_labels, network=None,
+                 network_state=None):
 
         # This node's index in the list of nodes.
         self.index = index
@@ -52,8 +63,34 @@ class Node:
         self._inputs = frozenset(get_inputs_from_cm(self.index, cm))
         self._outputs = frozenset(get_outputs_from_cm(self.index, cm))
 
-        # Generate the node's TPM.
-        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        if network is not None and network.shares_nodes:
+            # The TPM only depends on which of the node's inputs in the
+            # network are in the subsystem, which of those are not cut, and
+            # the state of the others.
+            internal = frozenset(tpm_indices(tpm))
+            inputs = frozenset(get_inputs_from_cm(self.index, network.cm))
+            self.key = (index,
+                        utils.bitmask(inputs & internal),
+                        utils.bitmask(self._inputs & internal),
+                        utils.state_of(sorted(inputs - internal),
+                                       network_state))
+            shared = network.node_cache.get(self.key)
+            if shared is None:
+                shared = self._shared_tpm(network.tpm, inputs, internal,
+                                          network_state)
+                network.node_cache.set(self.key, shared)
+            self.tpm, tpm_hash = shared
+        else:
+            self.key = None
+            self.tpm = self._subsystem_tpm(tpm)
+            tpm_hash = utils.np_hash(self.tpm)
+
+        # Only compute the hash once.
+        self._hash = hash((index, tpm_hash, self.state,
+                           self._inputs, self._outputs))
+
+    def _subsystem_tpm(self, tpm):
+        """Compute the node's TPM from the TPM of the subsystem."""
         # We begin by getting the part of the subsystem's TPM that gives just
         # the state of this node. This part is still indexed by network state,
         # but its last dimension will be gone, since now there's just a single
@@ -68,6 +105,33 @@ class Node:
         non_inputs = set(tpm_indices(tpm)) - self._inputs
         tpm_on = marginalize_out(non_inputs, tpm_on)
 
+        return self._stack(tpm_on)
+
+    def _shared_tpm(self, network_tpm, inputs, internal, network_state):
+        """Compute the node's TPM and its hash from the TPM of the network.
+
+        This is the same TPM as ``_subsystem_tpm`` computes when the node
+        only depends on its inputs in the network's connectivity matrix.
+        """
+        # Condition on the state of the inputs outside of the subsystem. The
+        # node doesn't depend on the state of the other nodes, so we can
+        # condition on any state of those.
+        fixed = set(range(len(network_state))) - (inputs & internal)
+        state = tuple(network_state[i] if i in inputs else 0
+                      for i in range(len(network_state)))
+        tpm_on = condition_tpm(network_tpm[..., self.index], fixed, state)
+
+        # Marginalize out the inputs in the subsystem which are cut.
+        tpm_on = marginalize_out((inputs & internal) - self._inputs, tpm_on)
+
+        tpm = self._stack(tpm_on)
+        return (tpm, utils.np_hash(tpm))
+
+    @staticmethod
+    def _stack(tpm_on):
+        """Combine the on-TPM with the off-TPM, and make the result immutable
+        (for hashing).
+        """
         # Get the TPM that gives the probability of the node being off, rather
         # than on.
         tpm_off = 1 - tpm_on
@@ -76,15 +140,10 @@ class Node:
         # the state of the node's inputs at t, and the last dimension is
         # indexed by the node's state at t+1. This representation makes it easy
         # to condition on the node state.
-        self.tpm = np.stack([tpm_off, tpm_on], axis=-1)
-        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+        tpm = np.stack([tpm_off, tpm_on], axis=-1)
 
-        # Make the TPM immutable (for hashing).
-        utils.np_immutable(self.tpm)
-
-        # Only compute the hash once.
-        self._hash = hash((index, utils.np_hash(self.tpm), self.state,
-                           self._inputs, self._outputs))
+        utils.np_immutable(tpm)
+        return tpm
 
     @property
     def tpm_off(self):
@@ -148,7 +207,8 @@ class Node:
         return self.index
 
 
-def generate_nodes(tpm, cm, network_state, indices, node_labels=None):
+def generate_nodes(tpm, cm, network_state, indices, node_labels=None,
+                   network=None):
     """Generate |Node| objects for a subsystem.
 
     Args:
@@ -159,6 +219,8 @@ def generate_nodes(tpm, cm, network_state, indices, node_labels=None):
 
     Keyword Args:
         node_labels (|NodeLabels|): Textual labels for each node.
+        network (Network): The network of the system, whose node cache is used
+            to share the TPMs of the nodes between subsystems.
 
     Returns:
         tuple[Node]: The nodes of the system.
@@ -168,7 +230,8 @@ def generate_nodes(tpm, cm, network_state, indices, node_labels=None):
 
     node_state = utils.state_of(indices, network_state)
 
-    return tuple(Node(tpm, cm, index, state, node_labels)
+    return tuple(Node(tpm, cm, index, state, node_labels, network=network,
+                      network_state=network_state)
                  for index, state in zip(indices, node_state))
 
 
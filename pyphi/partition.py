@@ -42,7 +42,7 @@ def partitions(collection):  # pylint: disable=inconsistent-return-statements
         yield [[first]] + smaller
 
 
-@cache(cache={}, maxmem=None)
+@cache()
 def bipartition_indices(N):
     """Return indices for undirected bipartitions of a sequence.
 
@@ -91,7 +91,7 @@ def bipartition(seq):
             for part0_idx, part1_idx in bipartition_indices(len(seq))]
 
 
-@cache(cache={}, maxmem=None)
+@cache()
 def directed_bipartition_indices(N):
     """Return indices for directed bipartitions of a sequence.
 
@@ -189,7 +189,7 @@ def directed_bipartition_of_one(seq):
     return chain(bipartitions, reverse_elements(bipartitions))
 
 
-@cache(cache={}, maxmem=None)
+@cache()
 def directed_tripartition_indices(N):
     """Return indices for directed tripartitions of a sequence.
 
@@ -373,6 +373,12 @@ class PartitionRegistry(Registry):
 
 partition_registry = PartitionRegistry()
 
+#: The partition schemes which always include a partition that severs the
+#: mechanism from the purview, *i.e.* in which every part has an empty
+#: mechanism or an empty purview. The partitioned repertoire of such a
+#: partition is the unconstrained repertoire of the purview.
+SEVERING_PARTITION_TYPES = ('BI', 'TRI', 'ALL')
+
 
 def mip_partitions(mechanism, purview, node_labels=None):
     """Return a generator over all mechanism-purview partitions, based on the
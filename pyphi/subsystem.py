@@ -4,20 +4,24 @@
 
 """Represents a candidate system for |small_phi| and |big_phi| evaluation."""
 
+import copy
 import functools
 import logging
+from collections import defaultdict
+from itertools import chain, islice, permutations, product
 
 import numpy as np
 
-from . import Direction, cache, distribution, utils, validate
-from .distance import repertoire_distance
+from . import Direction, cache, config, distribution, utils, validate
+from .distance import repertoire_distance, repertoire_distances
 from .distribution import max_entropy_distribution, repertoire_shape
 from .models import (Concept, MaximallyIrreducibleCause,
                      MaximallyIrreducibleEffect, NullCut,
                      RepertoireIrreducibilityAnalysis, _null_ria)
+from .compute.parallel import checkpoint
 from .network import irreducible_purviews
-from .node import generate_nodes
-from .partition import mip_partitions
+from .node import Node, generate_nodes
+from .partition import SEVERING_PARTITION_TYPES, mip_partitions
 from .tpm import condition_tpm, marginalize_out
 from .utils import time_annotated
 
@@ -85,6 +89,9 @@ class Subsystem:
         # The network's connectivity matrix with cut applied
         self.cm = self.cut.apply_cut(network.cm)
 
+        # The connections severed by the cut as a bitmask; computed lazily
+        self._cut_mask = None
+
         # Reusable cache for maximally-irreducible causes and effects
         self._mice_cache = cache.MICECache(self, mice_cache)
 
@@ -92,11 +99,15 @@ class Subsystem:
         # TODO: if repertoire caches are never reused, there's no reason to
         # have an accesible object-level cache. Just use a simple memoizer
         self._single_node_repertoire_cache = \
-            single_node_repertoire_cache or cache.DictCache()
-        self._repertoire_cache = repertoire_cache or cache.DictCache()
+            single_node_repertoire_cache or cache.RepertoireCache(self)
+        self._repertoire_cache = (repertoire_cache or
+                                  cache.RepertoireCache(self))
+        # Marginals of the effect repertoires, cached alongside them
+        self._marginal_cache = cache.RepertoireCache(self)
 
         self.nodes = generate_nodes(
-            self.tpm, self.cm, self.state, self.node_indices, self.node_labels)
+            self.tpm, self.cm, self.state, self.node_indices, self.node_labels,
+            network=self.network)
 
         validate.subsystem(self)
 
@@ -138,6 +149,15 @@ class Subsystem:
         """bool: ``True`` if this Subsystem has a cut applied to it."""
         return not self.cut.is_null
 
+    @property
+    def cut_mask(self):
+        """int: The connections severed by the cut, as a bitmask over the
+        network's connectivity matrix. See ``Cut.cut_mask()``.
+        """
+        if self._cut_mask is None:
+            self._cut_mask = self.cut.cut_mask(self.network.size)
+        return self._cut_mask
+
     @property
     def cut_indices(self):
         """tuple[int]: The nodes of this subsystem to cut for |big_phi|
@@ -156,6 +176,121 @@ class Subsystem:
         """list[tuple[int]]: The mechanisms that are cut in this system."""
         return self.cut.all_cut_mechanisms()
 
+    def concept_unaffected_by_cut(self, concept):
+        """Return whether a concept of the uncut subsystem is unaffected by
+        this subsystem's cut.
+
+        This is the case if neither its |MIC| nor its |MIE| is damaged by the
+        cut (see ``MICE.damaged_by_cut()``), so that it is also a concept of
+        this subsystem.
+        """
+        return not (concept.cause.damaged_by_cut(self) or
+                    concept.effect.damaged_by_cut(self))
+
+    def automorphisms(self):
+        """Return the automorphisms of this subsystem.
+
+        An automorphism is a permutation of the nodes of the subsystem which
+        preserves their state, the connectivity matrix and the TPM. Cuts which
+        are images of each other under an automorphism have the same
+        |big_phi|, except when a mechanism has several purviews with the same
+        |small_phi|: the tie is resolved by the order of the purviews, which
+        is not preserved by the permutation, so the cuts may be evaluated
+        with different |MICE| and their |big_phi| may differ.
+
+        Yields:
+            dict[int, int]: The image of each node of the subsystem, beginning
+            with the identity.
+        """
+        nodes = list(self.node_indices)
+        cm = self.cm
+        tpm = self.tpm
+
+        # Nodes can only be mapped to nodes with the same invariants
+        invariants = {i: self._node_invariants(i) for i in nodes}
+        candidates = {i: [j for j in nodes if invariants[j] == invariants[i]]
+                      for i in nodes}
+
+        def preserves_tpm(mapping):
+            inverse = list(range(self.network.size))
+            for i, j in mapping.items():
+                inverse[j] = i
+            image = tpm.transpose(inverse + [tpm.ndim - 1])[..., inverse]
+            return np.allclose(image[..., nodes], tpm[..., nodes])
+
+        def extend(mapping, remaining):
+            if not remaining:
+                if preserves_tpm(mapping):
+                    yield dict(mapping)
+                return
+
+            i, remaining = remaining[0], remaining[1:]
+            used = set(mapping.values())
+            for j in candidates[i]:
+                if j in used or not all(
+                        cm[i, k] == cm[j, mapping[k]] and
+                        cm[k, i] == cm[mapping[k], j] for k in mapping):
+                    continue
+                mapping[i] = j
+                yield from extend(mapping, remaining)
+                del mapping[i]
+
+        return extend({}, self.node_indices)
+
+    def _node_invariants(self, i):
+        """Properties of a node which are preserved by relabeling the nodes
+        of the subsystem.
+        """
+        nodes = list(self.node_indices)
+        return (self.state[i], int(self.cm[i, i]),
+                int(self.cm[i, nodes].sum()), int(self.cm[nodes, i].sum()),
+                tuple(np.sort(self.tpm[..., i], axis=None)))
+
+    def canonical_form(self, max_orderings=1000):
+        """Return a canonical form of this subsystem.
+
+        Subsystems which are the same up to a relabeling of their nodes, *i.e.*
+        whose nodes have the same states, connectivity and TPM conditioned on
+        the external nodes, have the same canonical form. The subsystems may
+        belong to different networks.
+
+        Nodes are ordered by their invariants; ties are broken by trying the
+        orderings of nodes with the same invariants and keeping the smallest
+        encoding. At most ``max_orderings`` orderings are tried, so the form
+        of subsystems with many symmetric nodes may not be canonical; equal
+        forms still imply isomorphic subsystems.
+
+        Returns:
+            tuple[tuple, tuple[int]] | None: A hashable key and the nodes of
+            the subsystem in canonical order. The |ith| nodes in the orders of
+            two subsystems with the same key correspond to each other. ``None``
+            if the subsystem is cut.
+        """
+        if self.is_cut:
+            return None
+
+        invariants = {i: self._node_invariants(i) for i in self.node_indices}
+        classes = [
+            tuple(i for i in self.node_indices if invariants[i] == invariant)
+            for invariant in sorted(set(invariants.values()))
+        ]
+        tpm = self.tpm
+
+        def encode(order):
+            order = list(order)
+            image = tpm.transpose(order + list(self.external_indices) +
+                                  [tpm.ndim - 1])[..., order]
+            return (tuple(self.state[i] for i in order),
+                    self.cm[np.ix_(order, order)].astype(np.uint8).tobytes(),
+                    np.ascontiguousarray(image, dtype=float).tobytes())
+
+        orderings = islice(product(*map(permutations, classes)), max_orderings)
+        encoding, order = min(
+            (encode(order), order) for order in
+            (tuple(chain.from_iterable(ordering)) for ordering in orderings))
+
+        return (tuple(sorted(invariants.values())), encoding), order
+
     @property
     def cut_node_labels(self):
         """``NodeLabels``: Labels for the nodes of this system that will be
@@ -169,18 +304,22 @@ class Subsystem:
         return self.tpm.shape[-1]
 
     def cache_info(self):
-        """Report repertoire cache statistics."""
+        """Report repertoire cache statistics, including the estimated number
+        of bytes used by each cache.
+        """
         return {
             'single_node_repertoire':
-                self._single_node_repertoire_cache.info(),
-            'repertoire': self._repertoire_cache.info(),
-            'mice': self._mice_cache.info()
+                self._single_node_repertoire_cache.memory_info(),
+            'repertoire': self._repertoire_cache.memory_info(),
+            'marginal': self._marginal_cache.memory_info(),
+            'mice': self._mice_cache.memory_info()
         }
 
     def clear_caches(self):
         """Clear the mice and repertoire caches."""
         self._single_node_repertoire_cache.clear()
         self._repertoire_cache.clear()
+        self._marginal_cache.clear()
         self._mice_cache.clear()
 
     def __repr__(self):
@@ -247,14 +386,55 @@ class Subsystem:
     def apply_cut(self, cut):
         """Return a cut version of this |Subsystem|.
 
+        The cut subsystem is a view of this one: it shares the TPM, the nodes
+        whose connections are not severed by the cut and, through
+        ``cache.CutRepertoireCache``, the repertoires which the cut does not
+        change. Only the nodes whose connections are severed are rebuilt, and
+        only the cut is validated, since the state and TPM are unchanged.
+
         Args:
-            cut (Cut): The cut to apply to this |Subsystem|.
+            cut (Cut): The cut to apply to this |Subsystem|. If ``None``, the
+                null cut is applied.
 
         Returns:
             Subsystem: The cut subsystem.
         """
-        return Subsystem(self.network, self.state, self.node_indices,
-                         cut=cut, mice_cache=self._mice_cache)
+        if cut is None:
+            cut = NullCut(self.node_indices, self.node_labels)
+        validate.cut(cut, self.cut_indices)
+
+        cm = cut.apply_cut(self.network.cm)
+        severed = (cm != self.cm)
+        # Nodes whose inputs and outputs are severed by the cut
+        inputs_severed = severed.any(axis=0)
+        outputs_severed = severed.any(axis=1)
+
+        cut_subsystem = copy.copy(self)
+        cut_subsystem.cut = cut
+        cut_subsystem.cm = cm
+        cut_subsystem._cut_mask = None
+        cut_subsystem._mice_cache = cache.MICECache(cut_subsystem,
+                                                    self._mice_cache)
+
+        affected = utils.bitmask(np.flatnonzero(inputs_severed).tolist())
+        cut_subsystem._single_node_repertoire_cache = cache.CutRepertoireCache(
+            self._single_node_repertoire_cache,
+            cache.RepertoireCache(cut_subsystem), affected)
+        cut_subsystem._repertoire_cache = cache.CutRepertoireCache(
+            self._repertoire_cache, cache.RepertoireCache(cut_subsystem),
+            affected)
+        cut_subsystem._marginal_cache = cache.CutRepertoireCache(
+            self._marginal_cache, cache.RepertoireCache(cut_subsystem),
+            affected)
+
+        cut_subsystem.nodes = tuple(
+            Node(self.tpm, cm, node.index, node.state, self.node_labels,
+                 network=self.network, network_state=self.state)
+            if inputs_severed[node.index] or outputs_severed[node.index]
+            else node
+            for node in self.nodes)
+
+        return cut_subsystem
 
     def indices2nodes(self, indices):
         """Return |Nodes| for these indices.
@@ -268,22 +448,43 @@ class Subsystem:
         Raises:
             ValueError: If requested indices are not in the subsystem.
         """
-        if set(indices) - set(self.node_indices):
+        if utils.bitmask(indices) & ~utils.bitmask(self.node_indices):
             raise ValueError(
                 "`indices` must be a subset of the Subsystem's indices.")
         return tuple(self._index2node[n] for n in indices)
 
+    def _shared_node_repertoire(self, node, key, compute):
+        """Look up a single-node repertoire in the network's node cache, where
+        it is shared with the subsystems whose node has the same TPM.
+        """
+        if node.key is None:
+            return compute()
+        key = (node.key,) + key
+        repertoire = self.network.node_cache.get(key)
+        if repertoire is None:
+            repertoire = compute()
+            self.network.node_cache.set(key, repertoire)
+        return repertoire
+
     # TODO extend to nonbinary nodes
     @cache.method('_single_node_repertoire_cache', Direction.CAUSE)
     def _single_node_cause_repertoire(self, mechanism_node_index, purview):
         # pylint: disable=missing-docstring
         mechanism_node = self._index2node[mechanism_node_index]
-        # We're conditioning on this node's state, so take the TPM for the node
-        # being in that state.
-        tpm = mechanism_node.tpm[..., mechanism_node.state]
-        # Marginalize-out all parents of this mechanism node that aren't in the
-        # purview.
-        return marginalize_out((mechanism_node.inputs - purview), tpm)
+
+        def compute():
+            # We're conditioning on this node's state, so take the TPM for the
+            # node being in that state.
+            tpm = mechanism_node.tpm[..., mechanism_node.state]
+            # Marginalize-out all parents of this mechanism node that aren't
+            # in the purview.
+            return marginalize_out((mechanism_node.inputs - purview), tpm)
+
+        return self._shared_node_repertoire(
+            mechanism_node,
+            (Direction.CAUSE, mechanism_node.state,
+             utils.bitmask(mechanism_node.inputs & purview)),
+            compute)
 
     # TODO extend to nonbinary nodes
     @cache.method('_repertoire_cache', Direction.CAUSE)
@@ -334,15 +535,24 @@ class Subsystem:
     def _single_node_effect_repertoire(self, mechanism, purview_node_index):
         # pylint: disable=missing-docstring
         purview_node = self._index2node[purview_node_index]
-        # Condition on the state of the inputs that are in the mechanism.
         mechanism_inputs = (purview_node.inputs & mechanism)
-        tpm = condition_tpm(purview_node.tpm, mechanism_inputs, self.state)
-        # Marginalize-out the inputs that aren't in the mechanism.
-        nonmechanism_inputs = (purview_node.inputs - mechanism)
-        tpm = marginalize_out(nonmechanism_inputs, tpm)
-        # Reshape so that the distribution is over next states.
-        return tpm.reshape(repertoire_shape([purview_node.index],
-                                            self.tpm_size))
+
+        def compute():
+            # Condition on the state of the inputs that are in the mechanism.
+            tpm = condition_tpm(purview_node.tpm, mechanism_inputs,
+                                self.state)
+            # Marginalize-out the inputs that aren't in the mechanism.
+            nonmechanism_inputs = (purview_node.inputs - mechanism)
+            tpm = marginalize_out(nonmechanism_inputs, tpm)
+            # Reshape so that the distribution is over next states.
+            return tpm.reshape(repertoire_shape([purview_node.index],
+                                                self.tpm_size))
+
+        return self._shared_node_repertoire(
+            purview_node,
+            (Direction.EFFECT, utils.bitmask(mechanism_inputs),
+             utils.state_of(sorted(mechanism_inputs), self.state)),
+            compute)
 
     @cache.method('_repertoire_cache', Direction.EFFECT)
     def effect_repertoire(self, mechanism, purview):
@@ -379,6 +589,173 @@ class Subsystem:
                           for p in purview]
         )
 
+    @cache.method('_marginal_cache', Direction.EFFECT)
+    def effect_marginals(self, mechanism, purview):
+        """Return the marginal probability that each node is OFF in the
+        effect repertoire of a mechanism over a purview.
+
+        The marginals are cached alongside the repertoire, so that the EMD
+        between it and other effect repertoires does not recompute them.
+
+        Args:
+            mechanism (tuple[int]): The mechanism for which to calculate the
+                effect repertoire.
+            purview (tuple[int]): The purview over which to calculate the
+                effect repertoire.
+
+        Returns:
+            np.ndarray: The marginals of the effect repertoire, one per node
+            of the network.
+        """
+        return distribution.marginal_zeros(
+            self.effect_repertoire(mechanism, purview))
+
+    def _marginals(self, direction, mechanism, purview):
+        """Return the marginals of a repertoire to pass to
+        ``repertoire_distance``, or ``None`` if the current |MEASURE| does not
+        use them.
+        """
+        if direction == Direction.EFFECT and config.MEASURE == 'EMD':
+            return self.effect_marginals(mechanism, purview)
+        return None
+
+    def cause_repertoires(self, mechanisms, purview):
+        """Return the cause repertoires of several mechanisms over a purview.
+
+        The factors contributed by each mechanism node are computed once and
+        multiplied into the repertoires of all the mechanisms that contain it.
+
+        Args:
+            mechanisms (list[tuple[int]]): The mechanisms for which to
+                calculate the cause repertoires.
+            purview (tuple[int]): The purview over which to calculate the
+                cause repertoires.
+
+        Returns:
+            np.ndarray: The cause repertoires, stacked along the first axis,
+            so that ``cause_repertoires(mechanisms, purview)[i]`` is
+            ``cause_repertoire(mechanisms[i], purview)``.
+        """
+        mechanisms = list(mechanisms)
+        if not purview:
+            return np.ones((len(mechanisms), 1))
+
+        purview = frozenset(purview)
+        joint = np.ones([len(mechanisms)] +
+                        repertoire_shape(purview, self.tpm_size))
+        for node in sorted(set(chain.from_iterable(mechanisms))):
+            contains = np.array([node in mechanism
+                                 for mechanism in mechanisms])
+            joint[contains] *= self._single_node_cause_repertoire(node,
+                                                                  purview)
+        # Normalize each repertoire; the repertoires of empty mechanisms are
+        # left uniform, which is the maximum entropy distribution.
+        total = joint.sum(axis=tuple(range(1, joint.ndim)), keepdims=True)
+        return np.divide(joint, total, out=joint, where=(total != 0))
+
+    def effect_repertoires(self, mechanisms, purview):
+        """Return the effect repertoires of several mechanisms over a purview.
+
+        The repertoire of a purview node only depends on which of its inputs
+        are in the mechanism, so it is computed once for each such set of
+        inputs and broadcast to all the mechanisms that share it.
+
+        Args:
+            mechanisms (list[tuple[int]]): The mechanisms for which to
+                calculate the effect repertoires.
+            purview (tuple[int]): The purview over which to calculate the
+                effect repertoires.
+
+        Returns:
+            np.ndarray: The effect repertoires, stacked along the first axis,
+            so that ``effect_repertoires(mechanisms, purview)[i]`` is
+            ``effect_repertoire(mechanisms[i], purview)``.
+        """
+        mechanisms = list(mechanisms)
+        if not purview:
+            return np.ones((len(mechanisms), 1))
+
+        joint = np.ones([len(mechanisms)] +
+                        repertoire_shape(purview, self.tpm_size))
+        for purview_node in self.indices2nodes(purview):
+            inputs = [purview_node.inputs.intersection(mechanism)
+                      for mechanism in mechanisms]
+            distinct = list(set(inputs))
+            index = {mechanism_inputs: i
+                     for i, mechanism_inputs in enumerate(distinct)}
+            repertoires = np.stack([
+                self._single_node_effect_repertoire(mechanism_inputs,
+                                                    purview_node.index)
+                for mechanism_inputs in distinct])
+            joint *= repertoires[[index[mechanism_inputs]
+                                  for mechanism_inputs in inputs]]
+        return joint
+
+    def repertoires(self, direction, mechanisms, purview):
+        """Return the cause or effect repertoires of several mechanisms over a
+        purview, stacked along the first axis.
+
+        If :data:`config.CACHE_REPERTOIRES` is enabled, the repertoires are
+        also added to the repertoire cache, so that later calls to
+        ``repertoire`` for these mechanisms and purview are cache hits.
+
+        Args:
+            direction (Direction): |CAUSE| or |EFFECT|.
+            mechanisms (list[tuple[int]]): The mechanisms for which to
+                calculate the repertoires.
+            purview (tuple[int]): The purview over which to calculate the
+                repertoires.
+
+        Returns:
+            np.ndarray: The repertoires of the mechanisms over the purview.
+
+        Raises:
+            ValueError: If ``direction`` is invalid.
+        """
+        mechanisms = list(mechanisms)
+        if direction == Direction.CAUSE:
+            repertoires = self.cause_repertoires(mechanisms, purview)
+        elif direction == Direction.EFFECT:
+            repertoires = self.effect_repertoires(mechanisms, purview)
+        else:
+            return validate.direction(direction)
+
+        if config.CACHE_REPERTOIRES:
+            # Cache copies, so that the cached repertoires don't keep the
+            # whole stack alive and their sizes are accounted correctly
+            for mechanism, repertoire in zip(mechanisms, repertoires):
+                self._repertoire_cache.set(
+                    self._repertoire_cache.key(mechanism, purview,
+                                               _prefix=direction),
+                    repertoire.copy())
+        return repertoires
+
+    def prefetch_repertoires(self, direction, pairs):
+        """Compute the repertoires of many mechanism-purview pairs and add
+        them to the repertoire cache.
+
+        Pairs which are already cached are skipped; the others are grouped by
+        purview and computed with one call to |Subsystem.repertoires()| per
+        purview. Does nothing if :data:`config.CACHE_REPERTOIRES` is disabled.
+
+        Args:
+            direction (Direction): |CAUSE| or |EFFECT|.
+            pairs (Iterable[tuple[tuple[int], tuple[int]]]): The mechanisms
+                and purviews of the repertoires.
+        """
+        if not config.CACHE_REPERTOIRES:
+            return
+
+        cache = self._repertoire_cache
+        missing = defaultdict(set)
+        for mechanism, purview in pairs:
+            key = cache.key(mechanism, purview, _prefix=direction)
+            if key not in cache:
+                missing[purview].add(mechanism)
+
+        for purview, mechanisms in missing.items():
+            self.repertoires(direction, sorted(mechanisms), purview)
+
     def repertoire(self, direction, mechanism, purview):
         """Return the cause or effect repertoire based on a direction.
 
@@ -429,6 +806,35 @@ class Subsystem:
         ]
         return functools.reduce(np.multiply, repertoires)
 
+    def partitioned_repertoires(self, direction, partitions):
+        """Compute the repertoires of several partitions of the same mechanism
+        and purview.
+
+        The repertoires of the parts are looked up in, or added to, the
+        repertoire cache (see |Subsystem.prefetch_repertoires()|).
+
+        Args:
+            direction (Direction): |CAUSE| or |EFFECT|.
+            partitions (list[KPartition]): Partitions of one mechanism and
+                purview.
+
+        Returns:
+            np.ndarray: The partitioned repertoires, stacked along the first
+            axis.
+        """
+        partitions = list(partitions)
+        self.prefetch_repertoires(
+            direction,
+            (part for partition in partitions for part in partition))
+
+        joint = np.ones([len(partitions)] +
+                        repertoire_shape(partitions[0].purview, self.tpm_size))
+        for repertoire, partition in zip(joint, partitions):
+            for part in partition:
+                repertoire *= self.repertoire(direction, part.mechanism,
+                                              part.purview)
+        return joint
+
     def expand_repertoire(self, direction, repertoire, new_purview=None):
         """Distribute an effect repertoire over a larger purview.
 
@@ -579,23 +985,67 @@ class Subsystem:
             return _mip(0, None, None)
 
         mip = _null_ria(direction, mechanism, purview, phi=float('inf'))
+        marginals = self._marginals(direction, mechanism, purview)
+
+        partitions = mip_partitions(mechanism, purview, self.node_labels)
+        # Evaluate the partitions in blocks, finding the distances between the
+        # unpartitioned and partitioned repertoires of a block at once. Blocks
+        # start small and double in size, so that little work is wasted when
+        # a reducible mechanism is found early.
+        block_size = 1
+        while True:
+            block = list(islice(partitions, block_size))
+            if not block:
+                return mip
+            block_size = min(2 * block_size, config.PARTITION_BLOCK_SIZE)
+
+            partitioned_repertoires = self.partitioned_repertoires(direction,
+                                                                   block)
+            phis = repertoire_distances(direction, repertoire,
+                                        partitioned_repertoires,
+                                        marginals=marginals)
+
+            for partition, phi, partitioned_repertoire in zip(
+                    block, phis, partitioned_repertoires):
+                # Return immediately if mechanism is reducible.
+                if phi == 0:
+                    return _mip(0.0, partition, partitioned_repertoire)
+
+                # Update MIP if it's more minimal.
+                if phi < mip.phi:
+                    mip = _mip(phi, partition, partitioned_repertoire)
+
+    def phi_upper_bound(self, direction, mechanism, purview):
+        """Return an upper bound on the |small_phi| of a mechanism over a
+        purview.
 
-        for partition in mip_partitions(mechanism, purview, self.node_labels):
-            # Find the distance between the unpartitioned and partitioned
-            # repertoire.
-            phi, partitioned_repertoire = self.evaluate_partition(
-                direction, mechanism, purview, partition,
-                repertoire=repertoire)
+        This is the distance between the repertoire and the unconstrained
+        repertoire (the cause or effect information), which is the
+        |small_phi| of the partition that severs the mechanism from the
+        purview. If the current |PARTITION_TYPE| is not known to include
+        such a partition, the bound is infinite.
 
-            # Return immediately if mechanism is reducible.
-            if phi == 0:
-                return _mip(0.0, partition, partitioned_repertoire)
+        Args:
+            direction (Direction): |CAUSE| or |EFFECT|.
+            mechanism (tuple[int]): The nodes in the mechanism.
+            purview (tuple[int]): The nodes in the purview.
 
-            # Update MIP if it's more minimal.
-            if phi < mip.phi:
-                mip = _mip(phi, partition, partitioned_repertoire)
+        Returns:
+            float: The upper bound.
+        """
+        if config.PARTITION_TYPE not in SEVERING_PARTITION_TYPES:
+            return float('inf')
+        if not purview:
+            return 0.0
 
-        return mip
+        repertoire = self.repertoire(direction, mechanism, purview)
+        # The state is unreachable; see `find_mip`
+        if direction == Direction.CAUSE and np.all(repertoire == 0):
+            return 0.0
+        return repertoire_distance(
+            direction, repertoire,
+            self.unconstrained_repertoire(direction, purview),
+            marginals=self._marginals(direction, mechanism, purview))
 
     def cause_mip(self, mechanism, purview):
         """Return the irreducibility analysis for the cause MIP.
@@ -648,12 +1098,17 @@ class Subsystem:
 
         Keyword Args:
             purviews (tuple[int]): Optional subset of purviews of interest.
+                Node indices are taken to be purviews of a single node.
         """
         if purviews is False:
             purviews = self.network.potential_purviews(direction, mechanism)
             # Filter out purviews that aren't in the subsystem
+            external = ~utils.bitmask(self.node_indices)
             purviews = [purview for purview in purviews
-                        if set(purview).issubset(self.node_indices)]
+                        if not utils.bitmask(purview) & external]
+        else:
+            purviews = [(purview,) if isinstance(purview, (int, np.integer))
+                        else purview for purview in purviews]
 
         # Purviews are already filtered in network.potential_purviews
         # over the full network connectivity matrix. However, since the cm
@@ -680,11 +1135,27 @@ class Subsystem:
         """
         purviews = self.potential_purviews(direction, mechanism, purviews)
 
+        # Search the purviews in order of decreasing upper bound on their
+        # phi. Once a bound is less than the best phi found so far, none of
+        # the remaining purviews can be the MICE.
+        bounds = [self.phi_upper_bound(direction, mechanism, purview)
+                  for purview in purviews]
+        order = sorted(range(len(purviews)), key=lambda i: -bounds[i])
+
+        mips = {}
+        best_phi = float('-inf')
+        for i in order:
+            if bounds[i] < best_phi and not utils.eq(bounds[i], best_phi):
+                break
+            checkpoint()
+            mips[i] = self.find_mip(direction, mechanism, purviews[i])
+            best_phi = max(best_phi, mips[i].phi)
+
         if not purviews:
             max_mip = _null_ria(direction, mechanism, ())
         else:
-            max_mip = max(self.find_mip(direction, mechanism, purview)
-                          for purview in purviews)
+            # Ties are resolved in the original order of the purviews.
+            max_mip = max(mips[i] for i in sorted(mips))
 
         if direction == Direction.CAUSE:
             return MaximallyIrreducibleCause(max_mip)
@@ -46,6 +46,45 @@ def condition_tpm(tpm, fixed_nodes, state):
     return tpm[conditioning_indices]
 
 
+def reachable_subsets(tpm, state):
+    """Return whether each subset of nodes can be in its current state.
+
+    A subset is in a reachable state if, with the other nodes fixed in their
+    current state, some state of the network leads to the current state of
+    the subset with nonzero probability (see
+    :func:`pyphi.validate.state_reachable`). All subsets are tested at once.
+
+    Args:
+        tpm (np.ndarray): The TPM of the network, in multidimensional form.
+        state (tuple[int]): The state of the network.
+
+    Returns:
+        np.ndarray: A boolean array of length |2^N| in which entry ``s`` is
+        ``True`` if the subset with bitmask ``s`` (bit ``i`` is set if node
+        ``i`` is in the subset) is in a reachable state.
+    """
+    n = len(state)
+    tpm = expand_tpm(tpm).reshape([-1, n], order='F')
+    bits = 1 << np.arange(n, dtype=np.int64)
+    subsets = np.arange(2 ** n, dtype=np.int64)
+
+    # The nodes which can be in their current state after each network state
+    possible = (np.abs(tpm - np.array(state)) < 1).dot(bits)
+    # The nodes which are not in their current state in each network state
+    changed = subsets ^ np.dot(state, bits)
+
+    # A network state is allowed for a subset if only nodes in the subset
+    # change. Compare blocks of network states with all subsets at once.
+    reachable = np.zeros(2 ** n, dtype=bool)
+    block = max(1, 2 ** 20 >> n)
+    for i in range(0, 2 ** n, block):
+        c = changed[i:i + block, np.newaxis]
+        p = possible[i:i + block, np.newaxis]
+        reachable |= (((subsets & c) == c) & ((subsets & ~p) == 0)).any(0)
+
+    return reachable
+
+
 def expand_tpm(tpm):
     """Broadcast a state-by-node TPM so that singleton dimensions are expanded
     over the full network.
@@ -111,3 +150,26 @@ def infer_cm(tpm):
     for a, b in np.ndindex(cm.shape):
         cm[a][b] = infer_edge(tpm, a, b, all_contexts)
     return cm
+
+
+def is_consistent_with_cm(tpm, cm):
+    """Return whether every node of a TPM only depends on the nodes that input
+    to it according to a connectivity matrix.
+
+    Args:
+        tpm (np.ndarray): A state-by-node TPM in multidimensional form.
+        cm (np.ndarray): A connectivity matrix.
+
+    Example:
+        >>> tpm = np.array([[[0, 0], [0, 1]], [[1, 0], [1, 1]]])
+        >>> is_consistent_with_cm(tpm, np.array([[1, 1], [0, 1]]))
+        True
+        >>> is_consistent_with_cm(tpm, np.array([[0, 1], [1, 1]]))
+        False
+    """
+    for b in range(tpm.shape[-1]):
+        for a in np.flatnonzero(cm[:, b] == 0):
+            if not np.array_equal(np.take(tpm[..., b], 0, axis=a),
+                                  np.take(tpm[..., b], 1, axis=a)):
+                return False
+    return True
@@ -85,6 +85,46 @@ def eq(x, y):
     return abs(x - y) <= constants.EPSILON
 
 
+def bitmask(nodes):
+    """Return the bitmask of a set of node indices.
+
+    Bit ``i`` of the mask is set if node ``i`` is in ``nodes``. Two sets of
+    nodes intersect if the bitwise AND of their masks is nonzero. A single
+    node index is treated as the set of that node.
+
+    Example:
+        >>> bitmask((0, 2))
+        5
+        >>> bitmask(2)
+        4
+    """
+    if isinstance(nodes, (int, np.integer)):
+        return 1 << int(nodes)
+    mask = 0
+    for i in nodes:
+        mask |= 1 << i
+    return mask
+
+
+def bitmask_nodes(mask):
+    """Return the node indices in a bitmask, in increasing order.
+
+    This is the inverse of :func:`bitmask`.
+
+    Example:
+        >>> bitmask_nodes(5)
+        (0, 2)
+    """
+    nodes = []
+    i = 0
+    while mask:
+        if mask & 1:
+            nodes.append(i)
+        mask >>= 1
+        i += 1
+    return tuple(nodes)
+
+
 # see http://stackoverflow.com/questions/16003217
 def combs(a, r):
     """NumPy implementation of ``itertools.combinations``.
@@ -222,6 +222,12 @@ def test_to_json(transition):
     transition.to_json()
 
 
+def test_purviews_can_be_node_indices(transition):
+    assert (transition.find_actual_cause((0,), (1, 2)) ==
+            transition.find_actual_cause((0,), ((1,), (2,))))
+    assert not transition.find_actual_cause((0,), (0,))
+
+
 # Test AC models
 # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 
@@ -3,12 +3,17 @@
 # test_big_phi.py
 
 import pickle
+from unittest import mock
 
 import pytest
 
-from pyphi import Network, Subsystem, compute, config, constants, models, utils
-from pyphi.compute.subsystem import (ComputeSystemIrreducibility,
-                                     sia_bipartitions)
+from pyphi import (Network, Subsystem, compute, config, constants, examples,
+                   models, utils)
+from pyphi.compute.subsystem import (ComputeSystemIrreducibility, CutPhi,
+                                     _ces, _isomorphic_sias,
+                                     cut_representatives,
+                                     evaluate_cut, order_cuts,
+                                     phi_upper_bound, sia_bipartitions)
 
 # pylint: disable=unused-argument
 
@@ -339,6 +344,101 @@ def test_find_sia_parallel_noised_example(s_noised_ComputeSystemIrreducibility):
     check_sia(sia, noised_answer)
 
 
+def test_worker_only_sends_cuts_which_improve_its_minimum(s):
+    cut1, cut2, cut3 = sia_bipartitions(s.node_indices)[:3]
+    compact = ComputeSystemIrreducibility.compact_result
+
+    record, local = compact(CutPhi(1.0, cut1), None, s, None)
+    assert record == local == CutPhi(1.0, cut1)
+
+    record, local = compact(CutPhi(2.0, cut2), local, s, None)
+    assert record is None
+    assert local == CutPhi(1.0, cut1)
+
+    record, local = compact(CutPhi(0.5, cut3), local, s, None)
+    assert record == local == CutPhi(0.5, cut3)
+
+
+def test_evaluate_cut_only_recomputes_damaged_concepts(s):
+    unpartitioned_ces = compute.ces(s)
+    for cut in sia_bipartitions(s.node_indices):
+        cut_s = s.apply_cut(cut)
+        sia = evaluate_cut(s, cut, unpartitioned_ces)
+        assert sia.partitioned_ces == compute.ces(cut_s)
+        assert sia.phi == compute.ces_distance(unpartitioned_ces,
+                                               compute.ces(cut_s))
+
+
+def test_concept_distances(s):
+    ces = compute.ces(s)
+    for c1 in ces:
+        assert compute.distance.concept_distances(c1, ces).tolist() == [
+            compute.concept_distance(c1, c2) for c2 in ces]
+
+
+def test_evaluate_cut_is_abandoned_above_max_phi(s):
+    unpartitioned_ces = compute.ces(s)
+    # The partitioned CES of this cut has a new concept, so the EMD is used
+    cut = models.Cut((0, 2), (1,))
+    assert evaluate_cut(s, cut, unpartitioned_ces, max_phi=1) is None
+    assert evaluate_cut(s, cut, unpartitioned_ces, max_phi=2.749997) == \
+        evaluate_cut(s, cut, unpartitioned_ces)
+
+
+def test_order_cuts(s):
+    unpartitioned_ces = compute.ces(s)
+    cuts = sia_bipartitions(s.node_indices)
+    ordered = order_cuts(cuts, s, unpartitioned_ces)
+    assert set(ordered) == set(cuts)
+    assert ordered[0] == standard_answer['cut']
+
+
+def test_cut_representatives():
+    network = examples.rule154_network()
+    subsystem = Subsystem(network, (0, 0, 0, 0, 0))
+    cuts = sia_bipartitions(subsystem.node_indices)
+    representatives = list(cut_representatives(cuts, subsystem))
+    assert len(representatives) == len(cuts) // 5
+
+    # Without purviews of equal phi, every cut in an orbit has the same phi as
+    # its representative
+    subsystem = Subsystem(examples.rule110_network(), (0, 0, 0))
+    cuts = sia_bipartitions(subsystem.node_indices)
+    representatives = list(cut_representatives(cuts, subsystem))
+    assert len(representatives) == len(cuts) // 3
+    unpartitioned_ces = compute.ces(subsystem)
+    for cut in representatives:
+        phi = evaluate_cut(subsystem, cut, unpartitioned_ces).phi
+        for mapping in subsystem.automorphisms():
+            image = cut.permute(mapping)
+            assert utils.eq(
+                evaluate_cut(subsystem, image, unpartitioned_ces).phi, phi)
+
+    with config.override(SKIP_SYMMETRIC_CUTS=False):
+        expected = compute.sia(subsystem)
+    with config.override(SKIP_SYMMETRIC_CUTS=True):
+        result = compute.sia(subsystem)
+    assert utils.eq(result.phi, expected.phi)
+
+
+def test_sia_by_isomorphism():
+    network = examples.rule154_network()
+    subsystem = Subsystem(network, (1, 0, 0, 0, 0), (1, 2, 3))
+    rotated = Subsystem(network, (0, 1, 0, 0, 0), (2, 3, 4))
+    expected = compute.sia(rotated)
+
+    with config.override(CACHE_SIAS_BY_ISOMORPHISM=True):
+        compute.sia(subsystem)
+        hits = _isomorphic_sias.info().hits
+        result = compute.sia(rotated)
+        assert _isomorphic_sias.info().hits == hits + 1
+
+    assert result.subsystem is rotated
+    assert result.cut == expected.cut
+    assert result.ces.mechanisms == expected.ces.mechanisms
+    assert result == expected
+
+
 @pytest.fixture
 def micro_s_ComputeSystemIrreducibility(micro_s):
     ces = compute.ces(micro_s)
@@ -390,6 +490,35 @@ def test_all_complexes_parallelization(s):
     assert sorted(serial) == sorted(parallel)
 
 
+@pytest.mark.parametrize('parallel', [False, True])
+def test_major_complex(parallel, s):
+    with config.override(PARALLEL_COMPLEX_EVALUATION=parallel):
+        major = compute.major_complex(s.network, s.state)
+    assert major == max(compute.complexes(s.network, s.state))
+    check_sia(major, standard_answer)
+
+
+def test_phi_upper_bound(s):
+    for subsystem in compute.subsystems(s.network, s.state):
+        assert phi_upper_bound(subsystem) >= compute.phi(subsystem)
+
+
+@config.override(PARALLEL_COMPLEX_EVALUATION=False, CACHE_SIAS=False,
+                 CACHE_SIAS_BY_ISOMORPHISM=False)
+def test_major_complex_computes_each_ces_once(s):
+    calls = []
+
+    def counting_ces(subsystem):
+        calls.append(subsystem.node_indices)
+        return _ces(subsystem)
+
+    with mock.patch('pyphi.compute.network._ces', counting_ces), \
+            mock.patch('pyphi.compute.subsystem._ces', counting_ces):
+        major = compute.major_complex(s.network, s.state)
+    check_sia(major, standard_answer)
+    assert len(calls) == len(set(calls))
+
+
 def test_sia_complete_graph_standard_example(s_complete):
     sia = compute.sia(s_complete)
     check_sia(sia, standard_answer)
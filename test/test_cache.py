@@ -1,11 +1,14 @@
 import functools
 import multiprocessing
+import pickle
 from unittest import mock
 
+import numpy as np
 import pytest
 import redis
 
 from pyphi import Direction, Subsystem, cache, config, examples, models
+from pyphi.compute import parallel
 
 
 def test_cache():
@@ -33,6 +36,82 @@ def test_cache():
     assert c.misses == 0
 
 
+def test_table_cache():
+    c = cache.TableCache(3)
+    key = c.key((0, 2), frozenset([1]), _prefix=Direction.EFFECT)
+    assert key == c.key((2, 0), (1,), _prefix=Direction.EFFECT)
+    assert key != c.key((0, 2), (1,), _prefix=Direction.CAUSE)
+    assert c.key(1, (0, 1), _prefix=Direction.CAUSE) != c.key(
+        (0, 1), 1, _prefix=Direction.CAUSE)
+
+    assert c.get(key) is None
+    assert c.info() == (0, 1, 0)
+
+    c.set(key, 'value')
+    c.set(key, 'other value')
+    assert c.get(key) == 'other value'
+    assert c.get(c.key((0, 2), (), _prefix=Direction.EFFECT)) is None
+    assert c.info() == (1, 2, 1)
+    assert c.memory_info().nbytes > 0
+
+    assert c.evict()
+    assert not c.evict()
+    assert c.get(key) is None
+    assert c.memory_info()[2:] == (0, 0)
+
+    c.set(key, 'value')
+    c.clear()
+    assert c.info() == (0, 0, 0)
+
+
+def test_table_cache_evicts_rows_in_lru_order():
+    c = cache.TableCache(2)
+    key1 = c.key((0,), (0,), _prefix=Direction.CAUSE)
+    key2 = c.key((1,), (0,), _prefix=Direction.CAUSE)
+    c.set(key1, 'a')
+    c.set(key2, 'b')
+    c.get(key1)
+
+    assert c.evict()
+    assert c.get(key1) == 'a'
+    assert c.get(key2) is None
+
+
+@mock.patch.object(cache, 'manager', cache.CacheManager())
+def test_unpickled_table_caches_are_accounted():
+    c = cache.TableCache(2)
+    key = c.key((0,), (1,), _prefix=Direction.EFFECT)
+    c.set(key, 'value')
+    nbytes = cache.manager.nbytes
+
+    copy = pickle.loads(pickle.dumps(c))
+    assert copy.get(key) == 'value'
+    assert copy in cache.manager.caches
+    assert cache.manager.nbytes == 2 * nbytes
+
+    del copy
+    assert cache.manager.nbytes == nbytes
+
+
+@config.override(TABLE_REPERTOIRE_CACHE=True)
+def test_table_repertoire_cache(s):
+    cached = Subsystem(s.network, s.state, s.node_indices)
+    assert isinstance(cached._repertoire_cache, cache.TableCache)
+    assert isinstance(cached._single_node_repertoire_cache, cache.TableCache)
+
+    for mechanism in [(0,), (1, 2)]:
+        for purview in [(), (0,), (0, 1, 2)]:
+            for direction in [Direction.CAUSE, Direction.EFFECT]:
+                expected = s.repertoire(direction, mechanism, purview)
+                for _ in range(2):
+                    assert np.array_equal(
+                        cached.repertoire(direction, mechanism, purview),
+                        expected)
+
+    info = cached.cache_info()['repertoire']
+    assert info.hits == info.misses == info.currsize == 12
+
+
 class SomeObject:
     """Object for testing cache decorator"""
     def __init__(self):
@@ -177,6 +256,95 @@ def test_redis_cache_sharing_between_processes(s):
     assert c.get(key) == 'result'
 
 
+# Decorator to skip a test if shared memory is not available
+require_shared_memory = pytest.mark.skipif(
+    cache.shared_memory is None,
+    reason="requires multiprocessing.shared_memory (Python 3.8+)")
+
+# Decorator to force a test to use the shared memory cache
+shared_memory_cache = lambda f: config.override(SHARED_MEMORY_CACHE=True)(
+    require_shared_memory(f))
+
+
+@shared_memory_cache
+def test_use_shared_memory_caches(s):
+    c = cache.MICECache(s)
+    assert isinstance(c, cache.SharedMemoryMICECache)
+    c = cache.RepertoireCache(s)
+    assert isinstance(c, cache.SharedMemoryCache)
+
+
+@require_shared_memory
+def test_shared_memory_store():
+    store = cache.SharedMemoryStore('pyphi_test_store', 2**16)
+    try:
+        assert store.get('key') is None
+        store.set('key', {'some': 'value'})
+        assert store.get('key') == {'some': 'value'}
+
+        # Fill the store; further values are dropped
+        for i in range(store.num_slots):
+            store.set(str(i), i)
+        assert store.full
+        assert store.get('0') == 0
+        assert store.get(str(store.num_slots - 1)) is None
+    finally:
+        store.unlink()
+
+
+class SetMiceInWorker(parallel.MapReduce):
+    """Set a value in the MICE cache in a worker process."""
+    def empty_result(self, subsystem):
+        return None
+
+    @staticmethod
+    def compute(key, subsystem):
+        cache.MICECache(subsystem).set(key, 'result')
+
+    def process_result(self, new, previous):
+        return None
+
+
+@shared_memory_cache
+def test_shared_memory_cache_sharing_between_processes(s):
+    c = cache.MICECache(s)
+    key = c.key(Direction.CAUSE, (0,))
+    with config.override(NUMBER_OF_CORES=1):
+        SetMiceInWorker([key], s).run_parallel()
+
+    assert c.get(key) == 'result'
+    # The worker recorded its region in the directory
+    assert c.store._region_ids() == [0, 1]
+
+
+def test_config_digest_changes_with_config():
+    digest = cache._config_digest()
+    assert cache._config_digest() == digest
+    with config.override(PRECISION=config.PRECISION + 1):
+        assert cache._config_digest() != digest
+    assert cache._config_digest() == digest
+
+
+@shared_memory_cache
+def test_shared_memory_mice_cache_inheritance():
+    s = examples.basic_subsystem()
+    mechanism = (1,)
+    mice = s.find_mice(Direction.CAUSE, mechanism)
+    assert mice.purview == (2,)
+
+    # Does not cut from 0 -> 1 or split mechanism
+    cut_s = Subsystem(s.network, s.state, s.node_indices,
+                      cut=models.Cut((0, 1), (2,)), mice_cache=s._mice_cache)
+    key = cut_s._mice_cache.key(Direction.CAUSE, mechanism)
+    assert cut_s._mice_cache.get(key) == mice
+
+    # Cuts connections from 2 -> 1
+    cut_s = Subsystem(s.network, s.state, s.node_indices,
+                      cut=models.Cut((0, 2), (1,)), mice_cache=s._mice_cache)
+    key = cut_s._mice_cache.key(Direction.CAUSE, mechanism)
+    assert cut_s._mice_cache.get(key) is None
+
+
 @local_cache
 def test_use_dict_mice_cache(s):
     c = cache.MICECache(s)
@@ -185,8 +353,11 @@ def test_use_dict_mice_cache(s):
 
 def test_mice_cache_keys(s):
     c = cache.DictMICECache(s)
-    answer = (None, Direction.CAUSE, (0,), (0, 1))
-    assert c.key(Direction.CAUSE, (0,), purviews=(0, 1)) == answer
+    answer = (None, Direction.CAUSE, 0b1, (0b1, 0b11))
+    assert c.key(Direction.CAUSE, (0,), purviews=((0,), (0, 1))) == answer
+    # Node indices are purviews of a single node
+    assert (c.key(Direction.CAUSE, (0,), purviews=(0, 1)) ==
+            c.key(Direction.CAUSE, (0,), purviews=((0,), (1,))))
 
     c = cache.RedisMICECache(s)
     answer = 'subsys:{}:None:CAUSE:(0,):(0, 1)'.format(hash(s))
@@ -276,6 +447,24 @@ def test_inherited_mice_cache_keeps_unaffected_mice(redis_cache):
     assert cut_s._mice_cache.get(key) == mice
 
 
+@local_cache
+def test_inherited_mice_cache_is_a_view_of_the_parent():
+    s = examples.basic_subsystem()
+    cut_s = Subsystem(s.network, s.state, s.node_indices,
+                      cut=models.Cut((0, 1), (2,)), mice_cache=s._mice_cache)
+    assert cut_s._mice_cache.size() == 0
+
+    # MICE cached by the parent after the cut subsystem was created are
+    # reused, and are not copied
+    mice = s.find_mice(Direction.CAUSE, (1,))
+    key = cut_s._mice_cache.key(Direction.CAUSE, (1,))
+    assert cut_s._mice_cache.get(key) == mice
+    assert cut_s._mice_cache.size() == 0
+
+    s._mice_cache.clear()
+    assert cut_s._mice_cache.get(key) is None
+
+
 @all_caches
 def test_inherited_cache_must_come_from_uncut_subsystem(redis_cache):
     s = examples.basic_subsystem()
@@ -295,6 +484,66 @@ def test_mice_cache_respects_cache_memory_limits():
     assert c.size() == 0
 
 
+def test_cache_memory_info():
+    c = cache.DictCache()
+    c.set('key', 'value')
+    info = c.memory_info()
+    assert info[:3] == (0, 0, 1)
+    assert info.nbytes == cache.sizeof('value') > 0
+    c.clear()
+    assert c.memory_info().nbytes == 0
+
+
+@mock.patch.object(cache, 'manager', cache.CacheManager())
+def test_caches_are_evicted_in_lru_order():
+    c1, c2 = cache.DictCache(), cache.DictCache()
+    c1.set('a', 'x' * 100)
+    c2.set('b', 'x' * 100)
+    c1.set('c', 'x' * 100)
+    c1.get('a')
+
+    # Leave room for three and a half entries
+    budget = 3.5 * cache.manager.nbytes / 3
+    cache.manager.total_memory = (100 * budget /
+                                  config.MAXIMUM_CACHE_MEMORY_PERCENTAGE)
+    c2.set('d', 'x' * 100)
+
+    # `c1` was used least recently, and `c` before `a`
+    assert list(c1.cache) == ['a']
+    assert list(c2.cache) == ['b', 'd']
+
+
+@mock.patch.object(cache, 'manager', cache.CacheManager())
+def test_unpickled_caches_are_accounted():
+    c = cache.DictCache()
+    c.set('a', 'x' * 100)
+    nbytes = cache.manager.nbytes
+
+    copy = pickle.loads(pickle.dumps(c))
+    assert copy.get('a') == 'x' * 100
+    assert copy in cache.manager.caches
+    assert cache.manager.nbytes == 2 * nbytes
+
+    del copy
+    assert cache.manager.nbytes == nbytes
+
+
+def test_cache_decorator_function():
+    calls = []
+
+    @cache.cache()
+    def square(x):
+        calls.append(x)
+        return x * x
+
+    assert square(3) == 9
+    assert square(3) == 9
+    assert calls == [3]
+    assert square.cache_info() == (1, 1, 1)
+    square.cache_clear()
+    assert square.cache_info() == (0, 0, 0)
+
+
 # Test purview cache
 # ==================
 
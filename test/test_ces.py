@@ -2,10 +2,13 @@
 # -*- coding: utf-8 -*-
 # test_ces.py
 
-import pytest
+import pickle
 from unittest.mock import patch
 
+import pytest
+
 from pyphi import compute, config, models
+from pyphi.compute.subsystem import _ces, evaluate_cut, sia_bipartitions
 
 
 @patch('pyphi.compute.distance._ces_distance_simple')
@@ -53,6 +56,69 @@ def test_ces_distance_switches_to_small_phi_difference(s):
         assert compute.ces_distance(*ce_structures) == 1.083333
 
 
+def test_ces_distance_lower_bound(s):
+    unpartitioned_ces = compute.ces(s)
+    for cut in sia_bipartitions(s.node_indices):
+        sia = evaluate_cut(s, cut, unpartitioned_ces)
+        concepts_only_in_C1 = [c for c in sia.ces if not any(
+            c.emd_eq(other) for other in sia.partitioned_ces)]
+        concepts_only_in_C2 = [c for c in sia.partitioned_ces if not any(
+            c.emd_eq(other) for other in sia.ces)]
+        bound = compute.distance.ces_distance_lower_bound(
+            concepts_only_in_C1, concepts_only_in_C2)
+        if concepts_only_in_C2:
+            assert bound <= sia.phi + 1e-4
+        else:
+            # Only concepts were destroyed: the bound is exact
+            assert round(bound, config.PRECISION) == sia.phi
+
+
+def test_ces_distance_matches_concepts_by_fingerprint(s):
+    unpartitioned_ces = compute.ces(s)
+    for cut in sia_bipartitions(s.node_indices):
+        partitioned_ces = compute.ces(s.apply_cut(cut))
+        C1, C2 = list(unpartitioned_ces), list(partitioned_ces)
+        assert compute.distance._unique_concepts(C1, C2) == [
+            c1 for c1 in C1 if not any(c1.emd_eq(c2) for c2 in C2)]
+        assert compute.distance._unique_concepts(C2, C1) == [
+            c2 for c2 in C2 if not any(c2.emd_eq(c1) for c1 in C1)]
+        assert (compute.ces_distance(unpartitioned_ces, partitioned_ces) ==
+                compute.ces_distance(C1, C2))
+
+
+def test_null_distances(s):
+    ces = compute.ces(s)
+    assert ces.null_concept is ces.null_concept
+    assert ces.null_concept == s.null_concept
+
+    null_distances = compute.distance.null_distances(ces)
+    assert null_distances is ces.null_distances
+    assert null_distances == {
+        c.mechanism: compute.concept_distance(c, s.null_concept)
+        for c in ces}
+
+    # The table is sent to workers with the CES
+    assert pickle.loads(pickle.dumps(ces)).null_distances == null_distances
+    # and computed before the cuts of a system are evaluated
+    assert _ces(s).null_distances == null_distances
+
+
+def test_concept_distances_store_expanded_repertoires(s):
+    ces = compute.ces(s)
+    c1, others = ces[0], ces[1:]
+    distances = compute.distance.concept_distances(c1, others, ces=ces)
+    assert distances.tolist() == [compute.concept_distance(c1, c2)
+                                  for c2 in others]
+    assert ces.expanded_repertoires.size() > 0
+    assert all(mechanism == c1.mechanism
+               for mechanism, _, _ in ces.expanded_repertoires.cache)
+
+
+def test_expanded_repertoires_are_cleared_after_sia(s):
+    sia = compute.sia(s)
+    assert sia.ces.expanded_repertoires.size() == 0
+
+
 def test_parallel_and_sequential_ces_are_equal(s, micro_s, macro_s):
     with config.override(PARALLEL_CONCEPT_EVALUATION=False):
         c = compute.ces(s)
@@ -4,7 +4,7 @@
 
 import numpy as np
 
-from pyphi import connectivity
+from pyphi import connectivity, utils
 
 
 def test_get_inputs_from_cm():
@@ -64,6 +64,14 @@ def test_relevant_connections():
     ])
 
 
+def test_relevant_connections_mask():
+    for n, _from, to in [(2, (0, 1), (1,)), (3, (0, 1), (0, 2)),
+                         (3, (), (1,)), (4, (3,), (0, 3))]:
+        cm = connectivity.relevant_connections(n, _from, to)
+        mask = connectivity.relevant_connections_mask(n, _from, to)
+        assert mask == connectivity.cm_to_mask(cm)
+
+
 def test_block_cm():
     cm1 = np.array([
         [1, 0, 0, 1, 1, 0],
@@ -131,6 +139,27 @@ def test_block_reducible():
     assert not connectivity.block_reducible(cm4, (0, 1), (1, 2))
 
 
+def test_block_reducible_mask():
+    cm = np.array([
+        [1, 0, 0, 1, 1, 0],
+        [1, 0, 1, 0, 0, 1],
+        [0, 0, 0, 1, 0, 0],
+        [0, 1, 0, 0, 0, 0],
+        [1, 1, 0, 0, 0, 1],
+        [0, 0, 0, 0, 0, 1],
+    ])
+    outputs, inputs = connectivity.cm_to_node_masks(cm)
+    for nodes1 in utils.powerset(range(6), nonempty=True):
+        for nodes2 in utils.powerset(range(6), nonempty=True):
+            sub = cm[np.ix_(nodes1, nodes2)]
+            expected = (not sub.sum(0).all() or not sub.sum(1).all() or
+                        (len(nodes1) > 1 and len(nodes2) > 1 and
+                         connectivity.block_cm(sub)))
+            assert connectivity.block_reducible_mask(
+                outputs, inputs, utils.bitmask(nodes1),
+                utils.bitmask(nodes2)) == expected
+
+
 def test_is_strong():
     # Strongly connected
     cm = np.array([[0, 1, 0],
@@ -157,6 +186,14 @@ def test_is_strong():
     assert connectivity.is_strong(cm, (0, 1))
 
 
+def test_strong_subsets(s):
+    cm = s.cm
+    strong = connectivity.strong_subsets(cm)
+    for nodes in utils.powerset(range(3)):
+        mask = sum(1 << i for i in nodes)
+        assert strong[mask] == connectivity.is_strong(cm, nodes)
+
+
 def test_is_full():
     cm = np.array([
         [0, 0, 1],
@@ -5,7 +5,7 @@
 import numpy as np
 import pytest
 
-from pyphi import config, distance
+from pyphi import Direction, config, distance, distribution
 
 
 def test_hamming_matrix():
@@ -38,12 +38,116 @@ def test_emd_validates_distribution_shapes():
         distance.hamming_emd(a, b)
 
 
+def test_hypercube_emd_matches_dense_emd():
+    np.random.seed(0)
+    for N in range(1, 7):
+        d1, d2 = np.random.rand(2, 2**N)
+        d1, d2 = d1 / d1.sum(), d2 / d2.sum()
+        dense = distance.emd(d1, d2, distance._hamming_matrix(N))
+        assert abs(distance._hypercube_emd(d1, d2, N) - dense) < 1e-5
+
+
+def test_hypercube_emd_of_independent_distributions():
+    # The Hamming EMD between product distributions is the sum of the
+    # differences between their marginals.
+    np.random.seed(0)
+    N = distance._NUM_PRECOMPUTED_HAMMING_MATRICES
+    p1, p2 = np.random.rand(2, N)
+    d1, d2 = np.ones((2,) + (2,) * N)
+    for i in range(N):
+        shape = [1] * N
+        shape[i] = 2
+        d1 = d1 * np.array([1 - p1[i], p1[i]]).reshape(shape)
+        d2 = d2 * np.array([1 - p2[i], p2[i]]).reshape(shape)
+    assert np.isclose(distance.hamming_emd(d1, d2), np.abs(p1 - p2).sum())
+
+    d1 = np.zeros((2,) * N)
+    d1[(0,) * N] = 1
+    d2 = np.zeros((2,) * N)
+    d2[(1,) * N] = 1
+    assert distance.hamming_emd(d1, d2) == N
+
+
+def test_large_emd_validates_distribution_shapes():
+    N = distance._NUM_PRECOMPUTED_HAMMING_MATRICES
+    a = np.ones((2,) * N) / 2**N
+    b = np.ones((2,) * (N - 1) + (3,)) / (3 * 2**(N - 1))
+    with pytest.raises(ValueError):
+        distance.hamming_emd(a, b)
+
+
+def test_effect_emd():
+    np.random.seed(0)
+    d1 = np.random.rand(2, 1, 2)
+    d2s = np.random.rand(3, 2, 1, 2)
+    expected = [sum(abs(distribution.marginal_zero(d1, i) -
+                        distribution.marginal_zero(d2, i)) for i in range(3))
+                for d2 in d2s]
+    assert np.allclose([distance.effect_emd(d1, d2) for d2 in d2s], expected)
+    assert np.allclose(distance.effect_emds(d1, d2s), expected)
+    marginals = distribution.marginal_zeros(d1)
+    assert np.allclose(distance.effect_emds(d1, d2s, marginals=marginals),
+                       expected)
+    assert np.isclose(distance.effect_emd(d1, d2s[0], marginals=marginals),
+                      expected[0])
+
+
 def test_l1_distance():
     a = np.array([0, 1, 2])
     b = np.array([2, 2, 4.5])
     assert distance.l1(a, b) == 5.5
 
 
+@pytest.mark.parametrize('measure', ['EMD', 'L1', 'KLD'])
+def test_repertoire_distances(measure):
+    r1 = np.array([0.1, 0.2, 0.3, 0.4]).reshape(2, 2, 1)
+    r2s = np.array([[0.25, 0.25, 0.25, 0.25],
+                    [0.4, 0.3, 0.2, 0.1],
+                    [0.1, 0.2, 0.3, 0.4]]).reshape(3, 2, 2, 1)
+    with config.override(MEASURE=measure):
+        for direction in [Direction.CAUSE, Direction.EFFECT]:
+            expected = [distance.repertoire_distance(direction, r1, r2)
+                        for r2 in r2s]
+            assert distance.repertoire_distances(
+                direction, r1, r2s).tolist() == expected
+            assert distance.repertoire_distance(
+                direction, r1, r2s).tolist() == expected
+
+
+@pytest.mark.parametrize('measure', ['EMD', 'L1', 'ENTROPY_DIFFERENCE'])
+def test_system_repertoire_distance_of_stack(measure):
+    r1 = np.array([0.1, 0.2, 0.3, 0.4]).reshape(2, 2, 1)
+    r2s = np.array([[0.25, 0.25, 0.25, 0.25],
+                    [0.4, 0.3, 0.2, 0.1]]).reshape(2, 2, 2, 1)
+    with config.override(MEASURE=measure):
+        assert np.allclose(
+            distance.system_repertoire_distance(r1, r2s),
+            [distance.system_repertoire_distance(r1, r2) for r2 in r2s])
+
+
+def test_register_batched_measure():
+    @distance.measures.register('CONSTANT')
+    def constant(d1, d2):
+        return 1.0
+
+    r1 = np.ones((2, 2, 1)) / 4
+    r2s = np.ones((3, 2, 2, 1)) / 4
+    with config.override(MEASURE='CONSTANT'):
+        assert distance.system_repertoire_distance(r1, r2s).tolist() == [
+            1.0, 1.0, 1.0]
+
+        @distance.measures.register_batched('CONSTANT')
+        def twos(d1, d2s):
+            return np.full(len(d2s), 2.0)
+
+        assert distance.measures.batched('CONSTANT') is twos
+        assert distance.system_repertoire_distance(r1, r2s).tolist() == [
+            2.0, 2.0, 2.0]
+
+    del distance.measures.store['CONSTANT']
+    del distance.measures._batched['CONSTANT']
+
+
 def test_entropy_difference():
     a = np.ones((2, 2, 2)) / 8
     b = np.ones((2, 2, 2)) / 8
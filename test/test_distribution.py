@@ -44,6 +44,19 @@ def test_marginal_zero():
     assert distribution.marginal_zero(repertoire, 2) == 0
 
 
+def test_marginal_zeros():
+    np.random.seed(0)
+    repertoires = np.random.rand(3, 2, 1, 2, 2)
+    for repertoire in repertoires:
+        assert np.allclose(
+            distribution.marginal_zeros(repertoire),
+            [distribution.marginal_zero(repertoire, i) for i in range(4)])
+    assert np.allclose(
+        distribution.marginal_zeros(repertoires, stacked=True),
+        [distribution.marginal_zeros(repertoire)
+         for repertoire in repertoires])
+
+
 def test_marginal():
     repertoire = np.array([
         [[0., 0.],
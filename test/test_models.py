@@ -7,7 +7,8 @@ from collections import namedtuple
 import numpy as np
 import pytest
 
-from pyphi import Direction, Subsystem, config, constants, exceptions, models
+from pyphi import (Direction, Subsystem, config, connectivity, constants,
+                   exceptions, models, utils)
 from pyphi.labels import NodeLabels
 
 # Helper functions for constructing PyPhi objects
@@ -251,6 +252,36 @@ def test_cut_matrix():
     assert np.array_equal(cut.cut_matrix(0), np.ndarray(shape=(0, 0)))
 
 
+def test_cut_mask():
+    for cut in [models.Cut((0,), (1,)), models.Cut((0, 2), (1, 2)),
+                models.KCut(Direction.CAUSE, models.KPartition(
+                    models.Part((0,), (0,)), models.Part((1, 2), (1, 2)))),
+                models.NullCut((0, 1, 2))]:
+        assert cut.cut_mask(3) == connectivity.cm_to_mask(cut.cut_matrix(3))
+
+
+def test_kcut_cuts_connections():
+    for direction in [Direction.CAUSE, Direction.EFFECT]:
+        cut = models.KCut(direction, models.KPartition(
+            models.Part((0,), (1,)), models.Part((1, 2), (0, 2))))
+        matrix = cut.cut_matrix(3)
+        for a in utils.powerset((0, 1, 2), nonempty=True):
+            for b in utils.powerset((0, 1, 2), nonempty=True):
+                assert (cut.cuts_connections(a, b) ==
+                        matrix[np.ix_(a, b)].any())
+
+
+def test_cut_permute():
+    mapping = {0: 1, 1: 2, 2: 0}
+    assert models.Cut((0,), (1, 2)).permute(mapping) == models.Cut((1,),
+                                                                   (0, 2))
+    cut = models.KCut(Direction.CAUSE, models.KPartition(
+        models.Part((1, 2), (0,)), models.Part((0,), (1, 2))))
+    assert cut.permute(mapping) == models.KCut(
+        Direction.CAUSE, models.KPartition(
+            models.Part((0, 2), (1,)), models.Part((1,), (0, 2))))
+
+
 def test_cut_indices():
     cut = models.Cut((0,), (1, 2))
     assert cut.indices == (0, 1, 2)
@@ -450,6 +481,21 @@ def test_damaged(s):
     assert not m2.damaged_by_cut(s)
 
 
+def test_damaged_agrees_with_cut_matrix(s):
+    n = s.network.size
+    for cut in [models.Cut((0,), (1, 2)), models.Cut((0, 2), (1,)),
+                models.Cut((1,), (0, 2))]:
+        cut_s = Subsystem(s.network, s.state, s.node_indices, cut=cut)
+        for mechanism, purview in [((0, 1), (1, 2)), ((0,), (1, 2)),
+                                   ((2,), (0,)), ((1, 2), (1,))]:
+            for direction in (Direction.CAUSE, Direction.EFFECT):
+                m = mice(mechanism=mechanism, purview=purview,
+                         direction=direction)
+                expected = (cut.splits_mechanism(mechanism) or np.any(
+                    m._relevant_connections(cut_s) * cut.cut_matrix(n) == 1))
+                assert m.damaged_by_cut(cut_s) == expected
+
+
 # }}}
 
 
@@ -540,6 +586,17 @@ def test_concept_equality_one_subsystem_is_subset_of_another(s, subsys_n1n2):
     assert concept(subsystem=s) == concept(subsystem=subsys_n1n2)
 
 
+def test_concept_fingerprint(s, subsys_n1n2):
+    c1 = concept(subsystem=s)
+    assert c1.fingerprint is c1.fingerprint
+    assert c1.fingerprint == concept(subsystem=subsys_n1n2).fingerprint
+    assert c1.fingerprint != concept(phi=0.5, subsystem=s).fingerprint
+    assert c1.fingerprint != concept(mechanism=(0,), subsystem=s).fingerprint
+
+    ces = models.CauseEffectStructure([c1], subsystem=s)
+    assert ces.fingerprints == {c1.fingerprint: c1}
+
+
 def test_concept_repr_str(s):
     print(repr(concept(subsystem=s)))
     print(str(concept(subsystem=s)))
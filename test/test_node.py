@@ -4,8 +4,10 @@
 
 import numpy as np
 
+from pyphi import Network, examples, models, utils
 from pyphi.node import Node, expand_node_tpm, generate_nodes
 from pyphi.subsystem import Subsystem
+from pyphi.tpm import condition_tpm
 
 
 def test_node_init_tpm(s):
@@ -107,3 +109,40 @@ def test_generate_nodes(s):
 def test_generate_nodes_default_labels(s):
     nodes = generate_nodes(s.tpm, s.cm, s.state, s.node_indices)
     assert [n.label for n in nodes] == ['n0', 'n1', 'n2']
+
+
+def test_shared_nodes_equal_subsystem_nodes():
+    network = examples.fig16()
+    state = (1, 0, 0, 1, 1, 1, 0)
+    assert network.shares_nodes
+
+    def nodes_of(nodes, cut=None, shared=True):
+        external = set(network.node_indices) - set(nodes)
+        tpm = condition_tpm(network.tpm, external, state)
+        cm = network.cm if cut is None else cut.apply_cut(network.cm)
+        return generate_nodes(tpm, cm, state, nodes,
+                              network=(network if shared else None))
+
+    for nodes in utils.powerset(network.node_indices, nonempty=True):
+        for cut in [None, models.Cut(nodes[:1], nodes[1:])]:
+            unshared = nodes_of(nodes, cut, shared=False)
+            for node, other in zip(nodes_of(nodes, cut), unshared):
+                assert node.key is not None and other.key is None
+                assert np.array_equal(node.tpm, other.tpm)
+                assert hash(node) == hash(other)
+
+    # Nodes which only differ outside of their inputs share their TPM
+    node = nodes_of((0, 1, 2, 3))[3]
+    other = nodes_of((1, 2, 3))[2]
+    assert node.key == other.key
+    assert node.tpm is other.tpm
+
+
+def test_nodes_are_not_shared_if_tpm_depends_on_non_inputs(s):
+    # A depends on B, but B is not an input to A
+    cm = s.network.cm.copy()
+    cm[1, 0] = 0
+    network = Network(s.network.tpm, cm)
+    assert not network.shares_nodes
+    assert all(node.key is None
+               for node in Subsystem(network, s.state).nodes)
@@ -2,6 +2,7 @@
 # -*- coding: utf-8 -*-
 # test_parallel.py
 
+import time
 from unittest.mock import patch
 
 import pytest
@@ -70,6 +71,31 @@ def test_materialize_list_only_when_needed():
         assert isinstance(engine.iterable, list)
 
 
+class MapDecreasing(MapSquare):
+    """Only keep squares which are smaller than all previous ones."""
+
+    def empty_result(self):
+        return []
+
+    @staticmethod
+    def bound(result):
+        return min(result) if result else None
+
+    @staticmethod
+    def compute(num, bound=None):
+        if bound is not None and num ** 2 >= bound:
+            return None
+        return num ** 2
+
+    def process_result(self, new, previous):
+        previous.append(new)
+        return previous
+
+
+def test_bound_is_passed_to_compute():
+    assert MapDecreasing([2, 3, 1, 2, 0]).run_sequential() == [4, 1, 0]
+
+
 class MapError(MapSquare):
     """Raise an exception in the worker process."""
     @staticmethod
@@ -80,3 +106,132 @@ class MapError(MapSquare):
 def test_parallel_exception_handling():
     with pytest.raises(Exception, match=r"I don't wanna!"):
         MapError([1]).run(parallel=True)
+
+
+def test_worker_pool_is_reused():
+    with config.override(NUMBER_OF_CORES=1):
+        assert MapSquare([1, 2, 3]).run_parallel() == {1, 4, 9}
+        pool = parallel.get_pool()
+        assert MapSquare([4]).run_parallel() == {16}
+        assert parallel.get_pool() is pool
+
+
+@patch('multiprocessing.cpu_count', _mock_cpu_count)
+def test_worker_pool_is_restarted_when_number_of_cores_changes():
+    with config.override(NUMBER_OF_CORES=1):
+        pool = parallel.get_pool()
+        assert pool.num_processes == 1
+
+    with config.override(NUMBER_OF_CORES=2):
+        assert MapSquare([1, 2, 3]).run_parallel() == {1, 4, 9}
+        assert parallel.get_pool() is not pool
+        assert parallel.get_pool().num_processes == 2
+
+
+def test_worker_pool_survives_exceptions():
+    with config.override(NUMBER_OF_CORES=1):
+        pool = parallel.get_pool()
+        with pytest.raises(Exception, match=r"I don't wanna!"):
+            MapError([1, 2, 3]).run(parallel=True)
+        assert MapSquare([1, 2, 3]).run_parallel() == {1, 4, 9}
+        assert parallel.get_pool() is pool
+
+
+class MapUntilZero(MapSquare):
+    """Short-circuit when a zero is found."""
+    def process_result(self, new, previous):
+        if new == 0:
+            self.done = True
+        return super().process_result(new, previous)
+
+
+def test_short_circuit_leaves_no_stale_results():
+    with config.override(NUMBER_OF_CORES=1):
+        result = MapUntilZero([0] + list(range(1, 100))).run_parallel()
+        assert 0 in result
+        assert MapSquare([5]).run_parallel() == {25}
+
+
+class MapPrecision(MapSquare):
+
+    @staticmethod
+    def compute(obj):
+        return config.PRECISION
+
+
+def test_worker_uses_parent_config():
+    with config.override(NUMBER_OF_CORES=1, PRECISION=2):
+        assert MapPrecision([None]).run_parallel() == {2}
+    with config.override(NUMBER_OF_CORES=1, PRECISION=4):
+        assert MapPrecision([None]).run_parallel() == {4}
+
+
+def test_map_square_in_chunks():
+    with config.override(NUMBER_OF_CORES=1):
+        engine = MapSquare(range(1000))
+        assert engine.run_parallel() == {i ** 2 for i in range(1000)}
+        # Cheap tasks are sent in larger chunks
+        assert engine.chunksize > 1
+
+
+def test_chunksize_adapts_to_latency():
+    engine = MapSquare([])
+    engine.chunksize = 1
+    engine.latency = None
+
+    engine.update_chunksize(10, 10 * parallel.TARGET_CHUNK_DURATION)
+    assert engine.chunksize == 1
+
+    engine.update_chunksize(10, 0)
+    assert engine.chunksize == 2
+
+    engine.update_chunksize(1000, 0)
+    engine.update_chunksize(1000, 0)
+    assert engine.chunksize <= parallel.MAX_CHUNK_SIZE
+
+    # Empty chunks from cancelled jobs are ignored
+    chunksize = engine.chunksize
+    engine.update_chunksize(0, 1)
+    assert engine.chunksize == chunksize
+
+
+class MapUntilZeroSlowly(MapUntilZero):
+    """Objects other than zero take up to 10 seconds to compute, unless the
+    computation is cancelled. Whether each computation finished or was
+    cancelled is appended to a file."""
+    def empty_result(self, path):
+        return super().empty_result()
+
+    @staticmethod
+    def compute(num, path):
+        try:
+            for _ in range(1000):
+                if num == 0:
+                    break
+                parallel.checkpoint()
+                time.sleep(0.01)
+        except parallel.JobCancelled:
+            with open(path, 'a') as f:
+                f.write('cancelled {}\n'.format(num))
+            raise
+        with open(path, 'a') as f:
+            f.write('finished {}\n'.format(num))
+        return num ** 2
+
+
+def test_checkpoint_cancels_computations_in_flight(tmpdir):
+    path = str(tmpdir.join('log'))
+    with config.override(NUMBER_OF_CORES=1):
+        assert MapUntilZeroSlowly([0, 1], path).run_parallel() == {0}
+        # The worker has finished the cancelled job once it runs the next one
+        assert MapSquare([5]).run_parallel() == {25}
+
+    # The computation of 1 was stopped by `checkpoint`, or skipped if the job
+    # was cancelled before it started
+    with open(path) as f:
+        assert f.read().splitlines() in (['finished 0'],
+                                         ['finished 0', 'cancelled 1'])
+
+
+def test_checkpoint_is_noop_in_parent_process():
+    parallel.checkpoint()
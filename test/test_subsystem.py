@@ -6,7 +6,8 @@ import numpy as np
 import pytest
 
 import example_networks
-from pyphi import Direction, Network, config, exceptions
+from pyphi import (Direction, Network, config, distribution, examples,
+                   exceptions, utils)
 from pyphi.models import (Concept, Cut,
                           MaximallyIrreducibleCause,
                           MaximallyIrreducibleEffect,
@@ -127,6 +128,45 @@ def test_apply_cut(s):
     assert np.array_equal(cut_s.cm, cut.apply_cut(s.cm))
 
 
+def test_apply_cut_is_a_view_of_the_uncut_subsystem(s):
+    cut = Cut((0,), (1, 2))
+    cut_s = s.apply_cut(cut)
+    expected = Subsystem(s.network, s.state, s.node_indices, cut=cut)
+    assert cut_s == expected
+    assert cut_s.nodes == expected.nodes
+    assert [hash(node) for node in cut_s.nodes] == [
+        hash(node) for node in expected.nodes]
+    # Only A outputs to a node of the other side of the cut
+    assert cut_s.nodes[0] is not s.nodes[0]
+    assert cut_s.nodes[1] is s.nodes[1]
+
+    for mechanism in utils.powerset(s.node_indices):
+        for purview in utils.powerset(s.node_indices):
+            for direction in [Direction.CAUSE, Direction.EFFECT]:
+                assert np.array_equal(
+                    cut_s.repertoire(direction, mechanism, purview),
+                    expected.repertoire(direction, mechanism, purview))
+
+    # Cause repertoires of mechanisms without C are shared with the uncut
+    # subsystem.
+    assert s._repertoire_cache.get(s._repertoire_cache.key(
+        (0, 1), (0, 1, 2), _prefix=Direction.CAUSE)) is not None
+    assert s._repertoire_cache.get(s._repertoire_cache.key(
+        (1, 2), (0, 1, 2), _prefix=Direction.CAUSE)) is None
+
+
+def test_effect_marginals(s):
+    cut_s = s.apply_cut(Cut((0,), (1, 2)))
+    for subsystem in (s, cut_s):
+        for mechanism in utils.powerset(s.node_indices):
+            for purview in utils.powerset(s.node_indices, nonempty=True):
+                repertoire = subsystem.effect_repertoire(mechanism, purview)
+                assert np.allclose(
+                    subsystem.effect_marginals(mechanism, purview),
+                    [distribution.marginal_zero(repertoire, i)
+                     for i in range(repertoire.ndim)])
+
+
 def test_cut_indices(s, subsys_n1n2):
     assert s.cut_indices == (0, 1, 2)
     assert subsys_n1n2.cut_indices == (1, 2)
@@ -171,3 +211,34 @@ def test_concept_no_mechanism(s):
 
 def test_concept_nonexistent(s):
     assert not s.concept((0, 2))
+
+
+def test_automorphisms(s):
+    assert list(s.automorphisms()) == [{0: 0, 1: 1, 2: 2}]
+
+    network = examples.rule154_network()
+    subsystem = Subsystem(network, (0, 0, 0, 0, 0))
+    rotations = [{i: (i + k) % 5 for i in range(5)} for k in range(5)]
+    assert list(subsystem.automorphisms()) == rotations
+
+    # Automorphisms must preserve the state
+    subsystem = Subsystem(network, (1, 0, 0, 0, 0))
+    assert len(list(subsystem.automorphisms())) == 1
+
+
+def test_canonical_form(s):
+    network = examples.rule154_network()
+    # Rotating the ring by one node maps A, B, C, D, E to B, C, D, E, A
+    subsystem = Subsystem(network, (1, 0, 0, 0, 0), (1, 2, 3))
+    rotated = Subsystem(network, (0, 1, 0, 0, 0), (2, 3, 4))
+    key, order = subsystem.canonical_form()
+    rotated_key, rotated_order = rotated.canonical_form()
+    assert key == rotated_key
+    assert [(i + 1) % 5 for i in order] == list(rotated_order)
+
+    # The state of the external nodes changes the conditioned TPM
+    other = Subsystem(network, (0, 0, 0, 0, 0), (2, 3, 4))
+    assert other.canonical_form()[0] != key
+
+    assert s.canonical_form()[0] != key
+    assert s.apply_cut(Cut((0,), (1, 2))).canonical_form() is None
@@ -6,7 +6,7 @@ import numpy as np
 import pytest
 
 import example_networks
-from pyphi import Direction, Subsystem
+from pyphi import Direction, Subsystem, utils
 from pyphi.models import Cut
 
 # Get example networks
@@ -360,4 +360,41 @@ def test_repertoire_wrong_direction_error(s):
     with pytest.raises(ValueError):
         s.repertoire(Direction.BIDIRECTIONAL, (0,), (0, 1))
 
+
+cut_standard_subsystem = Subsystem(standard, standard_subsystem.state,
+                                   cut=Cut((0,), (1, 2)))
+
+
+@pytest.mark.parametrize('subsystem', [standard_subsystem,
+                                       cut_standard_subsystem,
+                                       simple_a_just_on])
+@pytest.mark.parametrize('direction', [Direction.CAUSE, Direction.EFFECT])
+def test_repertoires(subsystem, direction):
+    mechanisms = list(utils.powerset(subsystem.node_indices))
+    for purview in utils.powerset(subsystem.node_indices):
+        batch = Subsystem(subsystem.network, subsystem.state,
+                          subsystem.node_indices, cut=subsystem.cut)
+        result = batch.repertoires(direction, mechanisms, purview)
+        assert len(result) == len(mechanisms)
+        for mechanism, repertoire in zip(mechanisms, result):
+            expected = subsystem.repertoire(direction, mechanism, purview)
+            assert np.array_equal(repertoire, expected)
+
+
+def test_prefetch_repertoires(s):
+    pairs = [((0,), (1, 2)), ((0, 1), (1, 2)), ((2,), (0,))]
+    s.prefetch_repertoires(Direction.CAUSE, pairs)
+    assert s._repertoire_cache.size() == len(pairs)
+    assert s._repertoire_cache.info()[:2] == (0, 0)
+    # Cached repertoires don't share memory with the stacked repertoires
+    assert all(repertoire.base is None
+               for repertoire in s._repertoire_cache.cache.values())
+    for mechanism, purview in pairs:
+        expected = Subsystem(s.network, s.state).cause_repertoire(mechanism,
+                                                                  purview)
+        hits = s._repertoire_cache.hits
+        assert np.array_equal(s.cause_repertoire(mechanism, purview),
+                              expected)
+        assert s._repertoire_cache.hits == hits + 1
+
 # vim: set foldmarker={{{,}}} foldlevel=0  foldmethod=marker :
@@ -6,9 +6,10 @@ from itertools import chain
 import pytest
 
 import example_networks
-from pyphi import Direction, Subsystem
+from pyphi import Direction, Subsystem, config, examples
 from pyphi.models import Cut, MaximallyIrreducibleCauseOrEffect, _null_ria
-from pyphi.utils import eq
+from pyphi.partition import partition_registry
+from pyphi.utils import eq, powerset
 
 # Expected results {{{
 # ====================
@@ -110,6 +111,40 @@ def test_find_mice_empty(s):
                for mice in expected)
 
 
+@pytest.mark.parametrize('partition_type', ['BI', 'TRI'])
+@pytest.mark.parametrize('pick_smallest_purview', [False, True])
+def test_find_mice_skips_bounded_purviews(partition_type,
+                                          pick_smallest_purview):
+    network = examples.fig16()
+    with config.override(PARTITION_TYPE=partition_type,
+                         PICK_SMALLEST_PURVIEW=pick_smallest_purview):
+        s = Subsystem(network, (1, 0, 0, 1, 1, 1, 0), (0, 1, 2, 3))
+        for mechanism in powerset(s.node_indices, nonempty=True):
+            for direction in directions:
+                purviews = s.potential_purviews(direction, mechanism)
+                if not purviews:
+                    continue
+                for purview in purviews:
+                    assert (s.find_mip(direction, mechanism, purview).phi <=
+                            s.phi_upper_bound(direction, mechanism, purview))
+
+                expected = max(s.find_mip(direction, mechanism, purview)
+                               for purview in purviews)
+                result = s.find_mice(direction, mechanism)
+                assert result.ria == expected
+                assert result.purview == expected.purview
+
+
+def test_phi_upper_bound_is_infinite_for_unknown_partition_types(s):
+    @partition_registry.register('NONE')
+    def no_partitions(mechanism, purview, node_labels=None):
+        return []
+
+    with config.override(PARTITION_TYPE='NONE'):
+        assert s.phi_upper_bound(Direction.CAUSE, (0,), (1,)) == float('inf')
+
+    del partition_registry.store['NONE']
+
 # }}}
 # `phi_max` tests {{{
 # ===================
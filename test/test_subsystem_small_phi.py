@@ -1,11 +1,13 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+from unittest import mock
+
 import numpy as np
 import pytest
 
 import example_networks
-from pyphi import Direction, constants
+from pyphi import Direction, config, constants, distance, utils
 from pyphi.models import Part, Bipartition, RepertoireIrreducibilityAnalysis
 
 s = example_networks.s()
@@ -241,6 +243,44 @@ def test_find_mip(direction, subsystem, cut, mechanism, purview, expected):
     else:
         assert result == expected
 
+
+@pytest.mark.parametrize('measure', ['EMD', 'L1'])
+def test_find_mip_partition_block_size(measure):
+    subsystem = example_networks.s()
+    mechanisms = utils.powerset(subsystem.node_indices, nonempty=True)
+    purviews = list(utils.powerset(subsystem.node_indices, nonempty=True))
+    with config.override(MEASURE=measure):
+        for mechanism in mechanisms:
+            for purview in purviews:
+                for direction in [Direction.CAUSE, Direction.EFFECT]:
+                    with config.override(PARTITION_BLOCK_SIZE=1):
+                        expected = subsystem.find_mip(direction, mechanism,
+                                                      purview)
+                    with config.override(PARTITION_BLOCK_SIZE=64):
+                        result = subsystem.find_mip(direction, mechanism,
+                                                    purview)
+                    assert result == expected
+                    assert result.partition == expected.partition
+
+
+@config.override(MEASURE='L1')
+def test_find_mip_uses_batched_measure():
+    subsystem = example_networks.s()
+    expected = subsystem.find_mip(Direction.CAUSE, (0, 1, 2), (0, 1, 2))
+    assert expected.phi > 0
+
+    sizes = []
+
+    def l1s(d1, d2s):
+        sizes.append(len(d2s))
+        return distance.l1s(d1, d2s)
+
+    subsystem = example_networks.s()
+    with mock.patch.dict(distance.measures._batched, {'L1': l1s}):
+        result = subsystem.find_mip(Direction.CAUSE, (0, 1, 2), (0, 1, 2))
+    assert result == expected
+    assert sizes and max(sizes) > 1
+
 # }}}
 
 
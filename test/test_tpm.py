@@ -4,7 +4,11 @@
 
 import numpy as np
 
-from pyphi.tpm import expand_tpm, infer_cm, is_state_by_state, marginalize_out
+import pytest
+
+from pyphi import Subsystem, exceptions, utils
+from pyphi.tpm import (expand_tpm, infer_cm, is_state_by_state,
+                       marginalize_out, reachable_subsets)
 
 
 def test_is_state_by_state():
@@ -48,3 +52,15 @@ def test_marginalize_out(s):
 
 def test_infer_cm(rule152):
     assert np.array_equal(infer_cm(rule152.tpm), rule152.cm)
+
+
+@pytest.mark.parametrize('state', [(1, 0, 0), (0, 1, 1), (1, 1, 1)])
+def test_reachable_subsets(state, standard):
+    reachable = reachable_subsets(standard.tpm, state)
+    for nodes in utils.powerset(range(3), nonempty=True):
+        try:
+            Subsystem(standard, state, nodes)
+            answer = True
+        except exceptions.StateUnreachableError:
+            answer = False
+        assert reachable[sum(1 << i for i in nodes)] == answer